@@ -3,10 +3,14 @@
 """
 import click
 import getpass
+import subprocess
+import sys
 from pathlib import Path
 from .config import config_manager
 from .utils.logger import logger
 from .utils.browser_downloader import ChromiumDownloader, BrowserDownloader
+from .utils.browser_versions import VersionStore, smoke_test
+from .utils.extractor import EXTRACT_PROFILES
 
 
 @click.group()
@@ -19,7 +23,8 @@ def cli():
 @cli.command()
 @click.option('--username', '-u', help='用户名')
 @click.option('--password', '-p', help='密码')
-def login(username, password):
+@click.option('--account', 'as_account', is_flag=True, help='添加/更新 multiplex 模式的账户（不修改主登录凭据）')
+def login(username, password, as_account):
     """设置登录凭据（默认总是交互覆盖，亦支持 -u/-p 传参）"""
     click.echo("设置登录凭据")
     click.echo("=" * 30)
@@ -35,8 +40,12 @@ def login(username, password):
         return
 
     try:
-        config_manager.set_login_credentials(username, password)
-        click.echo("✅ 登录凭据设置成功")
+        if as_account:
+            config_manager.set_account_credentials(username, password)
+            click.echo(f"✅ 账户 {username} 已保存（共 {len(config_manager.get_accounts())} 个账户）")
+        else:
+            config_manager.set_login_credentials(username, password)
+            click.echo("✅ 登录凭据设置成功")
     except Exception as e:
         click.echo(f"❌ 设置失败: {e}")
 
@@ -54,6 +63,9 @@ def status():
     else:
         click.echo("❌ 未配置登录凭据，请运行 'claude-auto-clicker login'")
     
+    if config_manager.get_config_value('execution.mode', 'single') == 'multiplex':
+        click.echo(f"👥 多账户模式: {len(config_manager.get_accounts())} 个账户共用一个浏览器")
+    
     # 检查浏览器状态
     project_root = Path(__file__).parent.parent
     downloader = ChromiumDownloader(project_root)
@@ -61,6 +73,11 @@ def status():
     if downloader.is_installed():
         chromium_path = downloader.get_chromium_path()
         click.echo(f"✅ 便携式 Chromium: {chromium_path}")
+        info = downloader.get_install_info()
+        if info['version']:
+            click.echo(f"🏷️  当前版本: {info['version']}")
+        click.echo(f"💾 磁盘占用: {info['installed_bytes'] / 1048576:.1f} MB "
+                   f"(解压配置: {info['profile']}，已裁剪 {info['pruned_count']} 个文件)")
     else:
         click.echo("❌ 便携式 Chromium 未安装，请运行 'claude-auto-clicker install-chromium'")
         # 检查系统浏览器
@@ -145,18 +162,44 @@ def config(key, value):
         click.echo(f"❌ 设置失败: {e}")
 
 
+def _download_settings(profile=None) -> dict:
+    """读取下载配置，命令行指定的解压配置优先"""
+    settings = dict(config_manager.get_config_value('downloads', {}) or {})
+    if profile:
+        settings['extract_profile'] = profile
+    return settings
+
+
+def _spawn_prefetch(command: str, profile=None):
+    """在后台进程中预取新版本（不切换当前版本），立即返回"""
+    args = [sys.executable, "-m", "claude_auto_clicker.cli", command, "--prefetch", "--force"]
+    if profile:
+        args += ["--profile", profile]
+    process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True,
+                               cwd=str(Path(__file__).parent.parent))
+    click.echo(f"📦 已在后台预取新版本 (pid {process.pid})，完成后使用 'claude-auto-clicker browser-versions --activate' 切换")
+
+
 @cli.command(name='install-chromium')
 @click.option('--force', is_flag=True, help='强制重新下载，即使已安装')
-def install_chromium(force):
+@click.option('--profile', type=click.Choice(EXTRACT_PROFILES), default=None,
+              help='解压配置（headless-minimal 只保留一个语言包等必要文件）')
+@click.option('--prefetch', is_flag=True, help='只下载到版本目录，不切换当前版本')
+@click.option('--background', is_flag=True, help='在后台进程中预取（隐含 --prefetch）')
+def install_chromium(force, profile, prefetch, background):
     """下载并安装便携式 Chromium 浏览器"""
+    if background:
+        _spawn_prefetch('install-chromium', profile)
+        return
     project_root = Path(__file__).parent.parent
-    downloader = ChromiumDownloader(project_root)
+    downloader = ChromiumDownloader(project_root, _download_settings(profile))
     
     click.echo("便携式 Chromium 安装器")
     click.echo("=" * 30)
     
     # 检查是否已安装
-    if downloader.is_installed() and not force:
+    if downloader.is_installed() and not force and not prefetch:
         chromium_path = downloader.get_chromium_path()
         click.echo(f"✅ 便携式 Chromium 已安装: {chromium_path}")
         
@@ -166,7 +209,10 @@ def install_chromium(force):
     click.echo("正在下载 Chromium，这可能需要几分钟...")
     
     try:
-        if downloader.download_and_install():
+        if downloader.download_and_install(activate=not prefetch):
+            if prefetch:
+                click.echo("📦 新版本已预取，当前版本未切换")
+                return
             chromium_path = downloader.get_chromium_path()
             click.echo(f"✅ Chromium 安装成功: {chromium_path}")
             click.echo("现在可以使用 'claude-auto-clicker run' 测试自动点击功能")
@@ -195,15 +241,22 @@ def uninstall_chromium():
 
 @cli.command(name='download-browsers')
 @click.option('--force', is_flag=True, help='强制重新下载，即使已安装')
-def download_browsers(force):
+@click.option('--profile', type=click.Choice(EXTRACT_PROFILES), default=None,
+              help='Chromium 解压配置（headless-minimal 只保留一个语言包等必要文件）')
+@click.option('--prefetch', is_flag=True, help='只下载到版本目录，不切换当前版本')
+@click.option('--background', is_flag=True, help='在后台进程中预取（隐含 --prefetch）')
+def download_browsers(force, profile, prefetch, background):
     """下载浏览器组件到项目目录（Chromium + ChromeDriver）"""
+    if background:
+        _spawn_prefetch('download-browsers', profile)
+        return
     project_root = Path(__file__).parent.parent
-    downloader = BrowserDownloader(project_root)
+    downloader = BrowserDownloader(project_root, _download_settings(profile))
 
     click.echo("🚀 浏览器组件下载器")
     click.echo("=" * 40)
 
-    if downloader.is_installed() and not force:
+    if downloader.is_installed() and not force and not prefetch:
         chromium_path = downloader.get_chromium_path()
         driver_path = downloader.get_chromedriver_path()
         click.echo("✅ 浏览器组件已安装")
@@ -216,7 +269,10 @@ def download_browsers(force):
     click.echo("这可能需要几分钟时间，请耐心等待...")
 
     try:
-        if downloader.download_all():
+        if downloader.download_all(activate=not prefetch):
+            if prefetch:
+                click.echo("\n📦 新版本已预取，当前版本未切换")
+                return
             click.echo("\n🎉 下载完成！")
             click.echo("现在其他人 git clone 项目后就可以直接使用了")
         else:
@@ -225,6 +281,195 @@ def download_browsers(force):
         click.echo(f"\n❌ 下载过程中发生错误: {e}")
 
 
+@cli.command(name='browser-versions')
+@click.option('--component', type=click.Choice(['chromium', 'drivers']), default='chromium',
+              help='要管理的组件')
+@click.option('--activate', 'activate_key', metavar='VERSION', default=None,
+              help='切换到指定版本（试启动通过后原子切换）；传 latest 表示最新安装的版本')
+@click.option('--gc', 'run_gc', is_flag=True, help='回收没有进程使用的旧版本')
+def browser_versions(component, activate_key, run_gc):
+    """查看、切换和回收已安装的浏览器组件版本"""
+    project_root = Path(__file__).parent.parent
+    store = VersionStore(project_root / "browsers" / component)
+    versions = store.list_versions()
+
+    if activate_key:
+        if activate_key == 'latest' and versions:
+            activate_key = versions[-1]['key']
+        if not store.is_complete(activate_key):
+            click.echo(f"❌ 版本不存在: {activate_key}")
+            return
+        names = {'chromium': ['chrome', 'chromium', 'chromium-browser', 'chrome.exe'],
+                 'drivers': ['chromedriver', 'chromedriver.exe']}[component]
+        exe = next((p for p in store.version_dir(activate_key).rglob('*') if p.name in names), None)
+        if not exe or not smoke_test(exe):
+            click.echo(f"❌ 版本 {activate_key} 试启动失败，未切换")
+            return
+        store.activate(activate_key)
+        click.echo(f"✅ 已切换到版本: {activate_key}")
+        run_gc = True
+
+    if run_gc:
+        removed = store.gc()
+        click.echo(f"🧹 已回收 {len(removed)} 个旧版本" + (f": {', '.join(removed)}" if removed else ""))
+        versions = store.list_versions()
+
+    if not versions:
+        click.echo(f"{component} 没有版本化安装")
+        return
+    click.echo(f"{component} 已安装版本")
+    click.echo("=" * 30)
+    for version in versions:
+        marker = "👉" if version['current'] else "  "
+        leases = f"，{version['leases']} 个进程使用中" if version['leases'] else ""
+        click.echo(f"{marker} {version['key']} ({version.get('profile') or 'full'}{leases})")
+
+
+@cli.command(name='bench-browser')
+@click.option('--profile', 'profiles', multiple=True, default=None,
+              help='要测量的启动配置（可多次指定，默认全部）')
+@click.option('--runs', '-n', default=3, type=int, help='每个配置的启动次数')
+@click.option('--settle', default=3.0, type=float, help='启动后等待多久再测量常驻内存（秒）')
+def bench_browser(profiles, runs, settle):
+    """测量各启动配置的启动耗时与常驻内存，便于按主机选择"""
+    import statistics
+    # 延迟导入，避免在非相关命令时提前加载 selenium
+    from webdriver_manager.chrome import ChromeDriverManager
+    from .core.auto_clicker import AutoClicker
+    from .core.browser_profiles import LAUNCH_PROFILES, measure_launch
+
+    unknown = [p for p in profiles if p not in LAUNCH_PROFILES]
+    if unknown:
+        click.echo(f"❌ 未知的启动配置: {', '.join(unknown)}（可选: {', '.join(LAUNCH_PROFILES)}）")
+        return
+
+    clicker = AutoClicker()
+    chromium_path = clicker._get_chromium_path()
+    driver_path = ChromeDriverManager().install()
+    browser_config = clicker.config.setdefault('browser', {})
+
+    click.echo(f"浏览器启动基准（每个配置 {runs} 次）")
+    click.echo("=" * 50)
+    for profile in profiles or LAUNCH_PROFILES:
+        browser_config['launch_profile'] = profile
+        options = clicker._launch_options(chromium_path)
+        startups, rss_values = [], []
+        try:
+            for _ in range(runs):
+                startup, rss = measure_launch(options, driver_path, settle)
+                startups.append(startup)
+                if rss is not None:
+                    rss_values.append(rss)
+        except Exception as e:
+            click.echo(f"❌ {profile}: 启动失败: {e}")
+            continue
+        rss_text = (f"{statistics.median(rss_values) / 1048576:.0f} MB" if rss_values
+                    else "不可用（需要 /proc）")
+        click.echo(f"🚀 {profile:<8} 启动中位数 {statistics.median(startups) * 1000:.0f} ms，"
+                   f"常驻内存 {rss_text}")
+    click.echo(f"\n使用 'claude-auto-clicker config browser.launch_profile <配置>' 选择启动配置")
+
+
+_STATS_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400, '30d': 30 * 86400}
+
+
+def _format_ms(value) -> str:
+    return "-" if value is None else f"{value / 1000:.1f}s"
+
+
+@cli.command()
+@click.option('--window', '-w', 'windows', multiple=True, type=click.Choice(list(_STATS_WINDOWS)),
+              help='统计时间窗口（可多次指定，默认 24h 与 7d）')
+@click.option('--account', '-a', default=None, help='只统计指定账户')
+@click.option('--compact', is_flag=True, help='删除超过保留期的记录并回收数据库空间')
+def stats(windows, account, compact):
+    """查看运行统计：成功率、耗时分位数、登录频率与失败分类"""
+    from .utils.run_history import PHASE_COLUMNS, run_history
+
+    config_manager.load_config()
+    if compact:
+        removed = run_history.compact()
+        click.echo(f"🧹 已删除 {removed} 条过期记录并回收空间: {run_history.db_path}")
+
+    for window in windows or ('24h', '7d'):
+        data = run_history.window_stats(_STATS_WINDOWS[window], account)
+        click.echo(f"\n📊 最近 {window}" + (f"（账户 {account}）" if account else ""))
+        click.echo("=" * 40)
+        if not data['runs']:
+            click.echo("暂无运行记录")
+            continue
+        click.echo(f"运行次数: {data['runs']}，成功率 {data['success_rate']:.1%}，"
+                   f"触发登录 {data['login_rate']:.1%}")
+        if data['avg_rss']:
+            click.echo(f"浏览器平均内存: {data['avg_rss'] / 1048576:.0f} MB")
+        if data['cache_hit_ratio'] is not None:
+            click.echo(f"HTTP 缓存命中率: {data['cache_hit_ratio']:.1%}，"
+                       f"平均传输 {data['avg_transfer_bytes'] / 1024:.0f} KB")
+        for column in ['duration_ms'] + PHASE_COLUMNS:
+            p = data['percentiles'][column]
+            label = '总耗时' if column == 'duration_ms' else column[:-3]
+            click.echo(f"  {label:<9} p50 {_format_ms(p[0.5]):>7}  p95 {_format_ms(p[0.95]):>7}  "
+                       f"p99 {_format_ms(p[0.99]):>7}")
+        if data['failures']:
+            click.echo("失败分类: " + "，".join(f"{name or '未知'} × {count}" for name, count in data['failures']))
+
+
+def _parse_levels(value: str) -> list:
+    try:
+        levels = sorted({int(item) for item in value.split(',') if item.strip()})
+    except ValueError:
+        raise click.BadParameter("应为逗号分隔的正整数，如 1,2,4,8")
+    if not levels or levels[0] <= 0:
+        raise click.BadParameter("应为逗号分隔的正整数，如 1,2,4,8")
+    return levels
+
+
+@cli.command(name='load-test')
+@click.option('--accounts', '-n', 'levels', default='1,2,4,8', show_default=True,
+              help='逐级测试的模拟账户数（逗号分隔）')
+@click.option('--duration', default=120.0, type=float, show_default=True, help='每一级的持续时间（秒）')
+@click.option('--interval', default=60.0, type=float, show_default=True, help='每个账户的运行间隔（秒）')
+@click.option('--latency', default=200.0, type=float, show_default=True, help='模拟站点的页面延迟（毫秒）')
+@click.option('--workers', default=0, type=int, help='并发运行数上限，默认按 CPU 核数')
+@click.option('--lag-tolerance', default=5.0, type=float, show_default=True,
+              help='调度延迟超过该秒数视为错过计划')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default=None, help='容量曲线 JSON 输出路径')
+@click.option('--compare', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='与之前保存的容量曲线对比')
+def load_test(levels, duration, interval, latency, workers, lag_tolerance, output, compare):
+    """用本机模拟站点逐级增加账户数，测量单机可承载的账户容量"""
+    import json
+    from .core.loadtest import run_ramp
+
+    levels = _parse_levels(levels)
+    baseline = None
+    if compare:
+        with open(compare, 'r', encoding='utf-8') as f:
+            baseline = {level['accounts']: level for level in json.load(f).get('levels', [])}
+
+    def show(level):
+        rss = f"{level['peak_rss'] / 1048576:.0f} MB" if level['peak_rss'] else "-"
+        line = (f"👥 {level['accounts']:>3} 个账户  吞吐 {level['throughput_per_min']:>6.1f}/分钟  "
+                f"延迟 p95 {level['lag_p95'] or 0:>5.1f}s  错过计划 {level['missed_rate'] or 0:>5.1%}  "
+                f"CPU {level['cpu_percent'] or 0:>5.0f}%  峰值内存 {rss:>7}  失败率 {level['failure_rate'] or 0:.1%}")
+        previous = baseline.get(level['accounts']) if baseline else None
+        if previous:
+            line += (f"  (对比: 吞吐 {level['throughput_per_min'] - previous['throughput_per_min']:+.1f}，"
+                     f"延迟 p95 {(level['lag_p95'] or 0) - (previous['lag_p95'] or 0):+.1f}s)")
+        click.echo(line)
+
+    click.echo(f"负载测试（每级 {duration:.0f} 秒，间隔 {interval:.0f} 秒，页面延迟 {latency:.0f} ms）")
+    click.echo("=" * 50)
+    curve = run_ramp(levels, config_manager.load_config(), duration, interval, latency / 1000,
+                     workers, lag_tolerance, progress=show)
+    click.echo(f"\n📌 单机容量: {curve['capacity']} 个账户（调度延迟 p95 ≤ {lag_tolerance:.0f}s 且失败率 ≤ "
+               f"{curve['params']['max_failure_rate']:.0%}）")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(curve, f, indent=2, ensure_ascii=False)
+        click.echo(f"💾 容量曲线已保存: {output}")
+
+
 @cli.command(name='uninstall-browsers')
 def uninstall_browsers():
     """卸载项目内的浏览器组件（删除 browsers 目录）"""
@@ -1,6 +1,7 @@
 """
 配置管理模块
 """
+import copy
 import json
 import os
 from pathlib import Path
@@ -8,6 +9,7 @@ from typing import Dict, Any, Optional
 
 from .utils.encryption import PasswordEncryption
 from .utils.logger import logger
+from .utils.run_history import run_history
 
 
 class ConfigManager:
@@ -25,12 +27,98 @@ class ConfigManager:
         "click": {
             "button_xpath": "/html/body/div[2]/div/div[4]/main/div/div/div/div[2]/div[2]/div[1]/div[2]/div/div[5]/button",
             "wait_timeout": 20,
-            "click_interval": 300  # 5分钟间隔（秒）
+            "click_interval": 300,  # 5分钟间隔（秒）
+            "strategy": "webdriver",  # webdriver：逐步轮询定位后点击；script：页面内等待并点击（一次往返）
+            "actions": []  # 动作流水线（navigate/wait/click/read/assert/if），配置后代替 button_xpath
         },
         "browser": {
             "headless": False,
-            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "launch_profile": "default",  # 启动配置：default / lean（低内存、快速启动，始终无头）
+            "page_load_strategy": "eager"  # 页面加载策略：normal（等待 load）/ eager（DOM 就绪即返回）/ none
+        },
+        "deadline": {
+            "enabled": True,  # 为每次运行设定整体时限与分阶段预算
+            "total": 120,  # 单次运行的整体时限（秒）
+            "budgets": {  # 各阶段预算（秒），实际可用时间不超过整体剩余时间
+                "preflight": 10,
+                "launch": 40,
+                "navigate": 30,
+                "login": 40,
+                "click": 30
+            }
+        },
+        "logging": {
+            "max_bytes": 10485760,  # 单个日志文件上限 10MB
+            "rotate_when": "midnight",  # midnight / hourly / none
+            "backup_count": 14,  # 保留的轮转分段数量
+            "compress": True,  # 轮转分段 gzip 压缩
+            "format": "text"  # 文件日志格式：text / json（每行一个 JSON 事件）
+        },
+        "downloads": {
+            "segments": 4,  # 大文件并行分段数
+            "max_bandwidth_kbps": 0,  # 下载带宽上限（KB/s），0 表示不限速
+            "retries": 3,  # 中断后断点续传的重试次数
+            "cache_dir": "",  # 共享制品缓存目录，留空使用 ~/.cache/claude-auto-clicker
+            "extract_workers": 0,  # 并行解压线程数，0 表示按 CPU 核数
+            "extract_profile": "full",  # 解压配置：full / headless-minimal
+            "extract_locale": "en-US",  # headless-minimal 保留的语言包
+            "mirrors": {  # 追加的下载镜像（优先于内置镜像，仅对已固定哈希的制品生效），地址中的 {path} 替换为制品路径
+                "chromium": [],
+                "chromedriver": []
+            },
+            "probe_mirrors": True,  # 下载前探测各镜像，选择预计最快的（仅对已固定哈希的制品生效）
+            "pinned_sha256": {}  # 固定制品哈希（"chromium:Linux_x64/1108766/chrome-linux.zip": sha256），未知哈希时只用主镜像
+        },
+        "schedule": {
+            "enabled": False,  # 根据页面冷却状态自适应安排下一次运行
+            "cooldown_selector": "",  # 冷却倒计时/下次可用时间所在元素的 CSS 选择器
+            "cooldown_regex": "",  # 从元素文本（或整页文本）中提取冷却信息的正则，有分组时取第一组
+            "min_interval": 60,  # 自适应间隔下限（秒）
+            "max_interval": 3600,  # 自适应间隔上限（秒）
+            "margin": 5  # 在恢复可用时间之后再等待的余量（秒）
+        },
+        "preflight": {
+            "enabled": True,  # 启动浏览器前先用 HEAD 请求确认目标站点可达
+            "timeout": 3,  # 预检连接/读取超时（秒）
+            "retry_interval": 30,  # 不可达时首次重试的等待时间（秒），连续不可达时翻倍
+            "max_backoff": 600  # 不可达时重试等待的上限（秒）
+        },
+        "profile_dir": {
+            "tmpfs": False,  # 每次运行的浏览器配置目录放在 tmpfs 上，减少磁盘小文件写入
+            "root": "/dev/shm",  # tmpfs 挂载点
+            "min_free_mb": 256  # tmpfs 剩余空间低于该值时回退到磁盘临时目录
+        },
+        "http_cache": {
+            "enabled": False,  # 为每个账户保留持久化 HTTP 缓存（不含 Cookie 与登录状态）
+            "dir": "",  # 缓存根目录，留空使用 data/http_cache
+            "max_mb": 100,  # 每个账户的缓存上限（MB）
+            "trim_interval": 3600  # 检查并修剪缓存的最短间隔（秒）
+        },
+        "history": {
+            "enabled": True,  # 每次运行写入 data/run_history.db
+            "batch_size": 10,  # 累积多少条记录后批量写入
+            "flush_interval": 60,  # 最长多久写入一次（秒）
+            "retention_days": 90  # 运行记录保留天数，0 表示永久保留
+        },
+        "wrapper": {
+            "idle_timeout": 900,  # claude 会话空闲多久后暂停点击（秒），0 表示不暂停
+            "activity_poll": 5  # 活动采样间隔（秒）
+        },
+        "worker": {
+            "isolate": True,  # 在独立的受监管子进程中点击（False 时在包装器进程内的线程中运行）
+            "nice": 10,  # 点击进程及浏览器的 nice 增量
+            "ionice": "idle",  # I/O 调度类别：idle / best-effort / none（仅 Linux）
+            "rlimit_as_mb": 0,  # 虚拟地址空间上限（MB），0 表示不限制；Chromium 会预留大量地址空间，过小将无法启动
+            "max_rss_mb": 1536,  # 进程树常驻内存上限（MB），超过后重启点击进程，0 表示不检查
+            "restart_delay": 5,  # 异常后首次重启的等待时间（秒），连续异常时翻倍
+            "max_restarts": 5  # 连续异常重启次数上限
+        },
+        "execution": {
+            "mode": "single",  # single：每个 tick 一个浏览器；multiplex：accounts 中的账户共用一个浏览器，各自隔离上下文
+            "max_workers": 0  # asyncio 接口共享线程池大小（同时进行的运行数），0 表示 min(4, CPU 核数)
+        },
+        "accounts": []  # multiplex 模式下的账户列表 [{"username": ..., "password": ...}]，密码加密保存
     }
     
     def __init__(self):
@@ -53,7 +141,7 @@ class ConfigManager:
         
         if not self.config_file.exists():
             logger.info("配置文件不存在，创建默认配置")
-            self._config = self.DEFAULT_CONFIG.copy()
+            self._config = copy.deepcopy(self.DEFAULT_CONFIG)
             self.save_config()
             return self._config
         
@@ -62,20 +150,24 @@ class ConfigManager:
                 self._config = json.load(f)
             
             # 解密密码
-            if self._config.get('login', {}).get('password'):
-                encrypted_password = self._config['login']['password']
-                try:
-                    self._config['login']['password'] = self.encryptor.decrypt(encrypted_password)
-                except ValueError as e:
-                    logger.error(f"解密密码失败: {e}")
-                    self._config['login']['password'] = ""
+            for entry in [self._config.get('login', {})] + self._config.get('accounts', []):
+                if entry.get('password'):
+                    try:
+                        entry['password'] = self.encryptor.decrypt(entry['password'])
+                    except ValueError as e:
+                        logger.error("解密密码失败: %s", e)
+                        entry['password'] = ""
+            
+            # 应用日志轮转设置
+            logger.configure(self._config.get('logging', {}))
+            run_history.configure(self._config.get('history', {}))
             
             logger.info("配置加载成功")
             return self._config
             
         except (json.JSONDecodeError, FileNotFoundError) as e:
-            logger.error(f"加载配置失败: {e}")
-            self._config = self.DEFAULT_CONFIG.copy()
+            logger.error("加载配置失败: %s", e)
+            self._config = copy.deepcopy(self.DEFAULT_CONFIG)
             return self._config
     
     def save_config(self):
@@ -83,20 +175,20 @@ class ConfigManager:
         if self._config is None:
             return
         
-        # 创建配置副本用于保存
-        config_to_save = self._config.copy()
+        # 创建配置副本用于保存（深拷贝，加密不影响内存中的明文配置）
+        config_to_save = copy.deepcopy(self._config)
         
         # 加密密码
-        if config_to_save.get('login', {}).get('password'):
-            password = config_to_save['login']['password']
-            config_to_save['login']['password'] = self.encryptor.encrypt(password)
+        for entry in [config_to_save.get('login', {})] + config_to_save.get('accounts', []):
+            if entry.get('password'):
+                entry['password'] = self.encryptor.encrypt(entry['password'])
         
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config_to_save, f, indent=2, ensure_ascii=False)
             logger.info("配置保存成功")
         except Exception as e:
-            logger.error(f"保存配置失败: {e}")
+            logger.error("保存配置失败: %s", e)
     
     def set_login_credentials(self, username: str, password: str):
         """设置登录凭据"""
@@ -113,6 +205,33 @@ class ConfigManager:
         password = config.get('login', {}).get('password', '')
         return username, password
     
+    def set_account_credentials(self, username: str, password: str):
+        """添加或更新 multiplex 模式的账户"""
+        config = self.load_config()
+        accounts = config.setdefault('accounts', [])
+        for entry in accounts:
+            if entry.get('username') == username:
+                entry['password'] = password
+                break
+        else:
+            accounts.append({"username": username, "password": password})
+        self.save_config()
+        logger.info("账户 %s 已更新（共 %s 个账户）", username, len(accounts))
+    
+    def get_accounts(self, config: Dict[str, Any] = None) -> list[tuple[str, str]]:
+        """
+        multiplex 模式的账户列表；未配置时使用主登录凭据
+        :param config: 从指定的配置中读取（如 AutoClicker 使用的注入配置），默认读取 data/config.json
+        """
+        if config is None:
+            config = self.load_config()
+        accounts = [(entry.get('username', ''), entry.get('password', ''))
+                    for entry in config.get('accounts', []) if entry.get('username')]
+        login = config.get('login', {})
+        if not accounts and login.get('username') and login.get('password'):
+            accounts = [(login['username'], login['password'])]
+        return accounts
+    
     def is_configured(self) -> bool:
         """检查是否已配置登录信息"""
         username, password = self.get_login_credentials()
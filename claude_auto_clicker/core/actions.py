@@ -0,0 +1,275 @@
+"""
+声明式动作流水线（click.actions）
+
+click 配置只支持一个 button_xpath，需要点两个按钮、或先读取数值再决定是否点击的账户，
+只能拆成多次运行，每次都要重新启动浏览器、加载页面并登录。配置 click.actions 后，
+登录完成后在同一个浏览器会话、同一次页面加载中依次执行这些步骤：
+
+    "actions": [
+      {"type": "click", "xpath": "//button[@id='claim']"},
+      {"type": "read", "xpath": "//span[@class='balance']", "save_as": "balance", "regex": "([\\d.]+)"},
+      {"type": "if", "condition": {"var": "balance", "gte": 10},
+       "then": [{"type": "click", "xpath": "//button[@id='withdraw']"}]},
+      {"type": "assert", "condition": {"exists": "//div[@class='success']"}}
+    ]
+
+- navigate：打开 url（相对地址基于当前页面）
+- wait：等待 xpath 出现（或 visible 为 true 时等待可见），或固定等待 seconds 秒
+- click：等待 xpath 可点击并点击（沿用 click.strategy），可选 pause 为点击后的停顿
+- read：读取元素文本（或 attribute 属性），可用 regex 提取，存入变量 save_as
+- assert：条件不成立时流水线失败
+- if：按 condition 执行 then 或 else 中的步骤
+条件写法：{"exists": xpath}，或 {"var": 名称, 以及 equals / contains / matches / gte / lte 之一}，
+可加 "not": true 取反。每个步骤可设 name（日志与失败分类中使用）、timeout，
+optional 为 true 时失败只记录不中断。每个步骤都会计时并输出 action 事件。
+"""
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ..utils.logger import logger
+from .script_click import script_click
+
+ACTION_TYPES = ("navigate", "wait", "click", "read", "assert", "if")
+
+_COMPARISONS = ("equals", "contains", "matches", "gte", "lte")
+
+
+class ActionFailed(Exception):
+    """步骤执行失败"""
+
+    def __init__(self, step: str, reason: str):
+        self.step = step
+        self.reason = reason
+        super().__init__(f"{step}: {reason}")
+
+
+class _StepError(Exception):
+    """步骤内部的失败（由 _run_step 加上步骤名转换为 ActionFailed）"""
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value: Any, what: str) -> float:
+    """把配置中的数值转换为 float，无法转换时按步骤失败处理"""
+    number = _number(value)
+    if number is None:
+        raise _StepError(f"{what} 不是数字: {value!r}")
+    return number
+
+
+class ActionPipeline:
+    """在当前页面上依次执行动作"""
+
+    def __init__(self, driver, actions: List[Dict], strategy: str = "webdriver",
+                 default_timeout: float = 20, budget: Callable[[float], float] = None):
+        """
+        :param strategy: click 步骤使用的点击策略（webdriver / script）
+        :param default_timeout: 未指定 timeout 的步骤的等待上限
+        :param budget: 按运行时限收紧等待上限的函数，默认不限制
+        """
+        self.driver = driver
+        self.actions = list(actions or [])
+        self.strategy = strategy
+        self.default_timeout = default_timeout
+        self.budget = budget or (lambda seconds: seconds)
+        self.variables: Dict[str, Any] = {}
+        self.results: List[Dict] = []
+
+    @staticmethod
+    def validate(actions: List[Dict]) -> List[str]:
+        """检查配置，返回错误说明列表"""
+        errors = []
+
+        def visit(steps, prefix):
+            for index, step in enumerate(steps or [], 1):
+                label = f"{prefix}{index}"
+                kind = step.get("type") if isinstance(step, dict) else None
+                if kind not in ACTION_TYPES:
+                    errors.append(f"步骤 {label}: 未知类型 {kind!r}")
+                    continue
+                if kind in ("click", "read") and not step.get("xpath"):
+                    errors.append(f"步骤 {label}: {kind} 需要 xpath")
+                if kind == "navigate" and not step.get("url"):
+                    errors.append(f"步骤 {label}: navigate 需要 url")
+                if kind == "wait" and not step.get("xpath") and step.get("seconds") is None:
+                    errors.append(f"步骤 {label}: wait 需要 xpath 或 seconds")
+                if kind == "read" and not step.get("save_as"):
+                    errors.append(f"步骤 {label}: read 需要 save_as")
+                if kind in ("assert", "if") and not isinstance(step.get("condition"), dict):
+                    errors.append(f"步骤 {label}: {kind} 需要 condition")
+                numbers = {key: step[key] for key in ("seconds", "pause", "timeout") if key in step}
+                if isinstance(step.get("condition"), dict):
+                    numbers.update({key: step["condition"][key] for key in ("gte", "lte")
+                                    if key in step["condition"]})
+                for key, value in numbers.items():
+                    if _number(value) is None:
+                        errors.append(f"步骤 {label}: {key} 需要数字，当前为 {value!r}")
+                patterns = [step.get("regex")]
+                if isinstance(step.get("condition"), dict):
+                    patterns.append(step["condition"].get("matches"))
+                for pattern in filter(None, patterns):
+                    try:
+                        re.compile(str(pattern))
+                    except re.error as e:
+                        errors.append(f"步骤 {label}: 正则 {pattern!r} 无效（{e}）")
+                if kind == "if":
+                    visit(step.get("then"), f"{label}.then.")
+                    visit(step.get("else"), f"{label}.else.")
+
+        visit(actions, "")
+        return errors
+
+    def run(self) -> bool:
+        """执行全部步骤；失败时抛出 ActionFailed"""
+        errors = self.validate(self.actions)
+        if errors:
+            raise ActionFailed("config", "；".join(errors))
+        self._run_steps(self.actions, "")
+        return True
+
+    def _run_steps(self, steps: List[Dict], prefix: str):
+        for index, step in enumerate(steps, 1):
+            label = step.get("name") or f"{prefix}{index}:{step['type']}"
+            self._run_step(step, label, f"{prefix}{index}")
+
+    def _run_step(self, step: Dict, label: str, position: str):
+        kind = step["type"]
+        start = time.monotonic()
+        record = {"step": label, "type": kind, "outcome": "ok"}
+        try:
+            value = getattr(self, f"_do_{kind}")(step, position)
+            if value is not None:
+                record["value"] = value
+        except ActionFailed as e:
+            # if 分支内的步骤失败：失败分类保留内层步骤名
+            record["outcome"] = "failed"
+            record["reason"] = str(e)
+            if not step.get("optional"):
+                raise
+            logger.warning("可选步骤 %s 失败，继续执行: %s", label, e)
+        except (_StepError, WebDriverException, re.error) as e:
+            # 超时、元素未找到、被遮挡、元素失效等都按步骤失败处理（可选步骤不中断）
+            reason = str(e) if isinstance(e, _StepError) else type(e).__name__
+            record["outcome"] = "failed"
+            record["reason"] = reason
+            if not step.get("optional"):
+                raise ActionFailed(label, reason) from None
+            logger.warning("可选步骤 %s 失败，继续执行: %s", label, reason)
+        except Exception as e:
+            # 意外异常照常向上抛出，但不能把该步骤记为成功
+            record["outcome"] = "failed"
+            record["reason"] = type(e).__name__
+            raise
+        finally:
+            record["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+            self.results.append(record)
+            logger.event("action", outcome=record["outcome"], duration=time.monotonic() - start,
+                         step=label, type=kind, value=record.get("value"))
+
+    def _timeout(self, step: Dict) -> float:
+        return self.budget(_float(step.get("timeout", self.default_timeout), "timeout"))
+
+    # ---- 步骤 ----
+
+    def _do_navigate(self, step: Dict, position: str):
+        url = urljoin(self.driver.current_url, step["url"])
+        self.driver.set_page_load_timeout(self._timeout(step))
+        self.driver.get(url)
+        logger.info("➡️  打开页面: %s", url)
+
+    def _do_wait(self, step: Dict, position: str):
+        if not step.get("xpath"):
+            time.sleep(self.budget(_float(step["seconds"], "seconds")))
+            return None
+        condition = EC.visibility_of_element_located if step.get("visible") else EC.presence_of_element_located
+        WebDriverWait(self.driver, self._timeout(step)).until(condition((By.XPATH, step["xpath"])))
+        return None
+
+    def _do_click(self, step: Dict, position: str):
+        xpath = step["xpath"]
+        timeout = self._timeout(step)
+        if self.strategy == "script":
+            result = script_click(self.driver, xpath, timeout)
+            if not result["ok"]:
+                state = "已出现" if result.get("located_ms") is not None else "未找到"
+                raise _StepError(f"{timeout:.0f} 秒内元素未变为可点击（{state}）")
+        else:
+            button = WebDriverWait(self.driver, timeout).until(EC.element_to_be_clickable((By.XPATH, xpath)))
+            button.click()
+        logger.info("🖱️  已点击: %s", step.get("name") or xpath)
+        if step.get("pause"):
+            time.sleep(self.budget(_float(step["pause"], "pause")))
+        return None
+
+    def _do_read(self, step: Dict, position: str):
+        element = WebDriverWait(self.driver, self._timeout(step)).until(
+            EC.presence_of_element_located((By.XPATH, step["xpath"])))
+        attribute = step.get("attribute")
+        value = (element.get_attribute(attribute) if attribute else element.text) or ""
+        value = value.strip()
+        if step.get("regex"):
+            match = re.search(step["regex"], value)
+            if not match:
+                raise _StepError(f"内容 {value[:50]!r} 不匹配 {step['regex']!r}")
+            value = match.group(1) if match.groups() else match.group(0)
+        self.variables[step["save_as"]] = value
+        logger.info("📖 读取 %s = %s", step["save_as"], value)
+        return value
+
+    def _do_assert(self, step: Dict, position: str):
+        held, description = self._evaluate(step["condition"])
+        if not held:
+            raise _StepError(f"条件不成立: {description}")
+        return None
+
+    def _do_if(self, step: Dict, position: str):
+        held, description = self._evaluate(step["condition"])
+        branch = "then" if held else "else"
+        logger.info("条件 %s %s，执行 %s 分支", description, "成立" if held else "不成立", branch)
+        self._run_steps(step.get(branch) or [], f"{position}.{branch}.")
+        return branch
+
+    # ---- 条件 ----
+
+    def _evaluate(self, condition: Dict):
+        """计算条件，返回 (是否成立, 说明)"""
+        if "exists" in condition:
+            found = bool(self.driver.find_elements(By.XPATH, condition["exists"]))
+            held, description = found, f"exists {condition['exists']}"
+        else:
+            name = condition.get("var")
+            if name not in self.variables:
+                raise _StepError(f"变量 {name} 未读取（需要先执行 read 步骤）")
+            value = self.variables[name]
+            operator = next((op for op in _COMPARISONS if op in condition), None)
+            if operator is None:
+                raise _StepError(f"条件需要 {' / '.join(_COMPARISONS)} 之一")
+            expected = condition[operator]
+            if operator == "equals":
+                held = str(value) == str(expected)
+            elif operator == "contains":
+                held = str(expected) in str(value)
+            elif operator == "matches":
+                held = re.search(str(expected), str(value)) is not None
+            else:
+                number = _number(value)
+                if number is None:
+                    raise _StepError(f"变量 {name}={value!r} 不是数字")
+                limit = _float(expected, operator)
+                held = number >= limit if operator == "gte" else number <= limit
+            description = f"{name}={value!r} {operator} {expected!r}"
+        if condition.get("not"):
+            return not held, f"not ({description})"
+        return held, description
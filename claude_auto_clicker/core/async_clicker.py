@@ -0,0 +1,120 @@
+"""
+asyncio 接口
+
+供嵌入已有的 asyncio 服务使用：
+
+    async with AsyncAutoClicker(config) as clicker:
+        await clicker.run_once()
+        # 或 await clicker.run_forever()
+
+- Selenium 调用是阻塞的，统一放到一个有界的共享线程池中执行（execution.max_workers），
+  多个账户共用一个事件循环与同一个线程池，并发运行数受线程池大小限制，而不是每个账户一个线程
+- 每个实例同一时间只执行一次运行；取消正在等待的 run_once 时，仍在线程池中排队的运行直接撤销，
+  已开始的运行在阶段边界中止，并由执行它的线程自己关闭浏览器，等它结束后再把取消向上传播，
+  不会遗留仍在操作浏览器的线程
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ..utils.logger import logger
+from .auto_clicker import AutoClicker
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """所有 AsyncAutoClicker 共用的线程池（按 execution.max_workers 创建，0 表示 min(4, CPU 核数)）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from ..config import config_manager
+            workers = int(config_manager.get_config_value('execution.max_workers', 0) or 0)
+            workers = workers or min(4, os.cpu_count() or 1)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-clicker")
+        return _executor
+
+
+class AsyncAutoClicker:
+    """AutoClicker 的 asyncio 封装"""
+
+    def __init__(self, config: Dict[str, Any] = None, executor: ThreadPoolExecutor = None):
+        """
+        :param config: 使用指定的配置（每个账户一份），默认读取 data/config.json
+        :param executor: 执行阻塞调用的线程池，默认使用共享线程池
+        """
+        self.clicker = AutoClicker(config)
+        self._executor = executor
+        self._lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    @property
+    def scheduler(self):
+        return self.clicker.scheduler
+
+    def _run_lock(self) -> asyncio.Lock:
+        # 在事件循环内创建（Python 3.10 之前 Lock 会绑定创建时的事件循环）
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def run_once(self) -> bool:
+        """执行一次点击任务，返回是否成功"""
+        if self._closed:
+            raise RuntimeError("AsyncAutoClicker 已关闭")
+        async with self._run_lock():
+            self.clicker.cancel_event.clear()
+            pending = (self._executor or shared_executor()).submit(self.clicker.perform_single_click)
+            future = asyncio.wrap_future(pending)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 仍在排队的运行直接撤销；已开始的才需要中止并等待
+                if not pending.cancel():
+                    await self._abort(future)
+                raise
+
+    async def _abort(self, future: asyncio.Future):
+        """中止执行中的运行：只设置取消标记，运行在阶段边界结束并在自己的线程中关闭浏览器，等待它退出"""
+        logger.info("运行被取消，等待当前阶段结束并关闭浏览器...")
+        # WebDriver 会话不是线程安全的，不能在其他线程中与运行线程同时关闭
+        self.clicker.cancel()
+        try:
+            await future
+        except Exception:
+            pass
+
+    async def run_forever(self, interval: float = None):
+        """按间隔（或页面冷却状态）持续运行，直到任务被取消"""
+        if interval is None:
+            interval = self.clicker.config.get('click', {}).get('click_interval', 300)
+        logger.info("开始连续点击模式（asyncio），间隔 %s 秒", interval)
+        while True:
+            try:
+                success = await self.run_once()
+                wait_seconds = self.scheduler.next_interval(interval)
+                if success:
+                    logger.info("点击成功，等待 %.0f 秒后继续", wait_seconds)
+                else:
+                    logger.warning("点击失败，等待 %.0f 秒后重试", wait_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("连续点击过程中出错: %s", e)
+                wait_seconds = 30
+            await asyncio.sleep(wait_seconds)
+
+    async def aclose(self):
+        """等待进行中的运行结束并关闭浏览器（可重复调用）"""
+        self._closed = True
+        async with self._run_lock():
+            await asyncio.get_running_loop().run_in_executor(None, self.clicker.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
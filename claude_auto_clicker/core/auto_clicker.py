@@ -7,25 +7,61 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
+import json
 import time
 import datetime
 import os
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Any
 
 from ..config import config_manager
-from ..utils.logger import logger
+from ..utils.logger import RUN_ID, logger
+from ..utils.browser_versions import VersionLease
+from ..utils.preflight import Preflight
+from ..utils.profile_dirs import ProfileDir
+from ..utils.run_history import run_history
+from .actions import ActionFailed, ActionPipeline
+from .browser_profiles import browser_rss, build_options
+from .deadline import RunDeadline
+from .http_cache import HttpCache, resource_stats
 from .login_handler import LoginHandler
+from .scheduler import AdaptiveScheduler
+from .script_click import script_click
+
+
+class RunCancelled(Exception):
+    """运行被取消（AutoClicker.cancel）"""
 
 
 class AutoClicker:
     """自动点击器"""
     
-    def __init__(self):
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        :param config: 使用指定的配置（如负载测试），默认读取 data/config.json
+        """
         self.driver = None
-        self.config = config_manager.load_config()
+        self.config = config if config is not None else config_manager.load_config()
         self.login_handler = None
         self.project_root = Path(__file__).parent.parent.parent
+        # 运行期间持有所用浏览器版本的租约，避免切换后旧版本被回收
+        self._version_lease = None
+        # 根据页面冷却状态安排下一次运行
+        self.scheduler = AdaptiveScheduler(self.config.get('schedule'))
+        # 启动浏览器前的可达性预检（不可达时跳过浏览器并退避重试）
+        self.preflight = Preflight(self.config.get('preflight'))
+        # 当前运行的阶段、登录与错误信息，运行结束后写入运行历史
+        self._run = {"phases": {}, "login_needed": False, "error": None}
+        # 当前运行的时限（deadline.enabled 为 False 时为 None）
+        self._deadline = None
+        # 本次运行的浏览器配置目录（profile_dir.tmpfs 启用时）
+        self._profile_dir = None
+        # 置位后在阶段边界中止运行（由其他线程调用 cancel）
+        self.cancel_event = threading.Event()
     
     def _get_chromium_path(self) -> str:
         """获取 Chromium 浏览器路径，优先使用项目内的版本"""
@@ -35,10 +71,10 @@ class AutoClicker:
             downloader = ChromiumDownloader(self.project_root)
             portable_path = downloader.get_chromium_path()
             if portable_path and portable_path.exists() and os.access(portable_path, os.X_OK):
-                logger.info(f"✅ 找到便携式 Chromium: {portable_path}")
+                logger.info("✅ 找到便携式 Chromium: %s", portable_path)
                 return str(portable_path)
         except Exception as e:
-            logger.debug(f"便携式 Chromium 检测失败: {e}")
+            logger.debug("便携式 Chromium 检测失败: %s", e)
         
         # 2. 手动检查项目内的常见路径
         local_chromium_paths = [
@@ -51,7 +87,7 @@ class AutoClicker:
         
         for path in local_chromium_paths:
             if path.exists() and os.access(path, os.X_OK):
-                logger.info(f"✅ 找到项目内 Chromium: {path}")
+                logger.info("✅ 找到项目内 Chromium: %s", path)
                 return str(path)
         
         # 3. 检查系统安装的 Chromium
@@ -64,63 +100,59 @@ class AutoClicker:
         
         for path in system_chromium_paths:
             if os.path.exists(path) and os.access(path, os.X_OK):
-                logger.info(f"✅ 找到系统 Chromium: {path}")
+                logger.info("✅ 找到系统 Chromium: %s", path)
                 return path
         
         logger.warning("❌ 未找到可用的 Chromium 浏览器")
         return None
     
-    def _setup_browser(self) -> webdriver.Chrome:
-        """设置浏览器"""
-        options = webdriver.ChromeOptions()
-        
-        # 从配置读取浏览器设置
+    def _launch_options(self, binary_location: str = None) -> webdriver.ChromeOptions:
+        """按配置的启动配置获取（缓存的）浏览器选项"""
         browser_config = self.config.get('browser', {})
         
-        if browser_config.get('headless', False):
-            options.add_argument("--headless")
+        # 精简解压配置只保留了一个语言包，显式指定界面语言避免找不到资源
+        download_config = self.config.get('downloads', {})
+        lang = None
+        if download_config.get('extract_profile', 'full') != 'full':
+            lang = download_config.get('extract_locale', 'en-US')
         
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")  # 解决共享内存问题
-        
-        user_agent = browser_config.get('user_agent')
-        if user_agent:
-            options.add_argument(f"user-agent='{user_agent}'")
+        # 每个账户独立的持久化 HTTP 缓存（不含 Cookie 与登录状态）
+        http_settings = self.config.get('http_cache') or {}
+        if http_settings.get('enabled') and self.config.get('execution', {}).get('mode') == 'multiplex':
+            # 多账户模式的隔离上下文是无痕的，不读写磁盘缓存，因此不创建缓存目录
+            logger.info("多账户模式的隔离上下文不使用持久化 HTTP 缓存，http_cache 设置不生效")
+            http_settings = dict(http_settings, enabled=False)
+        http_cache = HttpCache(http_settings,
+                               self.config.get('login', {}).get('username'), self.project_root)
         
+        return build_options(browser_config.get('launch_profile', 'default'), binary_location,
+                             bool(browser_config.get('headless', False)),
+                             browser_config.get('user_agent') or None, lang,
+                             http_cache.prepare(), http_cache.max_bytes,
+                             browser_config.get('page_load_strategy', 'eager'))
+    
+    def _with_profile_dir(self, options: webdriver.ChromeOptions) -> webdriver.ChromeOptions:
+        """启用 tmpfs 配置目录时，为本次运行附加独立的 --user-data-dir"""
+        settings = self.config.get('profile_dir', {})
+        if not settings.get('tmpfs'):
+            return options
+        if self._profile_dir is None:
+            self._profile_dir = ProfileDir.create(settings)
+            logger.debug("浏览器配置目录: %s", self._profile_dir.path)
+        options.add_argument(f"--user-data-dir={self._profile_dir.path}")
+        return options
+    
+    def _setup_browser(self) -> webdriver.Chrome:
+        """设置浏览器"""
         # 获取 Chromium 路径
         chromium_path = self._get_chromium_path()
         
         if chromium_path:
+            self._version_lease = VersionLease.acquire(Path(chromium_path))
             # 尝试启动 Chromium
             try:
                 logger.info("尝试启动 Chromium...")
-                # 创建新的选项实例避免冲突
-                chromium_options = webdriver.ChromeOptions()
-                for arg in options.arguments:
-                    chromium_options.add_argument(arg)
-                chromium_options.binary_location = chromium_path
-                
-                # 添加兼容性选项（特别针对老版本 Chromium）
-                chromium_options.add_argument("--disable-extensions")
-                chromium_options.add_argument("--disable-plugins")
-                chromium_options.add_argument("--disable-dev-shm-usage")
-                chromium_options.add_argument("--disable-gpu")
-                chromium_options.add_argument("--no-first-run")
-                chromium_options.add_argument("--disable-default-apps")
-                chromium_options.add_argument("--disable-background-timer-throttling")
-                chromium_options.add_argument("--disable-renderer-backgrounding")
-                chromium_options.add_argument("--disable-backgrounding-occluded-windows")
-                chromium_options.add_argument("--disable-blink-features=AutomationControlled")
-                chromium_options.add_argument("--disable-web-security")
-                chromium_options.add_argument("--allow-running-insecure-content")
-                chromium_options.add_argument("--ignore-certificate-errors")
-                chromium_options.add_argument("--ignore-ssl-errors")
-                chromium_options.add_argument("--ignore-certificate-errors-spki-list")
-                
-                # 清除 webdriver 相关环境变量（避免检测）
-                chromium_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                chromium_options.add_experimental_option('useAutomationExtension', False)
+                chromium_options = self._with_profile_dir(self._launch_options(chromium_path))
                 
                 # 使用简单的 ChromeDriverManager
                 logger.info("使用默认 ChromeDriverManager 获取 ChromeDriver...")
@@ -130,30 +162,32 @@ class AutoClicker:
                 logger.info("✅ Chromium 启动成功")
                 return driver
             except Exception as e:
-                logger.info(f"Chromium 启动失败: {e}")
+                logger.info("Chromium 启动失败: %s", e)
                 logger.info("尝试回退到系统默认浏览器...")
         
         # 回退到系统默认 Chrome/Chromium
         try:
             logger.info("尝试使用系统默认浏览器...")
             service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=options)
+            driver = webdriver.Chrome(service=service, options=self._with_profile_dir(self._launch_options()))
             logger.info("✅ 系统浏览器启动成功")
             return driver
         except Exception as e:
-            logger.error(f"系统浏览器启动失败: {e}")
+            logger.error("系统浏览器启动失败: %s", e)
             raise Exception(
                 "❌ 无法启动浏览器。建议:\n"
                 f"• 运行 './claude-auto-clicker install-chromium' 下载便携版 Chromium\n"
                 "• 或安装系统 Chromium: sudo apt install chromium-browser"
             )
     
-    def _handle_login_if_needed(self) -> bool:
-        """处理登录（如果需要）"""
+    def _handle_login_if_needed(self, credentials: tuple = None) -> bool:
+        """处理登录（如果需要）；credentials 为空时使用主账户凭据"""
         if self.login_handler.check_if_login_required():
             logger.info("检测到需要登录，开始自动登录...")
+            self._run["login_needed"] = True
             
-            username, password = config_manager.get_login_credentials()
+            login_config = self.config.get('login', {})
+            username, password = credentials or (login_config.get('username'), login_config.get('password'))
             if not username or not password:
                 logger.error("未配置登录凭据，请先运行 'claude-auto-clicker login' 命令")
                 return False
@@ -167,6 +201,7 @@ class AutoClicker:
             
             # 登录成功后重新打开目标页面
             target_url = self.config.get('target_url')
+            self.driver.set_page_load_timeout(self._budget(300))
             self.driver.get(target_url)
             logger.info("登录成功，重新打开目标页面")
         
@@ -176,87 +211,403 @@ class AutoClicker:
         """执行点击操作"""
         try:
             click_config = self.config.get('click', {})
-            wait_timeout = click_config.get('wait_timeout', 20)
+            wait_timeout = self._budget(click_config.get('wait_timeout', 20))
             button_xpath = click_config.get('button_xpath')
             
+            if click_config.get('actions'):
+                # 声明式动作流水线：多个步骤共用一次浏览器启动、页面加载与登录
+                return self._perform_actions(click_config, wait_timeout)
+            
             if not button_xpath:
                 logger.error("未配置按钮XPath")
                 return False
             
-            # 等待按钮可点击
-            wait = WebDriverWait(self.driver, wait_timeout)
-            button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, button_xpath))
-            )
-            logger.info("成功定位到按钮")
-            
-            # 执行点击
-            button.click()
-            logger.info("按钮点击成功！")
-            
-            # 等待响应
-            time.sleep(5)
+            if click_config.get('strategy', 'webdriver') == 'script':
+                # 页面内等待并点击，一次往返
+                result = script_click(self.driver, button_xpath, wait_timeout)
+                logger.event("click", outcome="ok" if result["ok"] else "failed",
+                             located_ms=result.get("located_ms"), waited_ms=result.get("waited_ms"),
+                             round_trip_ms=round(result["round_trip_ms"], 1))
+                if not result["ok"]:
+                    logger.error("点击操作失败: %s 秒内按钮未变为可点击（%s）", wait_timeout,
+                                 "已出现" if result.get("located_ms") is not None else "未找到")
+                    self._run["error"] = "ScriptClickTimeout"
+                    return False
+                logger.info("按钮点击成功！（等待 %.0f ms）", result["waited_ms"])
+            else:
+                # 等待按钮可点击
+                wait = WebDriverWait(self.driver, wait_timeout)
+                button = wait.until(
+                    EC.element_to_be_clickable((By.XPATH, button_xpath))
+                )
+                logger.info("成功定位到按钮")
+                
+                # 执行点击
+                button.click()
+                logger.info("按钮点击成功！")
             return True
             
         except Exception as e:
-            logger.error(f"点击操作失败: {e}")
+            logger.error("点击操作失败: %s", e)
+            self._run["error"] = type(e).__name__
             return False
     
+    def _perform_actions(self, click_config: dict, wait_timeout: float) -> bool:
+        """执行 click.actions 中的步骤"""
+        pipeline = ActionPipeline(self.driver, click_config['actions'],
+                                  strategy=click_config.get('strategy', 'webdriver'),
+                                  default_timeout=wait_timeout, budget=self._budget)
+        try:
+            pipeline.run()
+        except ActionFailed as e:
+            logger.error("动作流水线失败: %s", e)
+            self._run["error"] = f"{type(e).__name__}[{e.step}]"
+            return False
+        finally:
+            self._run["actions"] = pipeline.results
+        logger.info("动作流水线完成（%s 个步骤）", len(pipeline.results))
+        return True
+    
     def perform_single_click(self) -> bool:
-        """执行单次点击任务"""
+        """执行单次点击任务（execution.mode 为 multiplex 时一次服务全部账户）"""
+        if self.config.get('execution', {}).get('mode', 'single') == 'multiplex':
+            return self.perform_multiplexed()
+        
         current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        logger.info(f"[{current_time}] 开始执行单次点击任务...")
+        tick_id = uuid.uuid4().hex[:12]
+        account = self.config.get('login', {}).get('username') or None
         
+        with logger.context(tick_id=tick_id, account=account):
+            logger.info("[%s] 开始执行单次点击任务...", current_time)
+            started_at = time.time()
+            start = time.monotonic()
+            outcome = "error"
+            self._run = {"phases": {}, "login_needed": False, "error": None}
+            self._deadline = self._new_deadline()
+            rss = None
+            try:
+                outcome = self._run_phases()
+                return outcome == "ok"
+            except RunCancelled as e:
+                outcome = "cancelled"
+                self._run["error"] = "RunCancelled"
+                logger.info("运行已取消（%s 阶段）", e)
+                return False
+            except Exception as e:
+                logger.error("执行过程中发生错误: %s", e)
+                self._run["error"] = type(e).__name__
+                return False
+            finally:
+                if self.driver:
+                    rss = self._collect_page_metrics()
+                self.close()
+                duration = time.monotonic() - start
+                logger.event("run", outcome=outcome, duration=duration)
+                self._record_run(started_at, tick_id, account, outcome, duration, rss)
+    
+    def _collect_page_metrics(self):
+        """运行结束前读取冷却状态、浏览器内存与缓存命中率，返回浏览器常驻内存字节数"""
+        self.scheduler.observe(self.driver)
+        rss = None
+        try:
+            rss = browser_rss(self.driver)
+        except Exception:
+            pass
         try:
-            # 设置浏览器
+            cache = resource_stats(self.driver)
+        except Exception:
+            cache = None
+        if cache:
+            self._run["cache"] = cache
+            logger.event("cache", hit_ratio=round(cache["hit_ratio"], 3),
+                         resources=cache["resources"], transfer_bytes=cache["transfer_bytes"])
+        return rss
+    
+    def _record_run(self, started_at: float, tick_id: str, account: str, outcome: str,
+                    duration: float, rss: int = None):
+        """写入运行历史（批量落盘）"""
+        phases = self._run["phases"]
+        failure_class = None
+        if outcome != "ok":
+            failed_phase = next((name for name, state in phases.items() if state["outcome"] != "ok"), None)
+            failure_class = ":".join(filter(None, [failed_phase or outcome, self._run["error"]]))
+        row = {
+            "started_at": started_at,
+            "run_id": RUN_ID,
+            "tick_id": tick_id,
+            "account": account,
+            "outcome": outcome,
+            "failure_class": failure_class,
+            "login_needed": int(self._run["login_needed"]),
+            "duration_ms": round(duration * 1000, 1),
+            "browser_rss": rss,
+        }
+        if self._run.get("cache"):
+            row["cache_hit_ratio"] = self._run["cache"]["hit_ratio"]
+            row["transfer_bytes"] = self._run["cache"]["transfer_bytes"]
+        if self._run.get("actions"):
+            # 每个步骤的结果与耗时（不含读取到的值）
+            row["actions"] = json.dumps(
+                [{k: v for k, v in step.items() if k != "value"} for step in self._run["actions"]],
+                ensure_ascii=False)
+        for name, state in phases.items():
+            if "duration" in state:
+                row[f"{name}_ms"] = round(state["duration"] * 1000, 1)
+        run_history.record(row)
+    
+    def _new_deadline(self):
+        settings = self.config.get('deadline', {})
+        return RunDeadline(settings) if settings.get('enabled', True) else None
+    
+    def _budget(self, default: float) -> float:
+        """等待上限：不超过当前阶段的剩余时间"""
+        if self._deadline is None:
+            return default
+        return max(0.5, min(default, self._deadline.remaining()))
+    
+    def cancel(self):
+        """
+        请求中止当前运行：进行中的阶段结束后（或下一个阶段开始前）抛出 RunCancelled
+        标记由发起运行的一方在下一次运行开始前清除（start_continuous_clicking / AsyncAutoClicker.run_once）
+        """
+        self.cancel_event.set()
+    
+    def _settle_seconds(self, default: float) -> float:
+        """阶段之外的停顿：不超过整体时限的剩余时间"""
+        if self._deadline is None:
+            return default
+        return max(0.0, min(default, self._deadline.expires_at - time.monotonic()))
+    
+    @contextmanager
+    def _phase(self, name: str):
+        """计时一个阶段并按预算限时，记下结果供运行历史使用"""
+        if self.cancel_event.is_set():
+            raise RunCancelled(name)
+        with logger.phase(name) as state:
+            self._run["phases"][name] = state
+            if self._deadline is not None:
+                self._deadline.start(name)
+            try:
+                yield state
+            except TimeoutException:
+                # Selenium 的等待按阶段剩余时间设置，超时即预算耗尽
+                if self._deadline is not None and self._deadline.remaining() < 1:
+                    raise self._deadline.timeout() from None
+                raise
+            if self.cancel_event.is_set():
+                # 例如启动阶段中被取消：浏览器刚创建完成，由调用方的收尾逻辑关闭
+                raise RunCancelled(name)
+            if self._deadline is not None:
+                self._deadline.check()
+    
+    def close(self):
+        """关闭浏览器，释放浏览器版本租约并删除临时配置目录（可重复调用）"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning("关闭浏览器失败: %s", e)
+            self.driver = None
+            logger.info("浏览器已关闭")
+        if self._version_lease:
+            self._version_lease.release()
+            self._version_lease = None
+        if self._profile_dir:
+            self._profile_dir.cleanup()
+            self._profile_dir = None
+    
+    def _preflight(self) -> bool:
+        """预检目标站点；不可达时安排退避重试并返回 False"""
+        with self._phase("preflight") as phase:
+            reachable, reason = self.preflight.check(self.config.get('target_url'))
+            if not reachable:
+                phase["outcome"] = "failed"
+        if not reachable:
+            self._run["error"] = "Unreachable"
+            delay = self.preflight.backoff()
+            self.scheduler.retry_after(delay)
+            logger.warning("🌐 目标站点不可达（%s），跳过本次浏览器启动，%.0f 秒后重试", reason, delay)
+        return reachable
+    
+    def _run_phases(self) -> str:
+        """按阶段执行一次任务（preflight / launch / navigate / login / click），返回结果标识"""
+        if not self._preflight():
+            return "unreachable"
+        
+        # 设置浏览器
+        with self._phase("launch"):
             self.driver = self._setup_browser()
             self.login_handler = LoginHandler(self.driver)
-            
-            # 打开目标网页
+        
+        # 打开目标网页（页面加载超时按阶段预算设置）
+        with self._phase("navigate"):
             target_url = self.config.get('target_url')
+            self.driver.set_page_load_timeout(self._budget(300))
             self.driver.get(target_url)
-            logger.info(f"成功打开网页: {target_url}")
-            
-            # 处理登录
-            if not self._handle_login_if_needed():
-                return False
-            
-            # 执行点击
-            success = self._perform_click()
-            return success
-            
-        except Exception as e:
-            logger.error(f"执行过程中发生错误: {e}")
+            logger.info("成功打开网页: %s", target_url)
+        
+        return self._login_and_click()
+    
+    def _login_and_click(self, credentials: tuple = None) -> str:
+        """在当前页面上执行 login / click 阶段，返回结果标识"""
+        # 处理登录
+        with self._phase("login") as phase:
+            self.login_handler.set_timeout(lambda: self._budget(10))
+            if not self._handle_login_if_needed(credentials):
+                phase["outcome"] = "failed"
+                return "login_failed"
+        
+        # 执行点击
+        with self._phase("click") as phase:
+            if not self._perform_click():
+                phase["outcome"] = "failed"
+                return "click_failed"
+        
+        # 等待响应：点击已经成功，停顿不计入 click 阶段预算，只受整体时限约束
+        time.sleep(self._settle_seconds(5))
+        return "ok"
+    
+    def perform_multiplexed(self) -> bool:
+        """
+        多账户复用一个浏览器
+        每个账户一个隔离的 browser context（CDP Target.createBrowserContext，Cookie 互不相通），
+        所有标签页同时开始加载；WebDriver 命令在同一会话内串行执行，因此登录与点击逐个标签页进行
+        """
+        accounts = config_manager.get_accounts(self.config)
+        if not accounts:
+            logger.error("未配置任何账户，请先运行 'claude-auto-clicker login --account'")
             return False
-        finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("浏览器已关闭")
+        target_url = self.config.get('target_url')
+        tick_id = uuid.uuid4().hex[:12]
+        
+        with logger.context(tick_id=tick_id):
+            logger.info("开始多账户任务：%s 个账户共用一个浏览器", len(accounts))
+            start = time.monotonic()
+            self._run = {"phases": {}, "login_needed": False, "error": None}
+            self._deadline = self._new_deadline()
+            contexts = {}
+            results = {}
+            try:
+                if not self._preflight():
+                    self._record_run(time.time(), tick_id, None, "unreachable", time.monotonic() - start)
+                    return False
+                with self._phase("launch"):
+                    self.driver = self._setup_browser()
+                launch_state = self._run["phases"]["launch"]
+                
+                # 先为所有账户创建上下文并发起加载，页面在浏览器内并发加载
+                for username, _ in accounts:
+                    context_id = self.driver.execute_cdp_cmd(
+                        "Target.createBrowserContext", {"disposeOnDetach": True})["browserContextId"]
+                    target_id = self.driver.execute_cdp_cmd(
+                        "Target.createTarget", {"url": target_url, "browserContextId": context_id})["targetId"]
+                    contexts[username] = (context_id, target_id)
+                
+                available = []
+                for username, password in accounts:
+                    # 先占位：该账户的标签页中被取消时，_run_tab 已写入它的运行记录
+                    results[username] = False
+                    results[username] = self._run_tab(tick_id, username, password, contexts[username][1],
+                                                      launch_state, len(accounts))
+                    if self.scheduler.available_at is not None:
+                        available.append(self.scheduler.available_at)
+                # 下一次运行按最早恢复可用的账户安排
+                self.scheduler.available_at = min(available) if available else None
+            except RunCancelled as e:
+                logger.info("多账户任务已取消（%s 阶段）", e)
+                if not results:
+                    # 尚未进入任何账户的标签页（预检或启动阶段被取消）
+                    self._run["error"] = "RunCancelled"
+                    self._record_run(time.time(), tick_id, None, "cancelled", time.monotonic() - start)
+            except Exception as e:
+                logger.error("多账户任务失败: %s", e)
+                self._run["error"] = type(e).__name__
+                self._record_run(time.time(), tick_id, None, "error", time.monotonic() - start)
+            finally:
+                for context_id, _ in contexts.values():
+                    try:
+                        self.driver.execute_cdp_cmd("Target.disposeBrowserContext",
+                                                    {"browserContextId": context_id})
+                    except Exception:
+                        pass
+                self.close()
+            
+            succeeded = sum(results.values())
+            logger.event("multiplex", outcome="ok" if results and succeeded == len(accounts) else "failed",
+                         duration=time.monotonic() - start, accounts=len(accounts), succeeded=succeeded)
+            return bool(results) and succeeded == len(accounts)
+    
+    def _run_tab(self, tick_id: str, username: str, password: str, target_id: str,
+                 launch_state: dict, tab_count: int) -> bool:
+        """在账户对应的标签页中完成等待加载、登录与点击，并写入该账户的运行记录"""
+        with logger.context(account=username):
+            started_at = time.time()
+            start = time.monotonic()
+            outcome = "error"
+            # 启动耗时由所有账户共享
+            self._run = {"phases": {"launch": launch_state}, "login_needed": False, "error": None}
+            # 每个账户单独计时（启动阶段已由整个 tick 共享）
+            self._deadline = self._new_deadline()
+            rss = None
+            try:
+                with self._phase("navigate"):
+                    self.driver.switch_to.window(target_id)
+                    WebDriverWait(self.driver, self._budget(self.config.get('click', {}).get('wait_timeout', 20))).until(
+                        lambda d: d.execute_script("return document.readyState") == "complete")
+                    self.login_handler = LoginHandler(self.driver)
+                outcome = self._login_and_click((username, password))
+            except RunCancelled:
+                outcome = "cancelled"
+                self._run["error"] = "RunCancelled"
+                raise
+            except Exception as e:
+                logger.error("账户 %s 执行失败: %s", username, e)
+                self._run["error"] = type(e).__name__
+            finally:
+                total_rss = self._collect_page_metrics()
+                # 记录每个账户分摊的浏览器内存
+                rss = total_rss // tab_count if total_rss else None
+                duration = time.monotonic() - start
+                logger.event("run", outcome=outcome, duration=duration)
+                self._record_run(started_at, tick_id, username, outcome, duration, rss)
+            return outcome == "ok"
     
     def start_continuous_clicking(self, interval_seconds: int = None):
         """开始连续点击模式"""
         if interval_seconds is None:
             interval_seconds = self.config.get('click', {}).get('click_interval', 300)
         
-        logger.info(f"开始连续点击模式，间隔 {interval_seconds} 秒")
+        logger.info("开始连续点击模式，间隔 %s 秒", interval_seconds)
         
         while True:
+            # 上一次运行的取消请求只对那次运行有效
+            self.cancel_event.clear()
             try:
                 success = self.perform_single_click()
+                wait_seconds = self.scheduler.next_interval(interval_seconds)
                 if success:
-                    logger.info(f"点击成功，等待 {interval_seconds} 秒后继续")
+                    logger.info("点击成功，等待 %.0f 秒后继续", wait_seconds)
                 else:
-                    logger.warning(f"点击失败，等待 {interval_seconds} 秒后重试")
+                    logger.warning("点击失败，等待 %.0f 秒后重试", wait_seconds)
                 
-                time.sleep(interval_seconds)
+                time.sleep(wait_seconds)
                 
             except KeyboardInterrupt:
                 logger.info("接收到中断信号，停止连续点击")
                 break
             except Exception as e:
-                logger.error(f"连续点击过程中出错: {e}")
+                logger.error("连续点击过程中出错: %s", e)
                 time.sleep(interval_seconds)
 
 
-# 全局实例
-auto_clicker = AutoClicker()
\ No newline at end of file
+_auto_clicker = None
+
+
+def __getattr__(name: str):
+    """全局实例在首次使用时创建（导入本模块不再读取配置）"""
+    global _auto_clicker
+    if name == "auto_clicker":
+        if _auto_clicker is None:
+            _auto_clicker = AutoClicker()
+        return _auto_clicker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Chromium 启动配置（launch profile）
+
+- default：原有的兼容性参数（去重后），适合桌面与老版本 Chromium
+- lean：新版无头模式 + 单渲染进程 + 关闭后台联网、组件更新与同步，小磁盘缓存与固定小窗口，
+  内存占用与启动时间最低，适合服务器/WSL
+
+参数表在模块加载时确定；ChromeOptions 按（配置、浏览器路径、界面设置）缓存，每次点击不再重新拼装，
+调用方拿到的是缓存对象的副本，可以自由修改而不影响其他启动。
+"""
+import copy
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from ..utils import procfs
+
+_BASE_FLAGS = (
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",  # 解决共享内存问题
+)
+
+# 兼容性参数（特别针对老版本 Chromium）
+_COMPAT_FLAGS = (
+    "--disable-extensions",
+    "--disable-plugins",
+    "--no-first-run",
+    "--disable-default-apps",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-web-security",
+    "--allow-running-insecure-content",
+    "--ignore-certificate-errors",
+    "--ignore-ssl-errors",
+    "--ignore-certificate-errors-spki-list",
+)
+
+_LEAN_FLAGS = (
+    "--headless=new",
+    "--renderer-process-limit=1",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-default-browser-check",
+    "--disk-cache-size=8388608",  # 8MB 磁盘缓存
+    "--window-size=1024,768",
+)
+
+
+def _dedupe(*groups: Tuple[str, ...]) -> Tuple[str, ...]:
+    seen = []
+    for group in groups:
+        for flag in group:
+            if flag not in seen:
+                seen.append(flag)
+    return tuple(seen)
+
+
+LAUNCH_PROFILES = {
+    "default": _dedupe(_BASE_FLAGS, _COMPAT_FLAGS),
+    "lean": _dedupe(_BASE_FLAGS, _COMPAT_FLAGS, _LEAN_FLAGS),
+}
+
+
+def build_options(profile: str = "default", binary_location: Optional[str] = None,
+                  headless: bool = False, user_agent: Optional[str] = None,
+                  lang: Optional[str] = None, disk_cache_dir: Optional[str] = None,
+                  disk_cache_bytes: int = 0, page_load_strategy: str = "normal") -> webdriver.ChromeOptions:
+    """
+    获取启动配置对应的 ChromeOptions（缓存对象的独立副本，多个线程、多次启动之间互不影响）
+    :param headless: default 配置下是否启用无头模式（lean 配置始终使用新版无头模式）
+    :param disk_cache_dir: 持久化 HTTP 缓存目录（覆盖配置自带的缓存大小）
+    :param page_load_strategy: normal（等待 load）/ eager（DOMContentLoaded 即返回）/ none
+    """
+    return copy.deepcopy(_cached_options(profile, binary_location, headless, user_agent, lang,
+                                         disk_cache_dir, disk_cache_bytes, page_load_strategy))
+
+
+@lru_cache(maxsize=16)
+def _cached_options(profile: str, binary_location: Optional[str], headless: bool,
+                    user_agent: Optional[str], lang: Optional[str], disk_cache_dir: Optional[str],
+                    disk_cache_bytes: int, page_load_strategy: str) -> webdriver.ChromeOptions:
+    """构建并缓存 ChromeOptions（只读，不要直接返回给调用方）"""
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"未知的启动配置: {profile}（可选: {', '.join(LAUNCH_PROFILES)}）")
+    options = webdriver.ChromeOptions()
+    flags = LAUNCH_PROFILES[profile]
+    if headless and "--headless=new" not in flags:
+        options.add_argument("--headless")
+    for flag in flags:
+        if disk_cache_dir and flag.startswith("--disk-cache-size="):
+            continue
+        options.add_argument(flag)
+    if disk_cache_dir:
+        options.add_argument(f"--disk-cache-dir={disk_cache_dir}")
+        options.add_argument(f"--disk-cache-size={disk_cache_bytes}")
+    if lang:
+        options.add_argument(f"--lang={lang}")
+    if user_agent:
+        options.add_argument(f"--user-agent={user_agent}")
+    if binary_location:
+        options.binary_location = binary_location
+    options.page_load_strategy = page_load_strategy
+    # 隐藏自动化特征
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+def browser_rss(driver) -> Optional[int]:
+    """浏览器进程树的常驻内存字节数（不含 chromedriver）；无 /proc 时返回 None"""
+    driver_pid = driver.service.process.pid
+    tree = procfs.tree_rss(driver_pid)
+    if tree is None:
+        return None
+    return tree - (procfs.rss_bytes(driver_pid) or 0)
+
+
+def measure_launch(options: webdriver.ChromeOptions, driver_path: str,
+                   settle: float = 3.0) -> Tuple[float, Optional[int]]:
+    """
+    启动一次浏览器并测量
+    :return: (启动到打开空白页的秒数, 稳定后浏览器进程树的常驻内存字节数；无 /proc 时为 None)
+    """
+    start = time.perf_counter()
+    driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    try:
+        driver.get("about:blank")
+        startup = time.perf_counter() - start
+        time.sleep(settle)
+        return startup, browser_rss(driver)
+    finally:
+        driver.quit()
@@ -0,0 +1,75 @@
+"""
+单次运行的整体时限与分阶段预算
+
+没有整体时限时，一个异常页面可能让 driver.get 等到 Selenium 默认的页面加载超时，
+再加上登录与点击各自的等待，一次运行会卡住数分钟。这里为每次运行设定总时限，
+并为 launch / navigate / login / click 各分配预算：
+- 每个阶段可用时间 = min(阶段预算, 整体剩余时间)
+- 页面加载超时、登录与点击的等待都按当前阶段的剩余时间设置
+- 阶段结束时超出预算即抛出 PhaseTimeout（带阶段名），本次运行立即失败
+"""
+import time
+from typing import Dict, Optional
+
+DEFAULT_DEADLINE_SETTINGS = {
+    "enabled": True,
+    "total": 120,
+    "budgets": {
+        "preflight": 10,
+        "launch": 40,
+        "navigate": 30,
+        "login": 40,
+        "click": 30,
+    },
+}
+
+
+class PhaseTimeout(Exception):
+    """阶段超出时间预算"""
+
+    def __init__(self, phase: str, budget: float, overall: bool = False):
+        self.phase = phase
+        self.budget = budget
+        self.overall = overall
+        scope = "本次运行的整体时限" if overall else "阶段预算"
+        super().__init__(f"{phase} 阶段超时：超出{scope}（{budget:.0f} 秒）")
+
+
+class RunDeadline:
+    """一次运行的时限"""
+
+    def __init__(self, settings: dict = None):
+        settings = dict(DEFAULT_DEADLINE_SETTINGS, **(settings or {}))
+        self.total = float(settings["total"])
+        self.budgets: Dict[str, float] = dict(DEFAULT_DEADLINE_SETTINGS["budgets"],
+                                              **(settings.get("budgets") or {}))
+        self.expires_at = time.monotonic() + self.total
+        self.phase: Optional[str] = None
+        self._phase_expires_at = self.expires_at
+        self._phase_budget = self.total
+
+    def start(self, phase: str) -> float:
+        """进入阶段，返回该阶段可用的秒数"""
+        now = time.monotonic()
+        budget = float(self.budgets.get(phase, self.total))
+        self.phase = phase
+        self._phase_expires_at = min(now + budget, self.expires_at)
+        self._phase_budget = budget
+        return self.remaining()
+
+    def remaining(self) -> float:
+        """当前阶段剩余的秒数（不小于 0）"""
+        return max(0.0, self._phase_expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._phase_expires_at
+
+    def timeout(self) -> PhaseTimeout:
+        """当前阶段超时对应的异常（区分阶段预算与整体时限）"""
+        overall = self._phase_expires_at >= self.expires_at
+        return PhaseTimeout(self.phase, self.total if overall else self._phase_budget, overall)
+
+    def check(self):
+        """当前阶段已超时则抛出 PhaseTimeout"""
+        if self.expired():
+            raise self.timeout()
@@ -0,0 +1,120 @@
+"""
+目标站点的持久化 HTTP 磁盘缓存
+
+每次点击使用的浏览器配置目录都是临时的，默认情况下站点的 JS/CSS 每次都要重新下载。
+启用后为每个账户分配独立的缓存目录（只通过 --disk-cache-dir 提供 HTTP 缓存，
+不保存 Cookie 与登录状态），重复打开页面时静态资源直接命中缓存：
+
+    data/http_cache/<账户哈希>/
+
+- --disk-cache-size 限制 Chromium 自身的缓存上限
+- 启动前按 trim_interval 检查目录实际大小，超过上限时按最久未使用删除缓存条目
+- 运行结束前通过 Resource Timing API 统计缓存命中率与实际传输字节数
+"""
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..utils.extractor import tree_size
+from ..utils.logger import logger
+
+DEFAULT_HTTP_CACHE_SETTINGS = {
+    "enabled": False,
+    "dir": "",
+    "max_mb": 100,
+    "trim_interval": 3600,
+}
+
+# 上次修剪时间记录文件
+_TRIM_STAMP = ".last-trim"
+
+# transferSize 为 0 且有响应体即为缓存命中（跨域资源未开放 Timing-Allow-Origin 时无法判断，不计入）
+_RESOURCE_STATS_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let total = 0, hits = 0, transfer = 0;
+for (const e of entries) {
+    if (!e.decodedBodySize) continue;
+    total += 1;
+    transfer += e.transferSize;
+    if (e.transferSize === 0) hits += 1;
+}
+return {total: total, hits: hits, transfer: transfer};
+"""
+
+
+class HttpCache:
+    """单个账户的 HTTP 磁盘缓存目录"""
+
+    def __init__(self, settings: dict = None, account: str = None, project_root: Path = None):
+        self.settings = dict(DEFAULT_HTTP_CACHE_SETTINGS, **(settings or {}))
+        self.enabled = bool(self.settings["enabled"])
+        root = self.settings["dir"] or (Path(project_root or Path(__file__).parent.parent.parent)
+                                         / "data" / "http_cache")
+        key = hashlib.sha256((account or "default").encode("utf-8")).hexdigest()[:16]
+        self.directory = Path(root).expanduser() / key
+        self.max_bytes = int(float(self.settings["max_mb"]) * 1048576)
+
+    def prepare(self) -> Optional[str]:
+        """创建目录并按需修剪，返回传给 --disk-cache-dir 的路径；未启用返回 None"""
+        if not self.enabled:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.directory / _TRIM_STAMP
+        try:
+            last_trim = stamp.stat().st_mtime
+        except OSError:
+            last_trim = 0
+        if time.time() - last_trim >= float(self.settings["trim_interval"]):
+            self.trim()
+            stamp.touch()
+        return str(self.directory)
+
+    def trim(self) -> int:
+        """目录超过上限时删除最久未使用的缓存文件，直到降到上限的 80%，返回释放的字节数"""
+        size = tree_size(self.directory)
+        if size <= self.max_bytes:
+            return 0
+        files, index_dirs = [], []
+        for root, dirs, names in os.walk(self.directory):
+            index_dirs.extend(os.path.join(root, d) for d in dirs if d == "index-dir")
+            for name in names:
+                if name == _TRIM_STAMP:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+        files.sort()
+        target = int(self.max_bytes * 0.8)
+        freed = 0
+        for _, file_size, path in files:
+            if size - freed <= target:
+                break
+            try:
+                os.unlink(path)
+                freed += file_size
+            except OSError:
+                continue
+        # 删除索引，下次启动时由 Chromium 按剩余条目重建
+        for index_dir in index_dirs:
+            shutil.rmtree(index_dir, ignore_errors=True)
+        logger.info("🧹 HTTP 缓存超过上限 %.0f MB，已释放 %.1f MB", self.max_bytes / 1048576, freed / 1048576)
+        return freed
+
+
+def resource_stats(driver) -> Optional[Dict[str, float]]:
+    """当前页面的缓存命中统计：资源数、命中数、命中率、实际传输字节数"""
+    data = driver.execute_script(_RESOURCE_STATS_SCRIPT)
+    if not data or not data.get("total"):
+        return None
+    return {
+        "resources": data["total"],
+        "hits": data["hits"],
+        "hit_ratio": data["hits"] / data["total"],
+        "transfer_bytes": data["transfer"],
+    }
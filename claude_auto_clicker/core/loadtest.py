@@ -0,0 +1,282 @@
+"""
+多账户负载测试
+
+在本机启动一个模拟目标站点（可配置页面延迟），用真实的 AutoClicker 流程为 N 个模拟账户按固定间隔运行，
+逐级增加 N，记录每一级的：
+- 吞吐量（每分钟完成的运行次数）
+- 调度延迟（实际开始时间 - 计划时间）与错过计划的比例
+- CPU 占用（本进程及浏览器子进程，按单核百分比计）与峰值常驻内存
+- 失败率（AutoClicker 判定失败或站点未收到点击）
+结果输出为容量曲线 JSON，可在不同版本之间比较。
+"""
+import copy
+import heapq
+import os
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .. import __version__
+from ..utils import procfs
+from ..utils.logger import logger
+from ..utils.run_history import nearest_rank, run_history
+from .auto_clicker import AutoClicker
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>load test</title></head>
+<body>
+<main>
+  <p class="cooldown">00:00:00</p>
+  <button id="claim" onclick="fetch('/click?account={account}', {{method: 'POST'}}).then(() => this.textContent = 'done')">claim</button>
+</main>
+</body></html>
+"""
+
+BUTTON_XPATH = "//button[@id='claim']"
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """模拟目标站点：页面按配置延迟返回，点击通过 POST /click 计数"""
+
+    def _send_page(self, with_body: bool):
+        url = urlparse(self.path)
+        if url.path != "/dashboard":
+            self.send_error(404)
+            return
+        account = parse_qs(url.query).get("account", [""])[0]
+        time.sleep(self.server.latency)
+        body = _PAGE_TEMPLATE.format(account=account).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_page(with_body=True)
+
+    def do_HEAD(self):
+        # 运行前的可达性预检使用 HEAD
+        self._send_page(with_body=False)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/click":
+            self.send_error(404)
+            return
+        account = parse_qs(url.query).get("account", [""])[0]
+        with self.server.lock:
+            self.server.clicks[account] = self.server.clicks.get(account, 0) + 1
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInSite:
+    """本机模拟站点（随机端口，后台线程运行）"""
+
+    def __init__(self, latency: float = 0.2):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.clicks = {}
+        self.server.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def clicks(self, account: str) -> int:
+        with self.server.lock:
+            return self.server.clicks.get(account, 0)
+
+    def reset(self):
+        with self.server.lock:
+            self.server.clicks.clear()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _ResourceSampler:
+    """后台采样本进程树的常驻内存峰值；CPU 时间按开始/结束差值计算"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_rss: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def cpu_seconds() -> float:
+        """本进程与已回收子进程的 CPU 时间，加上仍在运行的子孙进程（浏览器、驱动）"""
+        times = os.times()
+        total = times.user + times.system + times.children_user + times.children_system
+        pid = os.getpid()
+        for child in procfs.process_tree(pid):
+            if child != pid:
+                total += procfs.cpu_seconds(child) or 0
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = procfs.tree_rss(os.getpid())
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _account_config(base_config: Dict, site: StandInSite, account: str) -> Dict:
+    """
+    模拟账户使用的配置：指向模拟站点、无头、关闭自适应调度
+    动作流水线只适用于真实站点，这里清空后直接点击模拟页面的按钮；点击策略保持配置中的设置，
+    可达性预检保持配置中的设置（默认开启），容量测试包含每次运行前的 HEAD 请求
+    """
+    config = copy.deepcopy(base_config)
+    config["target_url"] = f"{site.base_url}/dashboard?account={account}"
+    config.setdefault("login", {}).update({"username": account, "password": ""})
+    config.setdefault("click", {}).update({"button_xpath": BUTTON_XPATH, "actions": []})
+    config.setdefault("browser", {})["headless"] = True
+    config.setdefault("schedule", {})["enabled"] = False
+    config.setdefault("execution", {})["mode"] = "single"
+    return config
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[nearest_rank(len(ordered), q)]
+
+
+def run_level(accounts: int, base_config: Dict, site: StandInSite, duration: float,
+              interval: float, workers: int, lag_tolerance: float) -> Dict:
+    """
+    以 accounts 个模拟账户运行 duration 秒
+    每个账户的计划时间在一个间隔内均匀错开，之后按固定间隔排程；运行慢于计划时延迟会累积
+    """
+    site.reset()
+    names = [f"loadtest-{i:03d}" for i in range(accounts)]
+    start = time.monotonic()
+    # (计划时间, 账户)
+    schedule = [(start + interval * i / accounts, name) for i, name in enumerate(names)]
+    heapq.heapify(schedule)
+    lags, durations = [], []
+    failures = 0
+    expected_clicks = {}
+    lock = threading.Lock()
+
+    def tick(due: float, name: str):
+        nonlocal failures
+        lag = time.monotonic() - due
+        tick_start = time.monotonic()
+        clicks_before = site.clicks(name)
+        try:
+            ok = AutoClicker(_account_config(base_config, site, name)).perform_single_click()
+        except Exception as e:
+            logger.error("负载测试运行失败: %s", e)
+            ok = False
+        # AutoClicker 报告成功但站点未收到点击同样视为失败
+        ok = ok and site.clicks(name) > clicks_before
+        with lock:
+            lags.append(lag)
+            durations.append(time.monotonic() - tick_start)
+            if not ok:
+                failures += 1
+            expected_clicks[name] = expected_clicks.get(name, 0) + 1
+
+    cpu_before = _ResourceSampler.cpu_seconds()
+    with _ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=workers) as pool:
+        end = start + duration
+        while schedule and schedule[0][0] < end:
+            due, name = heapq.heappop(schedule)
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(tick, due, name)
+            heapq.heappush(schedule, (due + interval, name))
+        # 线程池在退出时等待已提交的运行完成
+    elapsed = time.monotonic() - start
+    cpu = _ResourceSampler.cpu_seconds() - cpu_before
+
+    completed = len(lags)
+    missed = sum(1 for lag in lags if lag > lag_tolerance)
+    return {
+        "accounts": accounts,
+        "ticks": completed,
+        "elapsed": round(elapsed, 2),
+        "throughput_per_min": round(completed / elapsed * 60, 2) if elapsed else 0,
+        "lag_p50": _percentile(lags, 0.5),
+        "lag_p95": _percentile(lags, 0.95),
+        "lag_max": max(lags) if lags else None,
+        "missed_rate": missed / completed if completed else None,
+        "tick_p50": statistics.median(durations) if durations else None,
+        "cpu_percent": round(cpu / elapsed * 100, 1) if elapsed else None,
+        "peak_rss": sampler.peak_rss,
+        "failure_rate": failures / completed if completed else None,
+    }
+
+
+def run_ramp(levels: List[int], base_config: Dict, duration: float = 120, interval: float = 60,
+             latency: float = 0.2, workers: int = 0, lag_tolerance: float = 5,
+             max_failure_rate: float = 0.05, progress=None) -> Dict:
+    """
+    逐级运行负载测试并生成容量曲线
+    :param workers: 并发运行数上限，0 表示按 CPU 核数
+    :param lag_tolerance: 调度延迟超过该秒数视为错过计划
+    :param progress: 每完成一级调用 progress(level_result)
+    :return: 容量曲线；capacity 为延迟 p95 与失败率都在阈值内的最大账户数
+    """
+    workers = workers or os.cpu_count() or 1
+    results = []
+    # 负载测试不写入运行历史，避免污染生产统计
+    history_enabled = run_history.settings.get("enabled", True)
+    run_history.configure({"enabled": False})
+    try:
+        with StandInSite(latency) as site:
+            for accounts in levels:
+                logger.info("📈 负载测试：%s 个账户，持续 %s 秒", accounts, duration)
+                result = run_level(accounts, base_config, site, duration, interval, workers, lag_tolerance)
+                results.append(result)
+                if progress:
+                    progress(result)
+    finally:
+        run_history.configure({"enabled": history_enabled})
+
+    capacity = 0
+    for result in results:
+        if ((result["lag_p95"] or 0) <= lag_tolerance
+                and (result["failure_rate"] or 0) <= max_failure_rate):
+            capacity = max(capacity, result["accounts"])
+    return {
+        "version": __version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"cpus": os.cpu_count(), "platform": platform.platform(), "python": platform.python_version()},
+        "params": {"duration": duration, "interval": interval, "latency": latency, "workers": workers,
+                   "lag_tolerance": lag_tolerance, "max_failure_rate": max_failure_rate,
+                   "launch_profile": base_config.get("browser", {}).get("launch_profile", "default")},
+        "levels": results,
+        "capacity": capacity,
+    }
@@ -6,7 +6,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
-from typing import Tuple
+from typing import Callable, Tuple, Union
 
 from ..utils.logger import logger
 
@@ -14,9 +14,22 @@ from ..utils.logger import logger
 class LoginHandler:
     """登录处理器"""
     
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: webdriver.Chrome, timeout: float = 10):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.timeout = timeout
+    
+    def set_timeout(self, timeout: Union[float, Callable[[], float]]):
+        """
+        调整登录各步骤的等待上限
+        :param timeout: 秒数，或每次等待前调用以取得上限的函数（按运行时限的剩余时间）
+        """
+        self.timeout = timeout
+    
+    @property
+    def wait(self) -> WebDriverWait:
+        """每一步等待各自按当前的上限创建（多个步骤合计不会超出阶段预算）"""
+        timeout = self.timeout() if callable(self.timeout) else self.timeout
+        return WebDriverWait(self.driver, timeout)
     
     def check_if_login_required(self) -> bool:
         """
@@ -51,12 +64,12 @@ class LoginHandler:
             login_keywords = ["login", "signin", "auth", "sign-in"]
             for keyword in login_keywords:
                 if keyword in current_url:
-                    logger.info(f"URL包含登录关键词: {keyword}")
+                    logger.info("URL包含登录关键词: %s", keyword)
                     return True
                     
             return False
         except Exception as e:
-            logger.error(f"检测登录状态时出错: {e}")
+            logger.error("检测登录状态时出错: %s", e)
             return False
     
     def perform_login(self, username: str, password: str, selectors: dict) -> bool:
@@ -106,5 +119,5 @@ class LoginHandler:
                 return False
                 
         except Exception as e:
-            logger.error(f"登录过程中发生错误: {e}")
+            logger.error("登录过程中发生错误: %s", e)
             return False
\ No newline at end of file
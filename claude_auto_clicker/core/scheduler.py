@@ -0,0 +1,137 @@
+"""
+自适应调度：根据页面上的冷却状态决定下一次运行时间
+
+每次运行结束前从页面读取冷却信息（CSS 选择器取元素文本，或正则匹配页面内容），支持：
+- 倒计时："01:23:45"、"23:45"、"1h 20m"、"2小时3分"、"45 seconds"
+- 下次可用时间："2026-10-19 18:00"、"Next available at Oct 19, 6:00 PM"（dateutil 解析）
+下一次运行安排在动作恢复可用时（加少量余量），并限制在 [min_interval, max_interval] 之内；
+未启用或读取失败时使用固定的 click_interval。
+"""
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from dateutil import parser as date_parser
+from dateutil import tz
+from selenium.webdriver.common.by import By
+
+from ..utils.logger import logger
+
+DEFAULT_SCHEDULE_SETTINGS = {
+    "enabled": False,
+    "cooldown_selector": "",
+    "cooldown_regex": "",
+    "min_interval": 60,
+    "max_interval": 3600,
+    "margin": 5,
+}
+
+_CLOCK_PATTERN = re.compile(r"^\s*(?:(\d+):)?(\d{1,2}):(\d{2})\s*$")
+_UNIT_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(days?|d|天|hours?|hrs?|h|小时|时|minutes?|mins?|m|分钟|分|seconds?|secs?|s|秒)(?![a-z])",
+    re.IGNORECASE)
+_UNIT_SECONDS = {"d": 86400, "天": 86400, "h": 3600, "小时": 3600, "时": 3600,
+                 "m": 60, "分钟": 60, "分": 60, "s": 1, "秒": 1}
+
+
+def _unit_seconds(unit: str) -> int:
+    unit = unit.lower()
+    if unit in _UNIT_SECONDS:
+        return _UNIT_SECONDS[unit]
+    return _UNIT_SECONDS[unit[0]]
+
+
+def parse_cooldown(text: str, now: datetime = None) -> Optional[float]:
+    """
+    把冷却文本解析为距离恢复可用的秒数
+    :return: 秒数（已可用为 0）；无法识别时返回 None
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+
+    # 倒计时：[HH:]MM:SS
+    match = _CLOCK_PATTERN.match(text)
+    if match:
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+    # 倒计时：带单位的时长
+    units = _UNIT_PATTERN.findall(text)
+    if units:
+        return sum(float(value) * _unit_seconds(unit) for value, unit in units)
+
+    # 下次可用的时间点
+    now = now or datetime.now(tz.tzlocal())
+    try:
+        moment = date_parser.parse(text, fuzzy=True, default=now.replace(second=0, microsecond=0))
+    except (ValueError, OverflowError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz.tzlocal())
+    return max(0.0, (moment - now).total_seconds())
+
+
+class AdaptiveScheduler:
+    """根据页面冷却状态计算下一次运行间隔"""
+
+    def __init__(self, settings: dict = None):
+        self.settings = dict(DEFAULT_SCHEDULE_SETTINGS, **(settings or {}))
+        self.enabled = bool(self.settings["enabled"]) and bool(
+            self.settings["cooldown_selector"] or self.settings["cooldown_regex"])
+        self._regex = re.compile(self.settings["cooldown_regex"]) if self.settings["cooldown_regex"] else None
+        # 动作恢复可用的时间点（time.time()），未知为 None
+        self.available_at: Optional[float] = None
+        # 预检失败等情况指定的下一次重试等待（只生效一次，优先于冷却状态与固定间隔）
+        self.retry_in: Optional[float] = None
+
+    def _read_text(self, driver) -> Optional[str]:
+        """从页面读取冷却文本：选择器优先，正则在选中文本（或整页）中提取"""
+        text = None
+        selector = self.settings["cooldown_selector"]
+        if selector:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if not elements:
+                return None
+            element = elements[0]
+            text = (element.text or element.get_attribute("datetime")
+                    or element.get_attribute("title") or "")
+        if self._regex:
+            source = text if text is not None else driver.find_element(By.TAG_NAME, "body").text
+            match = self._regex.search(source or "")
+            if not match:
+                return None
+            text = match.group(1) if match.groups() else match.group(0)
+        return text
+
+    def observe(self, driver):
+        """运行结束前读取页面冷却状态（失败不影响本次运行结果）"""
+        if not self.enabled:
+            return
+        self.available_at = None
+        try:
+            text = self._read_text(driver)
+            seconds = parse_cooldown(text) if text else None
+        except Exception as e:
+            logger.debug("读取冷却状态失败: %s", e)
+            return
+        if seconds is None:
+            logger.info("未读取到冷却状态，下次按固定间隔运行")
+            return
+        self.available_at = time.time() + seconds
+        logger.info("⏳ 页面冷却状态 \"%s\"：%.0f 秒后可用", text.strip(), seconds)
+
+    def retry_after(self, seconds: float):
+        """下一次运行改为 seconds 秒后重试"""
+        self.retry_in = seconds
+
+    def next_interval(self, default_interval: float) -> float:
+        """下一次运行前的等待秒数"""
+        if self.retry_in is not None:
+            wait, self.retry_in = self.retry_in, None
+            return wait
+        if not self.enabled or self.available_at is None:
+            return default_interval
+        wait = self.available_at - time.time() + float(self.settings["margin"])
+        return min(max(wait, float(self.settings["min_interval"])), float(self.settings["max_interval"]))
@@ -0,0 +1,76 @@
+"""
+页面内定位-等待-点击（click.strategy = "script"）
+
+WebDriverWait + element_to_be_clickable 每 500ms 轮询一次，每次轮询都要经过 chromedriver 往返多次
+（查找、是否显示、是否可用），点击本身还要再往返一次。这里改为注入一个异步脚本：
+在页面内用 MutationObserver 等待元素变为可操作，并在同一轮事件循环中直接点击，只需一次往返。
+
+注意：脚本点击是合成事件（isTrusted 为 false），校验可信事件的站点需使用默认的 webdriver 策略。
+"""
+import time
+from typing import Dict
+
+from selenium.common.exceptions import TimeoutException
+
+_CLICK_SCRIPT = """
+const xpath = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const start = performance.now();
+let located = null, finished = false, observer = null, poller = null, timer = null;
+
+function locate() {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function actionable(el) {
+    if (!el || !el.isConnected || el.disabled || el.getAttribute('aria-disabled') === 'true') return false;
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none' || style.pointerEvents === 'none') return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+
+function finish(result) {
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(poller);
+    clearTimeout(timer);
+    done(result);
+}
+
+function attempt() {
+    if (finished) return;
+    const el = locate();
+    if (el && located === null) located = performance.now() - start;
+    if (!actionable(el)) return;
+    el.scrollIntoView({block: 'center'});
+    const waited = performance.now() - start;
+    el.click();
+    finish({ok: true, located_ms: located, waited_ms: waited, click_ms: performance.now() - start - waited});
+}
+
+attempt();
+if (!finished) {
+    observer = new MutationObserver(attempt);
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+    // 样式表加载等不触发 DOM 变更的情况由低频轮询兜底
+    poller = setInterval(attempt, 100);
+    timer = setTimeout(() => finish({ok: false, located_ms: located, waited_ms: performance.now() - start}), timeoutMs);
+}
+"""
+
+
+def script_click(driver, xpath: str, timeout: float) -> Dict:
+    """
+    在页面内等待 xpath 对应元素可操作并点击
+    :return: {"ok", "located_ms", "waited_ms", "click_ms", "round_trip_ms"}，located_ms 为 None 表示元素从未出现
+    """
+    # 脚本超时留出余量，由页面内的计时器先返回结果
+    driver.set_script_timeout(timeout + 5)
+    start = time.perf_counter()
+    try:
+        result = driver.execute_async_script(_CLICK_SCRIPT, xpath, int(timeout * 1000))
+    except TimeoutException:
+        result = {"ok": False, "located_ms": None, "waited_ms": timeout * 1000}
+    result = dict(result or {"ok": False})
+    result["round_trip_ms"] = (time.perf_counter() - start) * 1000
+    return result
@@ -0,0 +1,113 @@
+"""
+进程活动检测
+
+跟踪被包装的 claude 进程是否仍在被使用：
+- 有 /proc 时比较进程树的 CPU 时间、I/O 字节数与子进程集合的变化
+- 没有 /proc 时（如 macOS）退回到控制终端的访问/修改时间（终端输入输出都会更新）
+"""
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+from . import procfs
+
+# 两次采样之间超过这些增量才视为活动（过滤 Node 事件循环等后台噪声）
+CPU_ACTIVE_SECONDS = 0.05
+IO_ACTIVE_BYTES = 4096
+
+
+def controlling_tty() -> Optional[str]:
+    """当前进程所在的终端设备路径，没有终端时返回 None"""
+    for stream in (sys.stdin, sys.stdout, sys.stderr):
+        try:
+            return os.ttyname(stream.fileno())
+        except (AttributeError, OSError, ValueError):
+            continue
+    return None
+
+
+class ActivityMonitor:
+    """被包装进程的活动监视器"""
+
+    def __init__(self, pid: int, idle_timeout: float = 900, tty: str = None):
+        """
+        :param tty: claude 所在的终端；调用方自身没有终端时（如隔离的点击进程）由启动方传入
+        """
+        self.pid = pid
+        self.idle_timeout = idle_timeout
+        self.tty = tty or controlling_tty()
+        self.use_proc = procfs.is_available()
+        self.last_active = time.monotonic()
+        self._last_sample = self._sample()
+
+    @property
+    def source(self) -> str:
+        """活动来源描述（用于日志）"""
+        if self.use_proc:
+            return "/proc"
+        return f"终端 {self.tty}" if self.tty else "无（始终视为活动）"
+
+    def _sample(self):
+        if self.use_proc:
+            counters = procfs.tree_counters(self.pid)
+            if counters is not None:
+                counters["pids"] = frozenset(procfs.process_tree(self.pid))
+            return counters
+        if self.tty:
+            try:
+                st = os.stat(self.tty)
+                return {"tty": max(st.st_atime, st.st_mtime)}
+            except OSError:
+                return None
+        return None
+
+    def _changed(self, before, after) -> bool:
+        if before is None or after is None:
+            # 无法采样时宁可继续点击，不因检测失败而停止
+            return True
+        if "tty" in after:
+            return after["tty"] > before["tty"]
+        return (after["cpu"] - before["cpu"] >= CPU_ACTIVE_SECONDS
+                or after["io"] - before["io"] >= IO_ACTIVE_BYTES
+                or after["pids"] != before["pids"])
+
+    def sample(self) -> bool:
+        """采样一次，返回自上次采样以来是否有活动"""
+        current = self._sample()
+        active = self._changed(self._last_sample, current)
+        self._last_sample = current
+        if active:
+            self.last_active = time.monotonic()
+        return active
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_active
+
+    def is_idle(self) -> bool:
+        return self.idle_timeout > 0 and self.idle_seconds() >= self.idle_timeout
+
+    def wait(self, seconds: float, stop_event: threading.Event, poll: float = 5) -> bool:
+        """
+        等待指定时长，期间按 poll 间隔采样活动
+        :return: 收到停止信号返回 True
+        """
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if stop_event.wait(min(poll, remaining)):
+                return True
+            self.sample()
+
+    def wait_for_activity(self, stop_event: threading.Event, poll: float = 5) -> bool:
+        """
+        空闲期间阻塞，直到检测到活动
+        :return: 检测到活动返回 True，收到停止信号返回 False
+        """
+        while not stop_event.wait(poll):
+            if self.sample():
+                return True
+        return False
@@ -0,0 +1,239 @@
+"""
+用户级内容寻址制品缓存
+
+同一台机器上的多个项目副本共享下载过的浏览器压缩包与解压后的目录树：
+
+    ~/.cache/claude-auto-clicker/
+    ├── blobs/sha256/ab/<sha256>     # 校验过的压缩包（按内容哈希存放）
+    ├── trees/<sha256>[-<变体>]/     # 解压后的目录树（硬链接到各项目）
+    ├── tmp/                         # 下载中的文件（支持断点续传）
+    └── index.json                   # 下载地址 / 制品 ID -> 哈希
+
+缓存目录可用环境变量 CLAUDE_AUTO_CLICKER_CACHE 或配置 downloads.cache_dir 覆盖。
+
+多个进程同时获取同一制品时，下载按暂存文件旁的锁文件串行，后到的进程直接复用前者的结果。
+项目中的目录树与缓存共享 inode，应视为只读：需要修改权限或内容的文件先用 detach() 换成独立副本。
+"""
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from .extractor import HashingTee
+from .logger import logger
+
+
+def default_cache_dir() -> Path:
+    """返回默认缓存目录（遵循 XDG_CACHE_HOME / LOCALAPPDATA）"""
+    override = os.environ.get("CLAUDE_AUTO_CLICKER_CACHE")
+    if override:
+        return Path(override).expanduser()
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "claude-auto-clicker" / "cache"
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "claude-auto-clicker"
+
+
+def _link_or_copy(src: str, dst: str):
+    """优先创建硬链接，跨文件系统或不支持时退回复制"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """跨进程独占锁（阻塞等待），不支持文件锁的平台上不加锁"""
+    with open(path, "a+b") as handle:
+        try:
+            if os.name == "nt":
+                import msvcrt
+                handle.seek(0)
+                # LK_LOCK 最多重试 10 秒后报错，循环直到拿到锁
+                while True:
+                    try:
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        yield
+
+
+def detach(path: Path):
+    """把与缓存共享 inode 的硬链接换成独立副本，之后修改它不会影响缓存"""
+    path = Path(path)
+    if path.is_symlink() or path.stat().st_nlink <= 1:
+        return
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}")
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
+
+
+class ArtifactCache:
+    """按 SHA-256 寻址的下载制品缓存"""
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root).expanduser() if root else default_cache_dir()
+        self.blobs_dir = self.root / "blobs" / "sha256"
+        self.trees_dir = self.root / "trees"
+        self.tmp_dir = self.root / "tmp"
+        self.index_file = self.root / "index.json"
+        self._lock = threading.Lock()
+        for directory in (self.blobs_dir, self.trees_dir, self.tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    # ---- 索引 ----
+
+    def _read_index(self) -> dict:
+        try:
+            return json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, key: str, sha256: str, size: int):
+        """更新索引（读-改-原子替换）"""
+        with self._lock:
+            index = self._read_index()
+            index[key] = {"sha256": sha256, "size": size, "stored_at": int(time.time())}
+            tmp = self.index_file.with_name(f"index.{uuid.uuid4().hex}.tmp")
+            tmp.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.index_file)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """查询下载地址或制品 ID 对应的已知哈希"""
+        entry = self._read_index().get(key)
+        return entry.get("sha256") if entry else None
+
+    # ---- 压缩包 ----
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs_dir / sha256[:2] / sha256
+
+    def has_blob(self, sha256: str) -> bool:
+        return self.blob_path(sha256).is_file()
+
+    def fetch(self, key: str, url: str, engine, expected_sha256: str = None,
+              name: str = None, mirrors: List[str] = None) -> Tuple[Path, str]:
+        """
+        获取制品：缓存命中直接返回，否则下载并在写入时计算哈希
+        首次下载的哈希会记入索引，之后同一 key（下载地址或制品 ID）的下载都以它为准校验
+        :param mirrors: 同一制品的备用下载地址
+        :return: (缓存中的压缩包路径, SHA-256)
+        """
+        known = (expected_sha256 or self.lookup(key) or "").lower() or None
+        if known and self.has_blob(known):
+            logger.info("♻️  命中制品缓存: %s (%s)", name or key, known[:12])
+            return self.blob_path(known), known
+
+        staging = self.tmp_dir / hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        # 同一制品同一时间只有一个进程写暂存文件；等到锁时对方可能已经完成
+        with _file_lock(staging.with_name(staging.name + ".lock")):
+            known = (expected_sha256 or self.lookup(key) or "").lower() or None
+            if known and self.has_blob(known):
+                logger.info("♻️  命中制品缓存: %s (%s)", name or key, known[:12])
+                return self.blob_path(known), known
+            sha256 = engine.download(url, staging, name=name, expected_sha256=known, mirrors=mirrors)
+            target = self.blob_path(sha256)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            size = staging.stat().st_size
+            os.replace(staging, target)
+            try:
+                os.chmod(target, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            except OSError:
+                pass
+            self._record(key, sha256, size)
+        logger.info("制品已存入缓存: %s (%s)", name or key, sha256[:12])
+        return target, sha256
+
+    # ---- 解压目录树 ----
+
+    def materialize(self, sha256: str, dest: Path,
+                    extract: Callable[[Path, Path], bool], variant: str = None) -> bool:
+        """
+        把压缩包解压后的目录树硬链接到 dest
+        目录树只在缓存中解压一次，多个项目共享同一份文件；dest 中的文件是与缓存共享的只读副本，
+        修改权限或内容前需先 detach()
+        :param extract: extract(压缩包路径, 目标目录) -> 是否成功
+        :param variant: 同一压缩包的不同解压方式（如精简配置）各自缓存
+        """
+        tree = self.trees_dir / (f"{sha256}-{variant}" if variant else sha256)
+        if not tree.is_dir():
+            staging = self.trees_dir / f".staging-{uuid.uuid4().hex}"
+            if not extract(self.blob_path(sha256), staging):
+                shutil.rmtree(staging, ignore_errors=True)
+                return False
+            try:
+                os.rename(staging, tree)
+            except OSError:
+                # 其他进程已抢先完成解压
+                shutil.rmtree(staging, ignore_errors=True)
+                if not tree.is_dir():
+                    raise
+        else:
+            logger.info("♻️  复用已解压目录树: %s", tree.name)
+
+        dest.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(tree, dest, symlinks=True, copy_function=_link_or_copy,
+                        dirs_exist_ok=True)
+        return True
+
+    def fetch_streaming(self, key: str, url: str, session,
+                        extract_stream: Callable[[object, Path], object],
+                        variant: str = None, name: str = None, expected_sha256: str = None,
+                        on_chunk: Callable[[int], None] = None) -> str:
+        """
+        边下载边解压（适用于 tar.gz 等可顺序读取的格式）
+        原始字节同时写入缓存并计算 SHA-256，完成后压缩包与目录树都进入缓存
+        :param extract_stream: extract_stream(可读流, 目标目录)
+        :return: SHA-256
+        """
+        known = (expected_sha256 or self.lookup(key) or "").lower() or None
+        if known and self.has_blob(known):
+            logger.info("♻️  命中制品缓存: %s (%s)", name or key, known[:12])
+            return known
+
+        # 流式下载不续传，每个进程使用独立的暂存文件，由最终的原子改名决定谁写入缓存
+        staging_blob = self.tmp_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.{uuid.uuid4().hex[:8]}.stream"
+        staging_tree = self.trees_dir / f".staging-{uuid.uuid4().hex}"
+        try:
+            response = session.get(url, stream=True, timeout=60)
+            with response:
+                response.raise_for_status()
+                with open(staging_blob, "wb") as sink:
+                    tee = HashingTee(response.iter_content(chunk_size=65536), sink, on_chunk)
+                    extract_stream(tee, staging_tree)
+                    tee.drain()
+            sha256 = tee.sha256.hexdigest()
+            if known and sha256 != known:
+                raise ValueError(f"SHA-256 校验失败: {sha256} != {known}")
+
+            target = self.blob_path(sha256)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staging_blob, target)
+            self._record(key, sha256, tee.size)
+            tree = self.trees_dir / (f"{sha256}-{variant}" if variant else sha256)
+            try:
+                os.rename(staging_tree, tree)
+            except OSError:
+                shutil.rmtree(staging_tree, ignore_errors=True)
+            logger.info("流式下载并解压完成: %s (%s)", name or key, sha256[:12])
+            return sha256
+        finally:
+            shutil.rmtree(staging_tree, ignore_errors=True)
+            try:
+                staging_blob.unlink()
+            except FileNotFoundError:
+                pass
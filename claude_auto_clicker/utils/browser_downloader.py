@@ -4,37 +4,183 @@
 包含：
 - ChromiumDownloader：仅管理便携式 Chromium
 - BrowserDownloader：同时管理 Chromium 与 ChromeDriver（供 CLI 与运行时优先使用项目内驱动）
+
+两者都按版本安装到 <组件目录>/versions/<版本>/，试启动成功后才原子切换 current 指针，
+旧版本在没有进程使用后回收；查找时先看 current，再兼容旧的平铺布局。
 """
 import os
 import sys
 import shutil
 import tarfile
 import zipfile
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
 from ..utils.logger import logger
-#
+from .artifact_cache import ArtifactCache, detach
+from .browser_versions import VersionStore, smoke_test
+from .download_engine import DownloadEngine, DownloadError, DownloadProgress, create_session
+from .extractor import ProfileFilter, extract_tar, extract_zip, read_manifest, tree_size
+from .mirrors import DEFAULT_MIRRORS, MirrorSelector, artifact_id, candidate_urls
+
+# 可边下载边解压的归档后缀
+STREAMABLE_SUFFIXES = (".tar.gz", ".tgz")
+
+
+def _fetch_streaming(cache: ArtifactCache, session, progress: DownloadProgress,
+                     url: str, name: str, key: str = None, expected_sha256: str = None,
+                     extract_stream: Callable[[object, Path], object] = None,
+                     variant: str = None) -> Optional[str]:
+    """
+    tar.gz 归档边下载边解压进缓存；失败返回 None，由调用方回退为先下载后解压
+    :param extract_stream: extract_stream(可读流, 目标目录)，需与 variant 对应的解压配置一致
+    """
+    if extract_stream is None or not url.endswith(STREAMABLE_SUFFIXES):
+        return None
+    try:
+        progress.start(name, 0)
+        sha256 = cache.fetch_streaming(key or url, url, session, extract_stream, variant=variant, name=name,
+                                       expected_sha256=expected_sha256, on_chunk=lambda n: progress.advance(name, n))
+        progress.finish(name)
+        return sha256
+    except Exception as e:
+        logger.warning("流式下载解压失败，回退为先下载后解压: %s", e)
+        return None
+
+
+def _fetch_artifact(cache: ArtifactCache, engine: DownloadEngine, session, progress: DownloadProgress,
+                    settings: dict, component: str, artifact: dict, name: str,
+                    extract_stream: Callable[[object, Path], object] = None,
+                    variant: str = None) -> Optional[str]:
+    """
+    获取制品并返回 SHA-256：哈希已知时从最快的镜像下载（中途失败切换镜像续传），否则只用主镜像
+    :param artifact: {"path": 镜像中的相对路径, "sha256": 固定的哈希（未固定为 None）}
+    :param extract_stream: tar.gz 制品边下载边解压时使用的解压函数，解压结果按 variant 存入缓存
+    所有镜像都按同一个哈希校验：优先使用固定的哈希，其次是本机缓存索引中记录的哈希；
+    两者都没有时只从主镜像下载，不让第三方镜像决定写入索引的哈希
+    """
+    path = artifact["path"]
+    key = artifact_id(component, path)
+    primary = DEFAULT_MIRRORS[component][0].format(path=path)
+    pinned = artifact.get("sha256") or (settings.get('pinned_sha256') or {}).get(key)
+    # 兼容按下载地址记录的旧索引
+    known = (pinned or cache.lookup(key) or cache.lookup(primary) or "").lower() or None
+    if known and cache.has_blob(known):
+        logger.info("♻️  命中制品缓存: %s (%s)", name, known[:12])
+        return known
+    if known:
+        urls = candidate_urls(component, path, (settings.get('mirrors') or {}).get(component))
+        if settings.get('probe_mirrors', True):
+            urls = MirrorSelector(session).rank(urls)
+    else:
+        logger.warning("⚠️  %s 没有固定或已记录的 SHA-256，仅从主镜像下载"
+                       "（镜像选择不生效，可在 downloads.pinned_sha256 中固定哈希）", name)
+        urls = [primary]
+    logger.info("开始下载: %s", urls[0])
+    sha256 = _fetch_streaming(cache, session, progress, urls[0], name, key, known, extract_stream, variant)
+    if sha256:
+        return sha256
+    archive_path, sha256 = cache.fetch(key, urls[0], engine, expected_sha256=known, name=name,
+                                       mirrors=urls[1:])
+    # 小于 1KB 可能是错误页面
+    if archive_path.stat().st_size < 1024:
+        logger.error("下载的文件太小 (%s bytes)，可能下载失败", archive_path.stat().st_size)
+        return None
+    logger.info("下载完成: %s (%s bytes, sha256=%s)", archive_path, archive_path.stat().st_size, sha256)
+    return sha256
+
+
+def _find_executable(store: VersionStore, names: Iterable[str],
+                     executable_only: bool = False) -> Optional[Path]:
+    """
+    查找可执行文件：先在 current 指向的版本中找，再回退到旧的平铺布局（跳过 versions/）
+    :param executable_only: 只返回有执行权限的文件（Windows 的 .exe 除外）
+    """
+    current = store.current_dir()
+    roots = [current] if current else []
+    roots.append(store.base_dir)
+    for base in roots:
+        for root, dirs, files in os.walk(base):
+            if Path(root) == store.base_dir:
+                dirs[:] = [d for d in dirs if d != "versions" and not d.startswith(".")]
+            for file in files:
+                if file not in names:
+                    continue
+                file_path = Path(root) / file
+                if not executable_only or os.access(file_path, os.X_OK) or file_path.suffix == ".exe":
+                    return file_path
+                logger.warning("⚠️  文件不可执行: %s", file_path)
+    return None
+
+
+def _install_version(store: VersionStore, cache: ArtifactCache, sha256: str, key: str,
+                     extract: Callable[[Path, Path], bool], names: Iterable[str],
+                     variant: str = None, activate: bool = True, info: dict = None) -> Optional[Path]:
+    """
+    把缓存中的压缩包安装为独立版本目录
+    解压到临时目录 -> 设置权限 -> 试启动 -> 改名为正式版本 -> 切换 current（activate=False 时只预取）
+    :return: 版本目录中的可执行文件路径，失败返回 None
+    """
+    if store.is_complete(key):
+        logger.info("♻️  版本已安装: %s", key)
+    else:
+        staging = store.stage(key)
+        try:
+            if not cache.materialize(sha256, staging, extract, variant=variant):
+                return None
+            exe = _find_executable(VersionStore(staging), names)
+            if not exe:
+                logger.error("未找到可执行文件: %s", "/".join(names))
+                return None
+            if sys.platform != "win32":
+                # 目录树与缓存共享 inode，先换成独立副本再改权限
+                detach(exe)
+                os.chmod(exe, 0o755)
+            if not smoke_test(exe):
+                logger.error("❌ 新版本试启动失败，保留当前版本: %s", key)
+                return None
+            store.commit(staging, key, info)
+        finally:
+            store.discard(staging)
+
+    if activate:
+        store.activate(key)
+        store.gc()
+    else:
+        logger.info("📦 已预取版本 %s（未切换，使用 browser-versions --activate 切换）", key)
+    return _find_executable(VersionStore(store.version_dir(key)), names)
+
 
 class ChromiumDownloader:
     """便携式 Chromium 下载器"""
     
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, download_settings: dict = None):
         self.project_root = project_root
         self.browsers_dir = project_root / "browsers"
         self.chromium_dir = self.browsers_dir / "chromium"
+        self.download_settings = download_settings or {}
+        self.session = create_session()
+        self.progress = DownloadProgress()
+        self.engine = DownloadEngine.from_settings(download_settings, self.session, self.progress)
+        self.extract_workers = int(self.download_settings.get('extract_workers') or 0) or None
+        self.extract_profile = self.download_settings.get('extract_profile') or 'full'
+        self.extract_locale = self.download_settings.get('extract_locale') or 'en-US'
+        self._cache = None
+        self.store = VersionStore(self.chromium_dir)
         
-        # Chromium 下载 URL 配置（使用已验证可用的版本）
-        self.chromium_urls = {
+        # Chromium 制品路径与固定的 SHA-256（使用已验证可用的版本，镜像地址见 mirrors.DEFAULT_MIRRORS）
+        # sha256 为 None 的条目尚未固定：从主镜像下载一次核对后填入，或用 downloads.pinned_sha256 配置
+        self.chromium_version = "1108766"
+        self.chromium_paths = {
             "linux": {
-                "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Linux_x64/1108766/chrome-linux.zip",
+                "x64": {"path": "Linux_x64/1108766/chrome-linux.zip", "sha256": None},
             },
             "windows": {
-                "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Win_x64/1108766/chrome-win.zip",
+                "x64": {"path": "Win_x64/1108766/chrome-win.zip", "sha256": None},
             },
             "darwin": {  # macOS
-                "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Mac/1108766/chrome-mac.zip"
+                "x64": {"path": "Mac/1108766/chrome-mac.zip", "sha256": None}
             }
         }
     
@@ -53,109 +199,75 @@ class ChromiumDownloader:
         
         return platform, arch
     
-    def _download_file(self, url: str, filepath: Path, show_progress: bool = True) -> bool:
-        """下载文件"""
+    @property
+    def cache(self) -> ArtifactCache:
+        """用户级共享制品缓存（首次使用时创建目录）"""
+        if self._cache is None:
+            self._cache = ArtifactCache(self.download_settings.get('cache_dir') or None)
+        return self._cache
+    
+    def _fetch_archive(self, component: str, artifact: dict, name: str) -> Optional[str]:
+        """通过共享缓存获取压缩包（断点续传 + 流式 SHA-256 校验，哈希已知时使用最快的镜像），返回哈希"""
         try:
-            logger.info(f"开始下载: {url}")
-            
-            # 添加用户代理和其他头部
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, stream=True, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            # 检查内容类型
-            content_type = response.headers.get('content-type', '')
-            logger.info(f"下载内容类型: {content_type}")
-            
-            # 如果是 HTML 页面，说明可能是重定向错误
-            if 'text/html' in content_type:
-                logger.error(f"下载的是 HTML 页面而不是文件，URL 可能有问题: {url}")
-                return False
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if show_progress and total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            print(f"\r下载进度: {progress:.1f}%", end='', flush=True)
-            
-            if show_progress:
-                print()  # 换行
-            
-            # 验证下载的文件大小
-            if filepath.stat().st_size < 1024:  # 小于 1KB 可能是错误页面
-                logger.error(f"下载的文件太小 ({filepath.stat().st_size} bytes)，可能下载失败")
-                if filepath.exists():
-                    filepath.unlink()
-                return False
-            
-            logger.info(f"下载完成: {filepath} ({filepath.stat().st_size} bytes)")
-            return True
-            
+            return _fetch_artifact(self.cache, self.engine, self.session, self.progress,
+                                   self.download_settings, component, artifact, name,
+                                   self._extract_stream_with_profile, self._profile_variant())
+        except DownloadError as e:
+            logger.error("%s", e)
+            return None
         except Exception as e:
-            logger.error(f"下载失败: {e}")
-            if filepath.exists():
-                filepath.unlink()
-            return False
+            logger.error("下载失败: %s", e)
+            return None
     
-    def _extract_archive(self, archive_path: Path, extract_to: Path) -> bool:
-        """解压归档文件"""
+    def _extract_archive(self, archive_path: Path, extract_to: Path,
+                         member_filter: ProfileFilter = None) -> bool:
+        """解压归档文件（member_filter 决定哪些成员需要解压）"""
         try:
             extract_to.mkdir(parents=True, exist_ok=True)
-            logger.info(f"开始解压: {archive_path} -> {extract_to}")
+            logger.info("开始解压: %s -> %s", archive_path, extract_to)
             
             # 检查文件头部来确定实际文件类型
             with open(archive_path, 'rb') as f:
-                header = f.read(10)
+                header = f.read(262)
             
             # ZIP 文件魔术数字
             if header[:2] == b'PK':
                 logger.info("检测到 ZIP 文件")
                 try:
-                    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                        zip_ref.extractall(extract_to)
-                    logger.info(f"ZIP 解压完成: {extract_to}")
+                    extract_zip(archive_path, extract_to, self.extract_workers, member_filter)
+                    logger.info("ZIP 解压完成: %s", extract_to)
                     return True
                 except zipfile.BadZipFile as e:
-                    logger.error(f"ZIP 文件损坏: {e}")
+                    logger.error("ZIP 文件损坏: %s", e)
                     return False
             
             # TAR/GZIP 文件魔术数字
             elif header[:2] == b'\x1f\x8b':  # GZIP
                 logger.info("检测到 GZIP 文件")
                 try:
-                    with tarfile.open(archive_path, 'r:gz') as tar_ref:
-                        tar_ref.extractall(extract_to)
-                    logger.info(f"GZIP 解压完成: {extract_to}")
+                    with open(archive_path, 'rb') as f:
+                        extract_tar(f, extract_to, member_filter)
+                    logger.info("GZIP 解压完成: %s", extract_to)
                     return True
                 except tarfile.ReadError as e:
-                    logger.error(f"GZIP 文件处理失败: {e}")
+                    logger.error("GZIP 文件处理失败: %s", e)
                     return False
             
-            # 纯 TAR 文件
-            elif header[:5] == b'ustar':
+            # 纯 TAR 文件（ustar 标识位于偏移 257）
+            elif header[257:262] == b'ustar':
                 logger.info("检测到 TAR 文件")
                 try:
-                    with tarfile.open(archive_path, 'r:') as tar_ref:
-                        tar_ref.extractall(extract_to)
-                    logger.info(f"TAR 解压完成: {extract_to}")
+                    with open(archive_path, 'rb') as f:
+                        extract_tar(f, extract_to, member_filter)
+                    logger.info("TAR 解压完成: %s", extract_to)
                     return True
                 except tarfile.ReadError as e:
-                    logger.error(f"TAR 文件处理失败: {e}")
+                    logger.error("TAR 文件处理失败: %s", e)
                     return False
             
             else:
                 # 尝试读取更多内容来判断
-                logger.warning(f"无法识别文件类型，文件头: {header}")
+                logger.warning("无法识别文件类型，文件头: %s", header)
                 
                 # 先检查文件内容是否是 HTML（错误页面）
                 with open(archive_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -168,124 +280,91 @@ class ChromiumDownloader:
                 if archive_path.suffix == '.zip':
                     logger.info("根据扩展名强制尝试 ZIP 解压")
                     try:
-                        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                            zip_ref.extractall(extract_to)
-                        logger.info(f"强制 ZIP 解压成功: {extract_to}")
+                        extract_zip(archive_path, extract_to, self.extract_workers, member_filter)
+                        logger.info("强制 ZIP 解压成功: %s", extract_to)
                         return True
                     except Exception as e:
-                        logger.error(f"强制 ZIP 解压失败: {e}")
+                        logger.error("强制 ZIP 解压失败: %s", e)
                 
-                logger.error(f"无法处理的文件格式: {archive_path}")
+                logger.error("无法处理的文件格式: %s", archive_path)
                 return False
             
         except Exception as e:
-            logger.error(f"解压过程中出现异常: {e}")
+            logger.error("解压过程中出现异常: %s", e)
             return False
     
-    def _make_executable(self, file_path: Path) -> bool:
-        """设置文件为可执行"""
-        try:
-            if sys.platform != 'win32':
-                os.chmod(file_path, 0o755)
-            return True
-        except Exception as e:
-            logger.error(f"设置可执行权限失败: {e}")
-            return False
+    def _profile_variant(self) -> Optional[str]:
+        """解压配置在缓存中的变体名（full 即原始目录树）"""
+        if self.extract_profile == 'full':
+            return None
+        return f"{self.extract_profile}-{self.extract_locale}"
     
-    def _find_chromium_by_name(self) -> Optional[Path]:
-        """按文件名查找 Chromium 可执行文件（不检查权限）"""
-        possible_names = ['chrome', 'chromium', 'chromium-browser']
-        
-        logger.info(f"在目录 {self.chromium_dir} 中按文件名查找 Chromium...")
-        
-        for root, dirs, files in os.walk(self.chromium_dir):
-            for file in files:
-                if file in possible_names:
-                    file_path = Path(root) / file
-                    logger.info(f"✅ 按文件名找到 Chromium: {file_path}")
-                    return file_path
-        
-        logger.error("❌ 未找到任何 Chromium 文件")
-        return None
+    def _extract_stream_with_profile(self, fileobj, extract_to: Path):
+        """边下载边解压 tar.gz 时同样按解压配置裁剪，并写入裁剪清单"""
+        profile_filter = ProfileFilter(self.extract_profile, self.extract_locale)
+        extract_tar(fileobj, extract_to, profile_filter)
+        profile_filter.write_manifest(extract_to)
+
+    def _extract_with_profile(self, archive_path: Path, extract_to: Path) -> bool:
+        """按解压配置解压，并写入裁剪清单"""
+        profile_filter = ProfileFilter(self.extract_profile, self.extract_locale)
+        if not self._extract_archive(archive_path, extract_to, profile_filter):
+            return False
+        manifest = profile_filter.write_manifest(extract_to)
+        logger.info("解压配置 %s: 保留 %s 个文件，裁剪 %s 个，占用 %.1f MB",
+                    manifest["profile"], manifest["kept_members"],
+                    len(manifest["pruned_members"]), manifest["installed_bytes"] / 1048576)
+        return True
     
     def _find_chromium_executable(self) -> Optional[Path]:
-        """在解压后的文件中查找 Chromium 可执行文件"""
-        possible_names = ['chrome', 'chromium', 'chromium-browser']
-        
-        logger.info(f"在目录 {self.chromium_dir} 中查找 Chromium 可执行文件...")
-        
-        for root, dirs, files in os.walk(self.chromium_dir):
-            for file in files:
-                if file in possible_names:
-                    file_path = Path(root) / file
-                    logger.info(f"找到候选文件: {file_path}")
-                    
-                    # 检查是否可执行
-                    if os.access(file_path, os.X_OK):
-                        logger.info(f"✅ 找到可执行的 Chromium: {file_path}")
-                        return file_path
-                    elif file_path.suffix == '.exe':
-                        logger.info(f"✅ 找到 Windows 可执行文件: {file_path}")
-                        return file_path
-                    else:
-                        logger.warning(f"⚠️  文件不可执行: {file_path}")
-        
-        logger.error("❌ 未找到任何 Chromium 可执行文件")
-        return None
+        """查找 Chromium 可执行文件（优先 current 版本）"""
+        logger.info("在目录 %s 中查找 Chromium 可执行文件...", self.chromium_dir)
+        file_path = _find_executable(self.store, ['chrome', 'chromium', 'chromium-browser', 'chrome.exe'],
+                                     executable_only=True)
+        if file_path:
+            logger.info("✅ 找到可执行的 Chromium: %s", file_path)
+        else:
+            logger.error("❌ 未找到任何 Chromium 可执行文件")
+        return file_path
     
-    def download_and_install(self) -> bool:
-        """下载并安装便携式 Chromium"""
+    def download_and_install(self, activate: bool = True) -> bool:
+        """
+        下载并安装便携式 Chromium
+        :param activate: False 时只预取到 versions/，不切换当前版本
+        """
         platform, arch = self._get_platform_info()
         
-        if platform not in self.chromium_urls:
-            logger.error(f"不支持的平台: {platform}")
+        if platform not in self.chromium_paths:
+            logger.error("不支持的平台: %s", platform)
             return False
         
-        if arch not in self.chromium_urls[platform]:
-            logger.error(f"不支持的架构: {arch}")
+        if arch not in self.chromium_paths[platform]:
+            logger.error("不支持的架构: %s", arch)
             return False
         
         # 创建目录
         self.browsers_dir.mkdir(exist_ok=True)
         
-        # 如果已经存在，询问是否重新下载
-        if self.chromium_dir.exists():
-            logger.info("检测到已存在的 Chromium，将重新下载...")
-            shutil.rmtree(self.chromium_dir)
-        
-        # 下载 URL
-        download_url = self.chromium_urls[platform][arch]
-        
-        # 所有平台都使用 .zip 格式
-        archive_path = self.browsers_dir / f"chromium_{platform}_{arch}.zip"
-        
-        # 下载文件
-        logger.info(f"为 {platform} {arch} 下载 Chromium...")
-        if not self._download_file(download_url, archive_path):
+        # 下载文件（已缓存的相同压缩包直接复用）
+        logger.info("为 %s %s 下载 Chromium...", platform, arch)
+        sha256 = self._fetch_archive("chromium", self.chromium_paths[platform][arch],
+                                     f"chromium_{platform}_{arch}")
+        if not sha256:
             return False
         
-        # 解压文件
-        logger.info("解压 Chromium...")
-        if not self._extract_archive(archive_path, self.chromium_dir):
-            return False
-        
-        # 先按文件名查找，再设置权限
-        chromium_exe = self._find_chromium_by_name()
+        # 解压到独立版本目录（缓存中解压一次，硬链接到项目目录），试启动后再切换
+        logger.info("解压 Chromium (配置: %s)...", self.extract_profile)
+        variant = self._profile_variant()
+        key = "-".join(filter(None, [self.chromium_version, sha256[:12], variant]))
+        chromium_exe = _install_version(
+            self.store, self.cache, sha256, key, self._extract_with_profile,
+            ['chrome', 'chromium', 'chromium-browser', 'chrome.exe'], variant=variant,
+            activate=activate, info={"component": "chromium", "version": self.chromium_version,
+                                     "sha256": sha256, "profile": self.extract_profile})
         if not chromium_exe:
-            logger.error("未找到 Chromium 可执行文件")
-            return False
-        
-        # 设置可执行权限
-        if not self._make_executable(chromium_exe):
-            logger.error("设置可执行权限失败")
             return False
         
-        logger.info(f"已设置可执行权限: {chromium_exe}")
-        
-        # 清理下载的归档文件
-        archive_path.unlink()
-        
-        logger.info(f"✅ Chromium 安装成功: {chromium_exe}")
+        logger.info("✅ Chromium 安装成功: %s", chromium_exe)
         return True
     
     def is_installed(self) -> bool:
@@ -296,6 +375,18 @@ class ChromiumDownloader:
         """获取 Chromium 可执行文件路径"""
         return self._find_chromium_executable()
     
+    def get_install_info(self) -> dict:
+        """获取安装信息：解压配置、裁剪数量与磁盘占用"""
+        install_dir = self.store.current_dir() or self.chromium_dir
+        manifest = read_manifest(install_dir) or {}
+        return {
+            "version": self.store.current_key(),
+            "profile": manifest.get("profile", "full"),
+            "locale": manifest.get("locale"),
+            "pruned_count": len(manifest.get("pruned_members", [])),
+            "installed_bytes": manifest.get("installed_bytes") or tree_size(install_dir),
+        }
+    
     def uninstall(self) -> bool:
         """卸载便携式 Chromium"""
         if self.chromium_dir.exists():
@@ -304,7 +395,7 @@ class ChromiumDownloader:
                 logger.info("✅ 便携式 Chromium 已卸载")
                 return True
             except Exception as e:
-                logger.error(f"卸载失败: {e}")
+                logger.error("卸载失败: %s", e)
                 return False
         else:
             logger.info("便携式 Chromium 未安装")
@@ -314,11 +405,21 @@ class ChromiumDownloader:
 class BrowserDownloader:
     """浏览器下载器 - 下载到项目目录（Chromium + ChromeDriver）"""
 
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, download_settings: dict = None):
         self.project_root = project_root
         self.browsers_dir = project_root / "browsers"
         self.chromium_dir = self.browsers_dir / "chromium"
         self.drivers_dir = self.browsers_dir / "drivers"
+        self.download_settings = download_settings or {}
+        self.session = create_session()
+        self.progress = DownloadProgress()
+        self.engine = DownloadEngine.from_settings(download_settings, self.session, self.progress)
+        self.extract_workers = int(self.download_settings.get("extract_workers") or 0) or None
+        self.extract_profile = self.download_settings.get("extract_profile") or "full"
+        self.extract_locale = self.download_settings.get("extract_locale") or "en-US"
+        self._cache = None
+        self.chromium_store = VersionStore(self.chromium_dir)
+        self.driver_store = VersionStore(self.drivers_dir)
 
         # 确保目录存在
         self.browsers_dir.mkdir(exist_ok=True)
@@ -328,15 +429,15 @@ class BrowserDownloader:
         # Chromium 下载配置（与现有脚本保持一致的稳定版本）
         self.chromium_config = {
             "version": "1108766",
-            "urls": {
+            "paths": {
                 "linux": {
-                    "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Linux_x64/1108766/chrome-linux.zip",
+                    "x64": {"path": "Linux_x64/1108766/chrome-linux.zip", "sha256": None},
                 },
                 "windows": {
-                    "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Win_x64/1108766/chrome-win.zip",
+                    "x64": {"path": "Win_x64/1108766/chrome-win.zip", "sha256": None},
                 },
                 "darwin": {
-                    "x64": "https://storage.googleapis.com/chromium-browser-snapshots/Mac/1108766/chrome-mac.zip",
+                    "x64": {"path": "Mac/1108766/chrome-mac.zip", "sha256": None},
                 },
             },
         }
@@ -344,15 +445,15 @@ class BrowserDownloader:
         # ChromeDriver 下载配置（与上述 Chromium 主版本匹配）
         self.driver_config = {
             "version": "110.0.5481.77",
-            "urls": {
+            "paths": {
                 "linux": {
-                    "x64": "https://chromedriver.storage.googleapis.com/110.0.5481.77/chromedriver_linux64.zip",
+                    "x64": {"path": "110.0.5481.77/chromedriver_linux64.zip", "sha256": None},
                 },
                 "windows": {
-                    "x64": "https://chromedriver.storage.googleapis.com/110.0.5481.77/chromedriver_win32.zip",
+                    "x64": {"path": "110.0.5481.77/chromedriver_win32.zip", "sha256": None},
                 },
                 "darwin": {
-                    "x64": "https://chromedriver.storage.googleapis.com/110.0.5481.77/chromedriver_mac64.zip",
+                    "x64": {"path": "110.0.5481.77/chromedriver_mac64.zip", "sha256": None},
                 },
             },
         }
@@ -369,166 +470,142 @@ class BrowserDownloader:
         arch = "x64" if sys.maxsize > 2 ** 32 else "x86"
         return platform, arch
 
-    def _download_file(self, url: str, filepath: Path, show_progress: bool = True) -> bool:
+    @property
+    def cache(self) -> ArtifactCache:
+        if self._cache is None:
+            self._cache = ArtifactCache(self.download_settings.get("cache_dir") or None)
+        return self._cache
+
+    def _fetch_archive(self, component: str, artifact: dict, name: str,
+                       extract_stream: Callable[[object, Path], object] = None,
+                       variant: str = None) -> Optional[str]:
+        """通过共享缓存获取压缩包（哈希已知时使用最快的镜像），返回 SHA-256"""
         try:
-            logger.info(f"开始下载: {url}")
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/91.0.4472.124 Safari/537.36"
-                )
-            }
-            response = requests.get(url, stream=True, headers=headers, timeout=60)
-            response.raise_for_status()
-
-            total_size = int(response.headers.get("content-length", 0))
-            downloaded = 0
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if show_progress and total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            print(f"\r下载进度: {progress:.1f}%", end="", flush=True)
-            if show_progress:
-                print()
-
-            logger.info(f"下载完成: {filepath} ({filepath.stat().st_size} bytes)")
-            return True
+            return _fetch_artifact(self.cache, self.engine, self.session, self.progress,
+                                   self.download_settings, component, artifact, name,
+                                   extract_stream, variant)
         except Exception as e:
-            logger.error(f"下载失败: {e}")
-            if filepath.exists():
-                try:
-                    filepath.unlink()
-                except Exception:
-                    pass
-            return False
+            logger.error("下载失败: %s", e)
+            return None
 
-    def _extract_zip(self, zip_path: Path, extract_to: Path) -> bool:
+    def _extract_zip(self, zip_path: Path, extract_to: Path,
+                     member_filter: ProfileFilter = None) -> bool:
         try:
             extract_to.mkdir(parents=True, exist_ok=True)
-            logger.info(f"开始解压: {zip_path} -> {extract_to}")
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(extract_to)
-            logger.info(f"解压完成: {extract_to}")
+            logger.info("开始解压: %s -> %s", zip_path, extract_to)
+            extract_zip(zip_path, extract_to, self.extract_workers, member_filter)
+            logger.info("解压完成: %s", extract_to)
             return True
         except Exception as e:
-            logger.error(f"解压失败: {e}")
+            logger.error("解压失败: %s", e)
             return False
 
-    def _make_executable(self, file_path: Path) -> bool:
-        try:
-            if sys.platform != "win32":
-                os.chmod(file_path, 0o755)
-            return True
-        except Exception as e:
-            logger.error(f"设置可执行权限失败: {e}")
+    def _extract_chromium_stream(self, fileobj, extract_to: Path):
+        """边下载边解压 tar.gz 时同样按解压配置裁剪，并写入裁剪清单"""
+        profile_filter = ProfileFilter(self.extract_profile, self.extract_locale)
+        extract_tar(fileobj, extract_to, profile_filter)
+        profile_filter.write_manifest(extract_to)
+
+    def _extract_chromium_zip(self, zip_path: Path, extract_to: Path) -> bool:
+        """按解压配置解压 Chromium，并写入裁剪清单"""
+        profile_filter = ProfileFilter(self.extract_profile, self.extract_locale)
+        if not self._extract_zip(zip_path, extract_to, profile_filter):
             return False
+        manifest = profile_filter.write_manifest(extract_to)
+        logger.info("解压配置 %s: 裁剪 %s 个文件，占用 %.1f MB", manifest["profile"],
+                    len(manifest["pruned_members"]), manifest["installed_bytes"] / 1048576)
+        return True
 
     def _find_chromium_executable(self) -> Optional[Path]:
-        possible_names = ["chrome", "chromium", "chromium-browser", "chrome.exe"]
-        for root, _, files in os.walk(self.chromium_dir):
-            for file in files:
-                if file in possible_names:
-                    return Path(root) / file
-        return None
+        return _find_executable(self.chromium_store, ["chrome", "chromium", "chromium-browser", "chrome.exe"])
 
     def _find_chromedriver_executable(self) -> Optional[Path]:
-        possible_names = ["chromedriver", "chromedriver.exe"]
-        for root, _, files in os.walk(self.drivers_dir):
-            for file in files:
-                if file in possible_names:
-                    return Path(root) / file
-        return None
+        return _find_executable(self.driver_store, ["chromedriver", "chromedriver.exe"])
 
-    def download_chromium(self) -> bool:
+    def download_chromium(self, activate: bool = True) -> bool:
         platform, arch = self._get_platform_info()
-        if platform not in self.chromium_config["urls"]:
-            logger.error(f"不支持的平台: {platform}")
+        if platform not in self.chromium_config["paths"]:
+            logger.error("不支持的平台: %s", platform)
             return False
-        if arch not in self.chromium_config["urls"][platform]:
-            logger.error(f"不支持的架构: {arch}")
+        if arch not in self.chromium_config["paths"][platform]:
+            logger.error("不支持的架构: %s", arch)
             return False
 
-        # 清理旧版本
-        if self.chromium_dir.exists():
-            shutil.rmtree(self.chromium_dir)
-            self.chromium_dir.mkdir()
-
-        url = self.chromium_config["urls"][platform][arch]
-        zip_path = self.browsers_dir / f"chromium_{platform}_{arch}.zip"
-
-        logger.info(f"下载Chromium for {platform} {arch}...")
-        if not self._download_file(url, zip_path):
-            return False
-        if not self._extract_zip(zip_path, self.chromium_dir):
+        logger.info("下载Chromium for %s %s...", platform, arch)
+        variant = None if self.extract_profile == "full" else f"{self.extract_profile}-{self.extract_locale}"
+        sha256 = self._fetch_archive("chromium", self.chromium_config["paths"][platform][arch],
+                                     f"chromium_{platform}_{arch}", self._extract_chromium_stream, variant)
+        if not sha256:
             return False
 
-        chromium_exe = self._find_chromium_executable()
+        version = self.chromium_config["version"]
+        key = "-".join(filter(None, [version, sha256[:12], variant]))
+        chromium_exe = _install_version(
+            self.chromium_store, self.cache, sha256, key, self._extract_chromium_zip,
+            ["chrome", "chromium", "chromium-browser", "chrome.exe"], variant=variant,
+            activate=activate, info={"component": "chromium", "version": version,
+                                     "sha256": sha256, "profile": self.extract_profile})
         if not chromium_exe:
-            logger.error("未找到Chromium可执行文件")
             return False
-        self._make_executable(chromium_exe)
-
-        try:
-            zip_path.unlink()
-        except Exception:
-            pass
-        logger.info(f"✅ Chromium安装成功: {chromium_exe}")
+        logger.info("✅ Chromium安装成功: %s", chromium_exe)
         return True
 
-    def download_chromedriver(self) -> bool:
+    def download_chromedriver(self, activate: bool = True) -> bool:
         platform, arch = self._get_platform_info()
-        if platform not in self.driver_config["urls"]:
-            logger.error(f"不支持的平台: {platform}")
+        if platform not in self.driver_config["paths"]:
+            logger.error("不支持的平台: %s", platform)
             return False
-        if arch not in self.driver_config["urls"][platform]:
-            logger.error(f"不支持的架构: {arch}")
+        if arch not in self.driver_config["paths"][platform]:
+            logger.error("不支持的架构: %s", arch)
             return False
 
-        # 清理旧版本
-        if self.drivers_dir.exists():
-            shutil.rmtree(self.drivers_dir)
-            self.drivers_dir.mkdir()
-
-        url = self.driver_config["urls"][platform][arch]
-        zip_path = self.browsers_dir / f"chromedriver_{platform}_{arch}.zip"
-
-        logger.info(f"下载ChromeDriver for {platform} {arch}...")
-        if not self._download_file(url, zip_path):
-            return False
-        if not self._extract_zip(zip_path, self.drivers_dir):
+        logger.info("下载ChromeDriver for %s %s...", platform, arch)
+        sha256 = self._fetch_archive("chromedriver", self.driver_config["paths"][platform][arch],
+                                     f"chromedriver_{platform}_{arch}", extract_tar)
+        if not sha256:
             return False
 
-        driver_exe = self._find_chromedriver_executable()
+        version = self.driver_config["version"]
+        driver_exe = _install_version(
+            self.driver_store, self.cache, sha256, f"{version}-{sha256[:12]}", self._extract_zip,
+            ["chromedriver", "chromedriver.exe"], activate=activate,
+            info={"component": "chromedriver", "version": version, "sha256": sha256})
         if not driver_exe:
-            logger.error("未找到ChromeDriver可执行文件")
             return False
-        self._make_executable(driver_exe)
-
-        try:
-            zip_path.unlink()
-        except Exception:
-            pass
-        logger.info(f"✅ ChromeDriver安装成功: {driver_exe}")
+        logger.info("✅ ChromeDriver安装成功: %s", driver_exe)
         return True
 
-    def download_all(self) -> bool:
+    def download_all(self, activate: bool = True) -> bool:
+        """
+        并发下载 Chromium 与 ChromeDriver
+        两个组件各自"下载 -> 解压"，共享同一个 keep-alive 会话，
+        一个组件解压时另一个仍在下载，总耗时约等于最大的单个组件
+        :param activate: False 时只预取新版本，不切换当前版本
+        """
         logger.info("开始下载浏览器组件...")
+        tasks = {
+            "Chromium": lambda: self.download_chromium(activate),
+            "ChromeDriver": lambda: self.download_chromedriver(activate),
+        }
         ok = True
-        if not self.download_chromium():
-            logger.error("Chromium下载失败")
-            ok = False
-        if not self.download_chromedriver():
-            logger.error("ChromeDriver下载失败")
-            ok = False
-        if ok:
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="browser-download") as pool:
+            futures = {name: pool.submit(task) for name, task in tasks.items()}
+            for name, future in futures.items():
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.error("%s下载异常: %s", name, e)
+                    success = False
+                if not success:
+                    logger.error("%s下载失败", name)
+                    ok = False
+        if not ok:
+            logger.error("❌ 部分组件下载失败")
+        elif activate:
             self._create_version_info()
             logger.info("✅ 所有浏览器组件下载完成")
         else:
-            logger.error("❌ 部分组件下载失败")
+            logger.info("📦 所有浏览器组件已预取（未切换当前版本）")
         return ok
 
     def _create_version_info(self):
@@ -542,7 +619,7 @@ class BrowserDownloader:
         version_file = self.browsers_dir / "version.json"
         with open(version_file, "w", encoding="utf-8") as f:
             json.dump(version_info, f, indent=2, ensure_ascii=False)
-        logger.info(f"版本信息已保存: {version_file}")
+        logger.info("版本信息已保存: %s", version_file)
 
     def is_installed(self) -> bool:
         return self.get_chromium_path() is not None and self.get_chromedriver_path() is not None
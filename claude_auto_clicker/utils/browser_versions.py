@@ -0,0 +1,234 @@
+"""
+浏览器组件多版本并存与原子切换
+
+    browsers/chromium/
+    ├── versions/
+    │   ├── 1108766-3f2a9c1b04de/      # 每个版本独立目录
+    │   └── 1109000-77aa01c2d3e4/
+    └── current -> versions/1108766-3f2a9c1b04de
+
+新版本先在 versions/.staging-* 中解压并试启动，成功后改名为正式目录，最后原子替换
+current 指针（符号链接；不支持符号链接的系统使用内容为版本名的指针文件）。
+运行中的点击器对所用版本持有租约（versions/<版本>/.leases/<pid>-*），
+垃圾回收只删除没有存活租约、且早于当前版本安装的旧版本。
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from .logger import logger
+
+VERSION_INFO = ".version.json"
+LEASES_DIR = ".leases"
+
+
+def pid_alive(pid: int) -> bool:
+    """判断进程是否存活"""
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def smoke_test(executable: Path, timeout: int = 30) -> bool:
+    """试运行可执行文件（--version），确认依赖库齐全、文件可执行"""
+    if sys.platform == "win32" and executable.name.lower() == "chrome.exe":
+        # Windows 版 chrome.exe 不支持 --version 输出，仅检查文件存在
+        return executable.is_file()
+    try:
+        result = subprocess.run([str(executable), "--version"], capture_output=True,
+                                text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error("试启动失败: %s (%s)", executable, e)
+        return False
+    if result.returncode != 0:
+        logger.error("试启动失败: %s 退出码 %s: %s", executable, result.returncode,
+                     (result.stderr or result.stdout).strip()[:200])
+        return False
+    logger.info("试启动成功: %s", (result.stdout or "").strip())
+    return True
+
+
+class VersionStore:
+    """管理一个组件目录下的多个版本与 current 指针"""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self.versions_dir = self.base_dir / "versions"
+        self.pointer = self.base_dir / "current"
+
+    # ---- 查询 ----
+
+    def version_dir(self, key: str) -> Path:
+        return self.versions_dir / key
+
+    def is_complete(self, key: str) -> bool:
+        return (self.version_dir(key) / VERSION_INFO).is_file()
+
+    def current_key(self) -> Optional[str]:
+        """读取 current 指针指向的版本名"""
+        try:
+            if self.pointer.is_symlink():
+                return Path(os.readlink(self.pointer)).name
+            if self.pointer.is_file():
+                return self.pointer.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            pass
+        return None
+
+    def current_dir(self) -> Optional[Path]:
+        """当前版本的实际目录（不经过符号链接，切换后仍指向原版本）"""
+        key = self.current_key()
+        if key and self.is_complete(key):
+            return self.version_dir(key)
+        return None
+
+    def list_versions(self) -> List[dict]:
+        """列出所有已安装版本（按安装时间排序）"""
+        versions = []
+        if not self.versions_dir.is_dir():
+            return versions
+        current = self.current_key()
+        for entry in self.versions_dir.iterdir():
+            if entry.name.startswith(".") or not self.is_complete(entry.name):
+                continue
+            info = json.loads((entry / VERSION_INFO).read_text(encoding="utf-8"))
+            info["key"] = entry.name
+            info["current"] = entry.name == current
+            info["leases"] = self.live_leases(entry.name)
+            versions.append(info)
+        versions.sort(key=lambda v: v.get("installed_at", 0))
+        return versions
+
+    # ---- 安装与切换 ----
+
+    def stage(self, key: str) -> Path:
+        """创建临时目录，用于下载解压新版本"""
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.versions_dir / f".staging-{key}-{uuid.uuid4().hex[:8]}"
+        staging.mkdir()
+        return staging
+
+    def commit(self, staging: Path, key: str, info: dict = None) -> Path:
+        """把已验证的临时目录转为正式版本目录"""
+        record = dict(info or {})
+        record.setdefault("installed_at", time.time())
+        (staging / VERSION_INFO).write_text(json.dumps(record, indent=2, ensure_ascii=False),
+                                            encoding="utf-8")
+        target = self.version_dir(key)
+        if target.exists():
+            # 同名版本已存在（内容由哈希决定，必然相同），保留正在使用的那份
+            shutil.rmtree(staging, ignore_errors=True)
+            return target
+        os.rename(staging, target)
+        return target
+
+    def discard(self, staging: Path):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def activate(self, key: str):
+        """原子切换 current 指针"""
+        if not self.is_complete(key):
+            raise FileNotFoundError(f"版本不存在或未安装完成: {key}")
+        tmp = self.base_dir / f".current-{uuid.uuid4().hex[:8]}"
+        try:
+            os.symlink(os.path.join("versions", key), tmp, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            tmp.write_text(key, encoding="utf-8")
+        if self.pointer.is_dir() and not self.pointer.is_symlink():
+            raise IsADirectoryError(f"{self.pointer} 是普通目录，无法作为版本指针")
+        os.replace(tmp, self.pointer)
+        logger.info("已切换到版本: %s", key)
+
+    # ---- 租约与回收 ----
+
+    def live_leases(self, key: str) -> int:
+        """统计版本上仍存活的租约数量（顺便清理失效租约）"""
+        leases_dir = self.version_dir(key) / LEASES_DIR
+        alive = 0
+        if not leases_dir.is_dir():
+            return 0
+        for lease in leases_dir.iterdir():
+            try:
+                pid = int(lease.name.split("-", 1)[0])
+            except ValueError:
+                continue
+            if pid_alive(pid):
+                alive += 1
+            else:
+                try:
+                    lease.unlink()
+                except OSError:
+                    pass
+        return alive
+
+    def gc(self) -> List[str]:
+        """删除早于当前版本安装、且没有进程使用的旧版本，返回已删除的版本名"""
+        current = self.current_key()
+        if not current or not self.is_complete(current):
+            return []
+        versions = self.list_versions()
+        current_time = next((v.get("installed_at", 0) for v in versions if v["key"] == current), 0)
+        removed = []
+        for version in versions:
+            if version["current"] or version.get("installed_at", 0) >= current_time:
+                continue
+            if version["leases"]:
+                logger.info("版本 %s 仍有 %s 个进程在使用，暂不回收", version["key"], version["leases"])
+                continue
+            shutil.rmtree(self.version_dir(version["key"]), ignore_errors=True)
+            removed.append(version["key"])
+            logger.info("已回收旧版本: %s", version["key"])
+        # 清理中断遗留的临时目录
+        if self.versions_dir.is_dir():
+            for entry in self.versions_dir.glob(".staging-*"):
+                if time.time() - entry.stat().st_mtime > 86400:
+                    shutil.rmtree(entry, ignore_errors=True)
+        return removed
+
+
+class VersionLease:
+    """运行期间对某个版本目录的租约，防止该版本被垃圾回收"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def acquire(cls, executable: Path) -> Optional["VersionLease"]:
+        """为可执行文件所在的版本创建租约；非版本化安装返回 None"""
+        executable = Path(os.path.realpath(executable))
+        for parent in executable.parents:
+            if parent.parent.name == "versions" and (parent / VERSION_INFO).is_file():
+                leases_dir = parent / LEASES_DIR
+                try:
+                    leases_dir.mkdir(exist_ok=True)
+                    path = leases_dir / f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+                    path.touch()
+                    return cls(path)
+                except OSError:
+                    return None
+        return None
+
+    def release(self):
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
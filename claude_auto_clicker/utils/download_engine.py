@@ -0,0 +1,432 @@
+"""
+可续传的分段下载引擎
+
+- 下载内容先写入 ``<文件>.part``，中断后通过 HTTP Range 从断点继续
+- 服务器支持 Range 且文件足够大时，拆分为多个区间并行下载，各区间直接写入预分配文件中的对应位置
+- 可选的带宽上限（所有分段共享）
+- 通过 ETag / Last-Modified 校验断点，远端文件变化时丢弃旧的分段
+- 写入时流式计算 SHA-256，无需下载完成后再读一遍文件
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logger import logger
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+def create_session(pool_size: int = 8) -> requests.Session:
+    """创建带连接池与 keep-alive 的共享 HTTP 会话"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": DEFAULT_USER_AGENT})
+    return session
+
+
+class DownloadError(Exception):
+    """下载失败（已保留 .part 文件，可再次调用续传）"""
+
+
+class InvalidContentError(DownloadError):
+    """远端返回的不是目标文件（如 HTML 错误页），重试无意义"""
+
+
+class DownloadProgress:
+    """聚合多个并发下载任务的进度，按时间间隔统一输出到日志"""
+
+    def __init__(self, report_interval: float = 2.0):
+        self.report_interval = report_interval
+        self._lock = threading.Lock()
+        self._totals: Dict[str, int] = {}
+        self._done: Dict[str, int] = {}
+        self._last_report = 0.0
+
+    def start(self, name: str, total: int, done: int = 0):
+        with self._lock:
+            self._totals[name] = total
+            self._done[name] = done
+
+    def advance(self, name: str, nbytes: int):
+        with self._lock:
+            self._done[name] = self._done.get(name, 0) + nbytes
+            now = time.monotonic()
+            if now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+            summary = self._summary()
+        logger.info("下载进度: %s", summary)
+
+    def finish(self, name: str):
+        with self._lock:
+            if self._totals.get(name, 0) <= 0:
+                self._totals[name] = self._done.get(name, 0)
+            summary = self._summary()
+        logger.info("下载进度: %s", summary)
+
+    def _summary(self) -> str:
+        parts = []
+        total_all = sum(self._totals.values())
+        done_all = sum(self._done.values())
+        for name, total in self._totals.items():
+            done = self._done.get(name, 0)
+            if total > 0:
+                parts.append(f"{name} {done / total * 100:.1f}%")
+            else:
+                parts.append(f"{name} {done / 1048576:.1f}MB")
+        if total_all > 0:
+            head = f"总计 {done_all / 1048576:.1f}/{total_all / 1048576:.1f}MB"
+        else:
+            head = f"总计 {done_all / 1048576:.1f}MB"
+        return f"{head} ({', '.join(parts)})"
+
+
+class RateLimiter:
+    """令牌桶限速器，线程安全，rate 为每秒字节数（0 表示不限速）"""
+
+    def __init__(self, rate: int = 0):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= nbytes
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class DownloadEngine:
+    """可续传、可分段并行的下载引擎"""
+
+    def __init__(self, session: requests.Session = None, segments: int = 4,
+                 min_segment_size: int = 8 * 1024 * 1024, max_bandwidth: int = 0,
+                 retries: int = 3, chunk_size: int = 65536, timeout: int = 60,
+                 progress: DownloadProgress = None):
+        """
+        :param segments: 最大并行分段数（1 表示不分段）
+        :param min_segment_size: 每个分段的最小字节数，文件过小时不分段
+        :param max_bandwidth: 带宽上限（字节/秒），0 表示不限速
+        :param retries: 失败后的续传重试次数
+        """
+        self.session = session or create_session(pool_size=max(8, segments * 2))
+        self.segments = max(1, segments)
+        self.min_segment_size = min_segment_size
+        self.limiter = RateLimiter(max_bandwidth)
+        self.retries = retries
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.progress = progress or DownloadProgress()
+
+    @classmethod
+    def from_settings(cls, settings: dict = None, session: requests.Session = None,
+                      progress: DownloadProgress = None) -> "DownloadEngine":
+        """根据配置文件 downloads 段创建引擎"""
+        settings = settings or {}
+        return cls(
+            session=session,
+            segments=int(settings.get("segments", 4)),
+            max_bandwidth=int(settings.get("max_bandwidth_kbps", 0)) * 1024,
+            retries=int(settings.get("retries", 3)),
+            progress=progress,
+        )
+
+    # ---- 探测 ----
+
+    def _probe(self, url: str) -> Tuple[int, bool, Dict[str, str]]:
+        """
+        探测远端文件大小、是否支持 Range 以及校验标识
+        :return: (大小, 是否支持 Range, {"etag": ..., "last_modified": ...})
+        """
+        response = self.session.get(url, headers={"Range": "bytes=0-0"}, stream=True,
+                                    timeout=self.timeout)
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if "text/html" in content_type:
+                raise InvalidContentError(f"下载的是 HTML 页面而不是文件，URL 可能有问题: {url}")
+            validators = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rsplit("/", 1)[-1]
+                size = int(total) if total.isdigit() else 0
+                return size, size > 0, validators
+            return int(response.headers.get("content-length", 0)), False, validators
+        finally:
+            response.close()
+
+    # ---- 下载 ----
+
+    def download(self, url: str, dest: Path, name: str = None,
+                 expected_sha256: str = None, mirrors: List[str] = None) -> str:
+        """
+        下载 url 到 dest，失败时保留 .part 供下次续传
+        :param expected_sha256: 期望的 SHA-256，不符时丢弃并重新下载
+        :param mirrors: 同一文件的备用地址，失败时依次切换并沿用已下载的部分（需要 expected_sha256）
+        :return: 下载内容的 SHA-256（十六进制）
+        :raises DownloadError: 重试耗尽仍未完成
+        """
+        dest = Path(dest)
+        name = name or dest.stem
+        part = dest.with_name(dest.name + ".part")
+        meta_path = dest.with_name(dest.name + ".part.json")
+        # 跨镜像续传会拼接不同来源的字节，只有内容能按已知哈希校验时才允许
+        if mirrors and not expected_sha256:
+            logger.warning("未提供期望的 SHA-256，不使用备用镜像: %s", name)
+            mirrors = None
+        sources = [url] + [m for m in (mirrors or []) if m != url]
+
+        last_error = None
+        for attempt in range(self.retries + len(sources)):
+            url = sources[attempt % len(sources)]
+            if attempt:
+                # 切换镜像时立即重试，轮完一圈回到同一地址时才等待
+                delay = min(30, 2 ** (attempt // len(sources))) if attempt % len(sources) == 0 else 0
+                logger.warning("下载中断，%s从断点续传 (%s/%s): %s",
+                               f"{delay} 秒后" if delay else f"切换到 {url} ",
+                               attempt, self.retries + len(sources) - 1, last_error)
+                time.sleep(delay)
+            try:
+                size, ranged, validators = self._probe(url)
+                # 有多个来源时断点只按大小校验（各镜像的 ETag 不同），内容最终由哈希把关
+                meta = {"size": size} if len(sources) > 1 else {"url": url, "size": size, **validators}
+                self._check_resume_state(meta_path, meta, part)
+
+                segments = self._plan_segments(size) if ranged else []
+                if len(segments) > 1:
+                    hasher = self._download_segmented(url, part, segments, name, size, validators)
+                else:
+                    if self._segment_state_path(part).exists():
+                        # 预分配的分段文件不能按文件大小续传
+                        self._remove(part)
+                        self._remove(self._segment_state_path(part))
+                    hasher = self._download_single(url, part, name, size, ranged, validators)
+
+                if size and part.stat().st_size != size:
+                    raise DownloadError(f"文件大小不符: {part.stat().st_size} != {size}")
+                digest = hasher.hexdigest()
+                if expected_sha256 and digest != expected_sha256.lower():
+                    self._remove(part)
+                    raise DownloadError(f"SHA-256 校验失败: {digest} != {expected_sha256}")
+                os.replace(part, dest)
+                self._remove(meta_path)
+                self.progress.finish(name)
+                return digest
+            except InvalidContentError:
+                raise
+            except (DownloadError, requests.RequestException, OSError) as e:
+                last_error = e
+        raise DownloadError(f"下载失败: {last_error}")
+
+    def _check_resume_state(self, meta_path: Path, meta: dict, part: Path):
+        """断点记录与远端文件不一致时丢弃旧的部分下载"""
+        try:
+            previous = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            previous = None
+        if previous != meta:
+            if previous is not None or part.exists():
+                logger.info("远端文件已变化或无断点记录，重新开始下载")
+            self._remove(part)
+            for stale in part.parent.glob(part.name + ".*"):
+                if stale != meta_path:
+                    self._remove(stale)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _plan_segments(self, size: int) -> List[Tuple[int, int]]:
+        """按大小切分区间 [start, end]（闭区间）"""
+        count = min(self.segments, max(1, size // self.min_segment_size))
+        if count <= 1:
+            return []
+        step = size // count
+        ranges = []
+        for i in range(count):
+            start = i * step
+            end = size - 1 if i == count - 1 else (i + 1) * step - 1
+            ranges.append((start, end))
+        return ranges
+
+    def _if_range(self, validators: Dict[str, str]) -> Dict[str, str]:
+        token = validators.get("etag") or validators.get("last_modified")
+        return {"If-Range": token} if token else {}
+
+    @staticmethod
+    def _hash_file(path: Path, hasher, length: int = None):
+        """把已有文件（前 length 字节）喂给 hasher"""
+        remaining = length
+        with open(path, "rb") as f:
+            while remaining is None or remaining > 0:
+                block = f.read(1024 * 1024 if remaining is None else min(1024 * 1024, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+
+    def _stream_to(self, response, f, name: str, limit: int = None, hasher=None):
+        """把响应体写入文件（同时更新 hasher），可选最多写 limit 字节"""
+        written = 0
+        for chunk in self._iter_limited(response, limit):
+            f.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            written += len(chunk)
+            self.progress.advance(name, len(chunk))
+        return written
+
+    def _download_single(self, url: str, part: Path, name: str, size: int,
+                         ranged: bool, validators: Dict[str, str]):
+        """单连接下载，支持从 .part 续传，返回内容的 hasher"""
+        hasher = hashlib.sha256()
+        offset = part.stat().st_size if part.exists() else 0
+        if size and offset >= size:
+            self.progress.start(name, size, size)
+            self._hash_file(part, hasher)
+            return hasher
+        headers = {}
+        if offset and ranged:
+            headers = {"Range": f"bytes={offset}-", **self._if_range(validators)}
+        response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        with response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+            if offset:
+                logger.info("从断点续传: %s (已完成 %s bytes)", part.name, offset)
+                self._hash_file(part, hasher, offset)
+            self.progress.start(name, size, offset)
+            with open(part, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                f.truncate()
+                self._stream_to(response, f, name, hasher=hasher)
+        return hasher
+
+    @staticmethod
+    def _segment_state_path(part: Path) -> Path:
+        return part.with_name(part.name + ".segments")
+
+    def _download_segmented(self, url: str, part: Path, segments: List[Tuple[int, int]],
+                            name: str, size: int, validators: Dict[str, str]):
+        """
+        多区间并行下载：预分配 .part，各区间直接写入自己的偏移位置，
+        每个区间已写入的字节数记录在 .part.segments 中供续传；区间按顺序完成后依次计算哈希
+        """
+        hasher = hashlib.sha256()
+        state_path = self._segment_state_path(part)
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = None
+        if not (isinstance(state, dict) and state.get("segments") == [list(s) for s in segments]
+                and part.exists() and part.stat().st_size == size):
+            state = {"segments": [list(s) for s in segments], "done": [0] * len(segments)}
+            with open(part, "wb") as f:
+                f.truncate(size)
+        have = state["done"]
+        state_lock = threading.Lock()
+
+        def save_state():
+            with state_lock:
+                state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        save_state()
+        self.progress.start(name, size, sum(have))
+        logger.info("分段下载 %s: %s 个区间", part.name, len(segments))
+
+        def fetch(index: int):
+            start, end = segments[index]
+            expected = end - start + 1
+            if have[index] >= expected:
+                return
+            headers = {"Range": f"bytes={start + have[index]}-{end}", **self._if_range(validators)}
+            response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+            with response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise DownloadError("服务器未返回分段内容")
+                with open(part, "r+b") as f:
+                    f.seek(start + have[index])
+                    try:
+                        for chunk in self._iter_limited(response, expected - have[index]):
+                            f.write(chunk)
+                            self.progress.advance(name, len(chunk))
+                            have[index] += len(chunk)
+                    finally:
+                        # 先落盘再记录进度，记录的字节数不会多于实际写入的
+                        f.flush()
+                        save_state()
+            # 响应提前结束时预分配区域仍是零字节，必须重试续传该区间，不能计入哈希
+            if have[index] < expected:
+                raise DownloadError(f"分段 {index + 1} 提前结束: {have[index]}/{expected} bytes")
+
+        with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="segment") as pool:
+            futures = [pool.submit(fetch, i) for i in range(len(segments))]
+            try:
+                # 按区间顺序等待，前面的区间完成后立即计算其哈希，与后续区间的下载重叠进行
+                for (start, end), future in zip(segments, futures):
+                    future.result()
+                    self._hash_range(part, hasher, start, end - start + 1)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        self._remove(state_path)
+        return hasher
+
+    def _iter_limited(self, response, limit: int = None):
+        """按块读取响应体（限速），可选最多 limit 字节"""
+        received = 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            if not chunk:
+                continue
+            if limit is not None:
+                chunk = chunk[:limit - received]
+            self.limiter.consume(len(chunk))
+            received += len(chunk)
+            yield chunk
+            if limit is not None and received >= limit:
+                break
+
+    @staticmethod
+    def _hash_range(path: Path, hasher, offset: int, length: int):
+        """把文件中 [offset, offset + length) 的内容喂给 hasher"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(1024 * 1024, remaining))
+                if not block:
+                    raise DownloadError(f"分段内容不完整: {path.name}")
+                hasher.update(block)
+                remaining -= len(block)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,277 @@
+"""
+压缩包解压工具
+
+- ZIP：成员在线程池中并行解压（每个线程独立的文件句柄），并按压缩包中记录的
+  Unix 权限位恢复文件模式与符号链接，解压后无需再手动 chmod
+- TAR.GZ：边下载边解压（流式读取），同时把原始字节写入缓存文件并计算哈希
+- 解压配置（extract profile）：按规则跳过不需要的成员，并记录裁剪清单
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import stat
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from .logger import logger
+
+# 判断成员是否需要解压：member_filter(成员名) -> bool
+MemberFilter = Callable[[str], bool]
+
+
+# 清单文件名，记录解压配置、被裁剪的成员与占用空间
+MANIFEST_NAME = ".extract-manifest.json"
+
+# headless-minimal 配置下不解压的文件（按文件名）
+_MINIMAL_SKIP_FILES = {
+    "chrome_crashpad_handler", "crashpad_handler", "chrome-wrapper",
+    "xdg-mime", "xdg-settings", "nacl_helper", "nacl_helper_bootstrap",
+    "nacl_irt_x86_64.nexe", "chrome_proxy.exe", "chrome_pwa_launcher.exe",
+    "elevation_service.exe", "notification_helper.exe",
+}
+
+# headless-minimal 配置下不解压的目录（按路径中的目录名）
+_MINIMAL_SKIP_DIRS = {"ClearKeyCdm", "MEIPreload", "default_apps", "PrivacySandboxAttestationsPreloaded"}
+
+# 可用的解压配置
+EXTRACT_PROFILES = ("full", "headless-minimal")
+
+
+def default_workers() -> int:
+    return min(8, os.cpu_count() or 1)
+
+
+class ProfileFilter:
+    """
+    解压配置对应的成员过滤器，同时记录被裁剪的成员
+    - full：解压全部
+    - headless-minimal：只保留一个语言包，去掉崩溃上报、桌面集成等无头运行用不到的文件
+    """
+
+    def __init__(self, profile: str = "full", locale: str = "en-US"):
+        if profile not in EXTRACT_PROFILES:
+            raise ValueError(f"未知的解压配置: {profile}（可选: {', '.join(EXTRACT_PROFILES)}）")
+        self.profile = profile
+        self.locale = locale or "en-US"
+        self.pruned: List[str] = []
+        self._lock = threading.Lock()
+
+    def _keep(self, name: str) -> bool:
+        if self.profile == "full":
+            return True
+        parts = name.rstrip("/").split("/")
+        basename = parts[-1]
+        if "locales" in parts[:-1] and basename.split(".")[0] != self.locale:
+            return False
+        if basename in _MINIMAL_SKIP_FILES:
+            return False
+        return not any(part in _MINIMAL_SKIP_DIRS for part in parts)
+
+    def __call__(self, name: str) -> bool:
+        keep = self._keep(name)
+        if not keep:
+            with self._lock:
+                self.pruned.append(name)
+        return keep
+
+    def write_manifest(self, dest: Path) -> dict:
+        """在解压目录中写入裁剪清单，记录实际占用空间"""
+        kept = sum(len(files) for _, _, files in os.walk(dest))
+        manifest = {
+            "profile": self.profile,
+            "locale": self.locale if self.profile != "full" else None,
+            "kept_members": kept,
+            "pruned_members": sorted(self.pruned),
+            "installed_bytes": tree_size(dest),
+        }
+        (Path(dest) / MANIFEST_NAME).write_text(
+            json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        return manifest
+
+
+def tree_size(path: Path) -> int:
+    """统计目录的实际占用字节数（同一 inode 的硬链接只计一次）"""
+    total = 0
+    seen = set()
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            key = (st.st_dev, st.st_ino)
+            if key in seen:
+                continue
+            seen.add(key)
+            total += st.st_size
+    return total
+
+
+def read_manifest(path: Path) -> Optional[dict]:
+    """读取目录中的裁剪清单，不存在时返回 None"""
+    try:
+        return json.loads((Path(path) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _safe_target(dest: Path, name: str) -> Path:
+    """计算成员的落盘路径，拒绝越出目标目录的路径"""
+    target = (dest / name).resolve()
+    root = dest.resolve()
+    if target != root and root not in target.parents:
+        raise ValueError(f"压缩包成员路径非法: {name}")
+    return target
+
+
+def _unix_mode(info: zipfile.ZipInfo) -> int:
+    """读取 ZIP 成员记录的 Unix 模式（非 Unix 创建的压缩包返回 0）"""
+    if info.create_system != 3:
+        return 0
+    return (info.external_attr >> 16) & 0xFFFF
+
+
+def extract_zip(archive_path: Path, dest: Path, workers: int = None,
+                member_filter: MemberFilter = None) -> List[str]:
+    """
+    并行解压 ZIP 并恢复权限位
+    :return: 实际解压的成员名列表
+    """
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    workers = workers or default_workers()
+
+    with zipfile.ZipFile(archive_path) as zf:
+        infos = [i for i in zf.infolist() if member_filter is None or member_filter(i.filename)]
+
+    files, links = [], []
+    for info in infos:
+        target = _safe_target(dest, info.filename)
+        if info.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            (links if stat.S_ISLNK(_unix_mode(info)) else files).append((info, target))
+
+    # 大文件优先，避免最后只剩一个线程在解压大成员
+    files.sort(key=lambda item: item[0].file_size, reverse=True)
+
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract_one(item):
+        info, target = item
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(archive_path)
+            with handles_lock:
+                handles.append(zf)
+        mode = _unix_mode(info)
+        with zf.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        if mode & 0o777:
+            os.chmod(target, mode & 0o7777)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="unzip") as pool:
+            for future in [pool.submit(extract_one, item) for item in files]:
+                future.result()
+    finally:
+        for zf in handles:
+            zf.close()
+
+    # 符号链接在普通文件全部写完后再创建，且链接目标不能越出目标目录
+    if links:
+        with zipfile.ZipFile(archive_path) as zf:
+            for info, target in links:
+                link_target = zf.read(info).decode("utf-8")
+                _safe_target(dest, os.path.join(os.path.dirname(info.filename), link_target))
+                if os.path.lexists(target):
+                    os.unlink(target)
+                os.symlink(link_target, target)
+
+    # 目录权限最后设置，避免先设为只读后无法写入子文件
+    for info in infos:
+        mode = _unix_mode(info)
+        if info.is_dir() and mode & 0o777:
+            os.chmod(_safe_target(dest, info.filename), mode & 0o7777)
+
+    logger.info("并行解压完成: %s 个文件, %s 线程 -> %s", len(files) + len(links), workers, dest)
+    return [info.filename for info in infos]
+
+
+def extract_tar(fileobj, dest: Path, member_filter: MemberFilter = None) -> List[str]:
+    """
+    以流模式解压 TAR（支持 gzip 等压缩），按顺序读取，不需要可随机访问的文件
+    :return: 实际解压的成员名列表
+    """
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    extracted = []
+    # 新版本 Python 支持解压过滤器，"tar" 过滤器保留权限位但拒绝危险成员
+    extract_kwargs = {"filter": "tar"} if hasattr(tarfile, "tar_filter") else {}
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if member_filter is not None and not member_filter(member.name):
+                continue
+            _safe_target(dest, member.name)
+            if member.issym() or member.islnk():
+                _safe_target(dest, os.path.join(os.path.dirname(member.name), member.linkname))
+            tar.extract(member, dest, set_attrs=True, **extract_kwargs)
+            extracted.append(member.name)
+    logger.info("流式解压完成: %s 个成员 -> %s", len(extracted), dest)
+    return extracted
+
+
+class HashingTee(io.RawIOBase):
+    """
+    把分块迭代器包装成只读流：读取的同时写入 sink 文件并更新 SHA-256
+    用于一边下载一边解压，且下载内容仍能存入缓存并校验
+    """
+
+    def __init__(self, chunks: Iterable[bytes], sink=None, on_chunk: Callable[[int], None] = None):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self.sink = sink
+        self.on_chunk = on_chunk
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _pull(self) -> bool:
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.sha256.update(chunk)
+            self.size += len(chunk)
+            if self.sink is not None:
+                self.sink.write(chunk)
+            if self.on_chunk is not None:
+                self.on_chunk(len(chunk))
+            self._buffer += chunk
+            return True
+        return False
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            if not self._pull():
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def drain(self):
+        """读完剩余内容（tar 结束标记之后的填充也要计入哈希）"""
+        while self._pull():
+            self._buffer = b""
+        self._buffer = b""
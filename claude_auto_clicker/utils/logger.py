@@ -1,34 +1,215 @@
 """
 日志管理模块
+
+日志调用方只把记录放入内存队列（QueueHandler），由后台 QueueListener 线程
+负责写控制台和文件，避免点击线程因磁盘 IO 阻塞。文件日志按大小和时间轮转，
+轮转后的分段可选 gzip 压缩，并按保留数量清理。
+
+结构化模式（logging.format = "json"）下文件日志每行一个 JSON 对象，携带
+run_id / tick_id / account / phase / duration_ms / outcome 等关联字段。
+调用方应使用 ``logger.info("打开网页: %s", url)`` 形式传参，仅在记录真正
+输出时才格式化。
 """
+import atexit
+import contextvars
+import gzip
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+# 文件日志默认参数，可通过配置文件的 logging 段覆盖
+DEFAULT_LOG_SETTINGS = {
+    "max_bytes": 10 * 1024 * 1024,  # 单个日志文件上限（字节），0 表示不按大小轮转
+    "rotate_when": "midnight",      # 按时间轮转：midnight / hourly / none
+    "backup_count": 14,             # 保留的轮转分段数量
+    "compress": True,               # 轮转分段是否 gzip 压缩
+    "format": "text",               # 文件日志格式：text / json
+}
+
+# 指定日志文件名（不含扩展名）的环境变量：同时运行的进程各写各的文件，避免多个进程轮转同一个文件
+LOG_FILE_ENV = "CLAUDE_AUTO_CLICKER_LOG_FILE"
+
+# 进程级运行 ID，用于跨主机聚合同一次运行的日志
+RUN_ID = uuid.uuid4().hex[:12]
+
+# 关联字段（tick_id / account / phase 等）随调用上下文传递
+_log_context = contextvars.ContextVar("claude_auto_clicker_log_context", default={})
+
+# 会被写入 JSON 日志的结构化字段
+STRUCTURED_FIELDS = ("run_id", "tick_id", "account", "phase", "event", "duration_ms", "outcome")
+
+
+class ContextFilter(logging.Filter):
+    """把当前上下文中的关联字段注入日志记录（在调用方线程执行）"""
+
+    def filter(self, record) -> bool:
+        if not hasattr(record, "run_id"):
+            record.run_id = RUN_ID
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出一个 JSON 对象（JSON Lines）"""
+
+    def format(self, record) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in STRUCTURED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry["fields"] = fields
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """同时按大小和时间轮转的文件处理器
+
+    轮转后的文件命名为 ``<name>.log.<YYYYmmdd-HHMMSS>``（压缩时追加 ``.gz``），
+    超过 ``backup_count`` 的最旧分段会被删除。
+    """
+
+    def __init__(self, filename, max_bytes: int = 0, when: str = "midnight",
+                 backup_count: int = 0, compress: bool = False, encoding: str = "utf-8"):
+        super().__init__(filename, "a", encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.when = (when or "none").lower()
+        self.backup_count = backup_count
+        self.compress = compress
+        self.rollover_at = self._compute_rollover(time.time())
+
+    def _compute_rollover(self, now: float) -> Optional[float]:
+        """计算下一次按时间轮转的时间点"""
+        current = datetime.fromtimestamp(now)
+        if self.when == "midnight":
+            next_day = current.replace(hour=0, minute=0, second=0, microsecond=0)
+            return next_day.timestamp() + 86400
+        if self.when == "hourly":
+            next_hour = current.replace(minute=0, second=0, microsecond=0)
+            return next_hour.timestamp() + 3600
+        return None
+
+    def shouldRollover(self, record) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            self.stream.seek(0, 2)
+            if self.stream.tell() >= self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        base = Path(self.baseFilename)
+        if base.exists() and base.stat().st_size > 0:
+            suffix = datetime.now().strftime("%Y%m%d-%H%M%S")
+            target = base.with_name(f"{base.name}.{suffix}")
+            counter = 1
+            while target.exists() or Path(f"{target}.gz").exists():
+                target = base.with_name(f"{base.name}.{suffix}-{counter}")
+                counter += 1
+            os.replace(base, target)
+            if self.compress:
+                self._compress(target)
+
+        self._prune_backups()
+        self.rollover_at = self._compute_rollover(time.time())
+        self.stream = self._open()
+
+    @staticmethod
+    def _compress(path: Path):
+        """gzip 压缩轮转分段，失败时保留原文件"""
+        try:
+            with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            path.unlink()
+        except OSError:
+            pass
+
+    def _prune_backups(self):
+        """仅保留最新的 backup_count 个轮转分段"""
+        if self.backup_count <= 0:
+            return
+        base = Path(self.baseFilename)
+        backups = sorted(
+            (p for p in base.parent.glob(f"{base.name}.*") if p.is_file()),
+            key=lambda p: p.stat().st_mtime_ns,
+        )
+        for old in backups[:-self.backup_count]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
 
 
 class Logger:
     """日志管理器"""
-    
-    def __init__(self, name: str = "claude_auto_clicker"):
+
+    def __init__(self, name: str = "claude_auto_clicker", settings: Dict[str, Any] = None):
         self.name = name
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
-        
+        self.settings = dict(DEFAULT_LOG_SETTINGS)
+        if settings:
+            self.settings.update(settings)
+        self.formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        self.listener = None
+        self.file_handler = None
+        self._listening = False
+
         # 避免重复添加处理器
         if not self.logger.handlers:
             self._setup_handlers()
-    
+
     def _setup_handlers(self):
-        """设置日志处理器"""
+        """设置日志处理器：调用方写队列，后台线程写控制台与文件"""
         # 控制台处理器（始终可用）
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        console_handler.setFormatter(self.formatter)
+
+        self.file_handler = self._create_file_handler()
+        handlers = [console_handler]
+        if self.file_handler is not None:
+            handlers.append(self.file_handler)
+
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        self.logger.addHandler(queue_handler)
+        self.listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self._listening = True
+        atexit.register(self.shutdown)
 
-        # 尝试创建文件处理器；若无权限则回退仅控制台
+    def _create_file_handler(self) -> Optional[logging.Handler]:
+        """创建轮转文件处理器；若无权限则返回 None，回退仅控制台"""
         try:
             project_root = Path(__file__).parent.parent.parent
             log_dir = project_root / "data" / "logs"
@@ -36,32 +217,110 @@ class Logger:
                 log_dir.mkdir(parents=True, exist_ok=True)
             except Exception:
                 # 目录无法创建，直接跳过文件日志
-                return
+                return None
 
-            log_file = log_dir / f"{self.name}.log"
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            log_file = log_dir / f"{os.environ.get(LOG_FILE_ENV) or self.name}.log"
+            file_handler = SizedTimedRotatingFileHandler(
+                log_file,
+                max_bytes=int(self.settings.get("max_bytes") or 0),
+                when=self.settings.get("rotate_when") or "none",
+                backup_count=int(self.settings.get("backup_count") or 0),
+                compress=bool(self.settings.get("compress")),
+            )
             file_handler.setLevel(logging.INFO)
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            if self.settings.get("format") == "json":
+                file_handler.setFormatter(JsonFormatter())
+            else:
+                file_handler.setFormatter(self.formatter)
+            return file_handler
         except Exception:
             # 无写权限或其他错误，保持仅控制台日志
+            return None
+
+    def configure(self, settings: Dict[str, Any]):
+        """应用配置文件中的 logging 段，变更时重建文件处理器"""
+        merged = dict(self.settings)
+        merged.update(settings or {})
+        if merged == self.settings or not self._listening:
+            self.settings = merged
             return
-    
-    def info(self, message: str):
+
+        self.settings = merged
+        self.listener.stop()
+        old_handler = self.file_handler
+        self.file_handler = self._create_file_handler()
+        handlers = [h for h in self.listener.handlers if h is not old_handler]
+        if old_handler is not None:
+            old_handler.close()
+        if self.file_handler is not None:
+            handlers.append(self.file_handler)
+        self.listener.handlers = tuple(handlers)
+        self.listener.start()
+
+    def shutdown(self):
+        """停止后台线程并刷新队列中剩余的日志"""
+        if self.listener is not None and self._listening:
+            self.listener.stop()
+            self._listening = False
+
+    def is_enabled_for(self, level: int) -> bool:
+        """判断指定级别是否会被输出，用于跳过昂贵的日志参数计算"""
+        return self.logger.isEnabledFor(level)
+
+    @contextmanager
+    def context(self, **fields):
+        """在当前上下文中附加关联字段（tick_id、account 等）"""
+        merged = dict(_log_context.get())
+        merged.update(fields)
+        token = _log_context.set(merged)
+        try:
+            yield
+        finally:
+            _log_context.reset(token)
+
+    def event(self, event: str, outcome: str = None, duration: float = None, **fields):
+        """记录一条结构化事件"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        extra = {"event": event, "outcome": outcome, "fields": fields or None}
+        if duration is not None:
+            extra["duration_ms"] = round(duration * 1000, 1)
+        self.logger.info("事件 %s outcome=%s duration_ms=%s", event, outcome,
+                         extra.get("duration_ms"), extra=extra)
+
+    @contextmanager
+    def phase(self, name: str, **fields):
+        """
+        计时一个执行阶段，结束时输出 phase 事件
+        产出的字典可由调用方修改 outcome；抛出异常时记为 error
+        """
+        start = time.monotonic()
+        state = {"outcome": "ok"}
+        with self.context(phase=name):
+            try:
+                yield state
+            except BaseException:
+                state["outcome"] = "error"
+                raise
+            finally:
+                state["duration"] = time.monotonic() - start
+                self.event("phase", outcome=state["outcome"], duration=state["duration"], **fields)
+
+    def info(self, message: str, *args, **kwargs):
         """记录信息"""
-        self.logger.info(message)
-    
-    def error(self, message: str):
+        self.logger.info(message, *args, **kwargs)
+
+    def error(self, message: str, *args, **kwargs):
         """记录错误"""
-        self.logger.error(message)
-    
-    def warning(self, message: str):
+        self.logger.error(message, *args, **kwargs)
+
+    def warning(self, message: str, *args, **kwargs):
         """记录警告"""
-        self.logger.warning(message)
-    
-    def debug(self, message: str):
+        self.logger.warning(message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs):
         """记录调试信息"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args, **kwargs)
 
 
 # 全局日志实例
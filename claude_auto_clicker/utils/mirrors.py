@@ -0,0 +1,111 @@
+"""
+浏览器组件下载镜像
+
+每个制品（如 chromium 的 Linux_x64/1108766/chrome-linux.zip）可以从多个镜像下载：
+- 内置 Google Storage 与 npmmirror，可在 downloads.mirrors 中追加内部镜像（地址模板中的 {path} 替换为制品路径）
+- 下载前对每个镜像并行发起一个小的 Range 请求，按首字节延迟与吞吐量估算完整下载耗时，选出最快的
+- 下载中途失败时切换到下一个镜像，沿用已下载的部分继续
+- 无论由哪个镜像提供，制品都按同一个 SHA-256 校验（制品缓存按制品 ID 记录哈希）
+- 只有哈希已知（downloads.pinned_sha256 或缓存索引中已有记录）的制品才会使用多个镜像，
+  内置制品未附带固定哈希，默认只从主镜像下载
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from .logger import logger
+
+# 各组件的内置镜像（{path} 为制品在镜像中的相对路径）
+DEFAULT_MIRRORS = {
+    "chromium": [
+        "https://storage.googleapis.com/chromium-browser-snapshots/{path}",
+        "https://registry.npmmirror.com/-/binary/chromium-browser-snapshots/{path}",
+    ],
+    "chromedriver": [
+        "https://chromedriver.storage.googleapis.com/{path}",
+        "https://registry.npmmirror.com/-/binary/chromedriver/{path}",
+    ],
+}
+
+# 探测请求下载的字节数
+PROBE_BYTES = 256 * 1024
+
+
+def artifact_id(component: str, path: str) -> str:
+    """制品 ID（与镜像无关，用于制品缓存索引与哈希校验）"""
+    return f"{component}:{path}"
+
+
+def candidate_urls(component: str, path: str, extra_mirrors: List[str] = None) -> List[str]:
+    """制品的全部候选下载地址：配置的镜像在前，内置镜像在后（去重）"""
+    urls = []
+    for template in list(extra_mirrors or []) + DEFAULT_MIRRORS.get(component, []):
+        url = template.format(path=path) if "{path}" in template else f"{template.rstrip('/')}/{path}"
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+class MirrorSelector:
+    """按探测结果为制品选择镜像"""
+
+    def __init__(self, session: requests.Session, probe_bytes: int = PROBE_BYTES, timeout: float = 5):
+        self.session = session
+        self.probe_bytes = probe_bytes
+        self.timeout = timeout
+
+    def probe(self, url: str) -> Optional[Dict]:
+        """
+        下载前 probe_bytes 字节，测量首字节延迟与吞吐量
+        :return: {"url", "latency", "throughput", "size"}；镜像不可用（错误状态、HTML 页面、超时）返回 None
+        """
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, headers={"Range": f"bytes=0-{self.probe_bytes - 1}"},
+                                        stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug("镜像探测失败 %s: %s", url, e)
+            return None
+        with response:
+            if response.status_code not in (200, 206) or "text/html" in response.headers.get("content-type", ""):
+                logger.debug("镜像探测失败 %s: HTTP %s", url, response.status_code)
+                return None
+            latency = time.monotonic() - start
+            received = 0
+            try:
+                for chunk in response.iter_content(chunk_size=65536):
+                    received += len(chunk)
+                    if received >= self.probe_bytes or time.monotonic() - start > self.timeout:
+                        break
+            except requests.RequestException as e:
+                logger.debug("镜像探测失败 %s: %s", url, e)
+                return None
+            elapsed = max(time.monotonic() - start - latency, 1e-3)
+            total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            size = int(total) if total.isdigit() else int(response.headers.get("content-length") or 0)
+        return {"url": url, "latency": latency, "throughput": received / elapsed, "size": size}
+
+    def rank(self, urls: List[str]) -> List[str]:
+        """
+        并行探测并按预计下载耗时排序；不可用的镜像排在最后（仍作为最终的备选）
+        """
+        if len(urls) <= 1:
+            return list(urls)
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            results = list(pool.map(self.probe, urls))
+
+        def estimate(result: Dict) -> float:
+            size = result["size"] or self.probe_bytes
+            return result["latency"] + size / max(result["throughput"], 1.0)
+
+        available = sorted((r for r in results if r), key=estimate)
+        for result in available:
+            logger.info("🌐 镜像 %s：延迟 %.0f ms，%.1f MB/s，预计 %.0f 秒", result["url"],
+                        result["latency"] * 1000, result["throughput"] / 1048576, estimate(result))
+        sizes = {r["size"] for r in available if r["size"]}
+        if len(sizes) > 1:
+            logger.warning("各镜像报告的文件大小不一致: %s（以哈希校验为准）", sorted(sizes))
+        ranked = [r["url"] for r in available]
+        return ranked + [url for url in urls if url not in ranked]
@@ -0,0 +1,130 @@
+"""
+启动浏览器前的可达性预检
+
+目标站点或网络故障时，每次运行仍要完整启动一次浏览器，driver.get 还可能一直等到页面加载超时。
+预检先用轻量的 HTTP HEAD 请求（共享连接池、较短超时）确认目标可达：
+- 先在预检超时内解析主机名（getaddrinfo 本身没有超时，解析器无响应时也不会一直阻塞），
+  解析失败或超时的结果短暂缓存，网络断开时无需每次等待解析超时
+- 连接失败、超时、DNS 失败或 5xx（501 除外）视为不可达，本次运行跳过浏览器启动，并按指数退避安排重试
+- 其他任何 HTTP 响应（含 3xx/4xx，如跳转登录页；405/501 表示不支持 HEAD）都说明站点在线
+"""
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .download_engine import create_session
+from .logger import logger
+
+DEFAULT_PREFLIGHT_SETTINGS = {
+    "enabled": True,
+    "timeout": 3,
+    "retry_interval": 30,
+    "max_backoff": 600,
+}
+
+# DNS 解析失败的缓存时长（秒）
+_NEGATIVE_DNS_TTL = 15
+
+# 表示服务器不支持 HEAD 方法的状态码（站点在线）
+_HEAD_UNSUPPORTED = (405, 501)
+
+
+class Preflight:
+    """目标站点可达性预检与不可达时的退避"""
+
+    def __init__(self, settings: dict = None):
+        self.settings = dict(DEFAULT_PREFLIGHT_SETTINGS, **(settings or {}))
+        self.enabled = bool(self.settings["enabled"])
+        self.failures = 0
+        self._session: Optional[requests.Session] = None
+        # (主机, 端口) -> 解析失败的缓存到期时间
+        self._dns_failures: Dict[Tuple[str, int], float] = {}
+        # (主机, 端口) -> 进行中的解析（解析器无响应时后续预检复用同一个，不会堆积线程）
+        self._resolving: Dict[Tuple[str, int], Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            self._session = create_session(pool_size=2)
+        return self._session
+
+    def resolve(self, host: str, port: int, timeout: float) -> bool:
+        """
+        在 timeout 秒内确认主机名可以解析；失败或超时的结果缓存一小段时间
+        HEAD 请求会由 urllib3 自行解析（通常命中系统缓存），这里只负责尽早发现 DNS 故障
+        """
+        key = (host, port)
+        with self._lock:
+            if self._dns_failures.get(key, 0) > time.monotonic():
+                return False
+            future = self._resolving.get(key)
+            if future is None or future.done():
+                future = Future()
+                self._resolving[key] = future
+                threading.Thread(target=self._getaddrinfo, args=(future, host, port),
+                                 name="preflight-dns", daemon=True).start()
+        try:
+            resolved = future.result(timeout)
+        except FutureTimeout:
+            resolved = False
+        if not resolved:
+            with self._lock:
+                self._dns_failures[key] = time.monotonic() + _NEGATIVE_DNS_TTL
+        return resolved
+
+    @staticmethod
+    def _getaddrinfo(future: Future, host: str, port: int):
+        try:
+            socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            future.set_result(True)
+        except (OSError, UnicodeError):
+            future.set_result(False)
+
+    def check(self, url: str) -> Tuple[bool, str]:
+        """
+        探测目标是否可达
+        :return: (是否可达, 说明)
+        """
+        if not self.enabled:
+            return True, "未启用"
+        parsed = urlparse(url)
+        if not parsed.hostname:
+            return True, "无法解析的地址，跳过预检"
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+
+        timeout = float(self.settings["timeout"])
+        if not self.resolve(parsed.hostname, port, timeout):
+            return self._failed(f"DNS 解析失败或超时: {parsed.hostname}")
+
+        try:
+            response = self.session.head(url, timeout=(timeout, timeout), allow_redirects=False)
+            response.close()
+        except requests.Timeout:
+            return self._failed(f"{timeout:.0f} 秒内无响应")
+        except requests.RequestException as e:
+            return self._failed(f"连接失败: {type(e).__name__}")
+        # 405 / 501：服务器不支持 HEAD，但已经作出响应
+        if response.status_code >= 500 and response.status_code not in _HEAD_UNSUPPORTED:
+            return self._failed(f"HTTP {response.status_code}")
+
+        if self.failures:
+            logger.info("🌐 目标站点已恢复可达")
+        self.failures = 0
+        return True, f"HTTP {response.status_code}"
+
+    def _failed(self, reason: str) -> Tuple[bool, str]:
+        self.failures += 1
+        return False, reason
+
+    def backoff(self) -> float:
+        """连续不可达时的重试等待：retry_interval 起按次数翻倍，不超过 max_backoff"""
+        if not self.failures:
+            return 0.0
+        delay = float(self.settings["retry_interval"]) * 2 ** (self.failures - 1)
+        return min(delay, float(self.settings["max_backoff"]))
@@ -0,0 +1,124 @@
+"""
+/proc 进程信息读取（仅 Linux，其他系统上各函数返回 None 或空结果）
+
+- 进程树：某个进程及其全部子孙进程
+- CPU 时间：/proc/<pid>/stat 中的 utime + stime（秒）
+- I/O 计数：/proc/<pid>/io 中的 rchar + wchar（字节，含终端与管道读写）
+- 常驻内存：/proc/<pid>/statm 中的 resident 页数
+"""
+import os
+from typing import Dict, List, Optional
+
+PROC_ROOT = "/proc"
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def is_available() -> bool:
+    """当前系统是否提供 /proc"""
+    return os.path.isdir(os.path.join(PROC_ROOT, "self"))
+
+
+def _read(pid: int, name: str) -> Optional[str]:
+    try:
+        with open(os.path.join(PROC_ROOT, str(pid), name), "r") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def _stat_fields(pid: int) -> Optional[List[str]]:
+    """/proc/<pid>/stat 字段（从第 3 个字段 state 开始，避开进程名中的空格与括号）"""
+    content = _read(pid, "stat")
+    if not content:
+        return None
+    return content[content.rfind(")") + 2:].split()
+
+
+def parent_pid(pid: int) -> Optional[int]:
+    fields = _stat_fields(pid)
+    return int(fields[1]) if fields else None
+
+
+def children(pid: int) -> List[int]:
+    """直接子进程（优先读取 task/*/children，不可用时扫描全部进程）"""
+    result = []
+    task_dir = os.path.join(PROC_ROOT, str(pid), "task")
+    try:
+        tids = os.listdir(task_dir)
+    except OSError:
+        return result
+    found_children_file = False
+    for tid in tids:
+        content = _read(pid, os.path.join("task", tid, "children"))
+        if content is None:
+            continue
+        found_children_file = True
+        result.extend(int(child) for child in content.split())
+    if found_children_file:
+        return result
+    for entry in os.listdir(PROC_ROOT):
+        if entry.isdigit() and parent_pid(int(entry)) == pid:
+            result.append(int(entry))
+    return result
+
+
+def process_tree(pid: int) -> List[int]:
+    """进程自身及全部子孙进程"""
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        if current in tree:
+            continue
+        tree.append(current)
+        pending.extend(children(current))
+    return tree
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    """进程已消耗的 CPU 时间（用户态 + 内核态，秒）"""
+    fields = _stat_fields(pid)
+    if not fields:
+        return None
+    # state 为下标 0，utime / stime 分别为第 14、15 个字段
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+def io_bytes(pid: int) -> Optional[int]:
+    """进程累计读写字节数（rchar + wchar），无权限读取时返回 None"""
+    content = _read(pid, "io")
+    if not content:
+        return None
+    counters: Dict[str, int] = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(":")
+        if value.strip().isdigit():
+            counters[key] = int(value)
+    return counters.get("rchar", 0) + counters.get("wchar", 0)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """进程常驻内存（字节）"""
+    content = _read(pid, "statm")
+    if not content:
+        return None
+    return int(content.split()[1]) * _PAGE_SIZE
+
+
+def tree_rss(pid: int) -> Optional[int]:
+    """进程树常驻内存之和（字节），/proc 不可用时返回 None"""
+    if not is_available():
+        return None
+    return sum(rss_bytes(p) or 0 for p in process_tree(pid))
+
+
+def tree_counters(pid: int) -> Optional[Dict[str, float]]:
+    """进程树的 CPU 时间与 I/O 字节数之和；进程已退出时返回 None"""
+    if cpu_seconds(pid) is None:
+        return None
+    cpu, io = 0.0, 0
+    for p in process_tree(pid):
+        cpu += cpu_seconds(p) or 0.0
+        io += io_bytes(p) or 0
+    return {"cpu": cpu, "io": io}
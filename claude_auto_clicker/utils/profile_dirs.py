@@ -0,0 +1,110 @@
+"""
+每次运行的临时浏览器配置目录
+
+默认情况下 chromedriver 在系统临时目录（磁盘）上为每次启动创建一次性的配置目录，
+Chromium 的配置、缓存与崩溃数据都会写到磁盘上，账户多时是持续的小文件 I/O 与 fsync。
+启用后配置目录放在 tmpfs（默认 /dev/shm）上：
+- 创建前检查 tmpfs 剩余空间，低于 min_free_mb 时回退到磁盘临时目录
+- 目录名包含创建进程的 PID：浏览器关闭、进程退出时删除；
+  进程崩溃遗留的目录在下次创建时按 PID 是否存活清理
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Set
+
+from .browser_versions import pid_alive
+from .logger import logger
+
+DEFAULT_PROFILE_DIR_SETTINGS = {
+    "tmpfs": False,
+    "root": "/dev/shm",
+    "min_free_mb": 256,
+}
+
+# 目录名前缀：<前缀><PID>-<随机后缀>
+PREFIX = "claude-auto-clicker-"
+
+# 本进程创建且尚未删除的目录（退出时兜底清理）
+_active: Set[str] = set()
+_active_lock = threading.Lock()
+
+
+def free_bytes(path: str) -> Optional[int]:
+    """所在文件系统的可用空间，无法获取时返回 None"""
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def sweep_stale(root: str) -> int:
+    """删除 root 下创建进程已不存在的配置目录，返回删除数量"""
+    removed = 0
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return 0
+    for name in entries:
+        if not name.startswith(PREFIX):
+            continue
+        try:
+            pid = int(name[len(PREFIX):].split("-", 1)[0])
+        except ValueError:
+            continue
+        if pid == os.getpid() or pid_alive(pid):
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info("🧹 已清理 %s 个遗留的浏览器配置目录: %s", removed, root)
+    return removed
+
+
+class ProfileDir:
+    """一次运行的浏览器配置目录"""
+
+    def __init__(self, path: Path, on_tmpfs: bool):
+        self.path = path
+        self.on_tmpfs = on_tmpfs
+
+    @classmethod
+    def create(cls, settings: dict = None) -> "ProfileDir":
+        """优先在 tmpfs 上创建，空间不足或不可用时回退到磁盘临时目录"""
+        settings = dict(DEFAULT_PROFILE_DIR_SETTINGS, **(settings or {}))
+        disk_root = tempfile.gettempdir()
+        root, on_tmpfs = disk_root, False
+        if settings["tmpfs"]:
+            tmpfs_root = str(settings["root"])
+            free = free_bytes(tmpfs_root) if os.path.isdir(tmpfs_root) and os.access(tmpfs_root, os.W_OK) else None
+            required = float(settings["min_free_mb"]) * 1048576
+            if free is not None and free >= required:
+                root, on_tmpfs = tmpfs_root, True
+            else:
+                logger.warning("tmpfs %s 不可用或剩余空间不足（%s），浏览器配置目录回退到磁盘: %s", tmpfs_root,
+                               "不可写" if free is None else f"{free / 1048576:.0f} MB", disk_root)
+            sweep_stale(tmpfs_root)
+        sweep_stale(disk_root)
+
+        path = tempfile.mkdtemp(prefix=f"{PREFIX}{os.getpid()}-", dir=root)
+        with _active_lock:
+            _active.add(path)
+        return cls(Path(path), on_tmpfs)
+
+    def cleanup(self):
+        """删除目录（可重复调用）"""
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _active_lock:
+            _active.discard(str(self.path))
+
+
+@atexit.register
+def _cleanup_active():
+    with _active_lock:
+        paths = list(_active)
+        _active.clear()
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,206 @@
+"""
+运行历史记录（SQLite）
+
+每次运行写入 data/run_history.db 的一行：各阶段耗时、结果、失败分类、是否触发登录、浏览器内存、动作步骤结果等。
+- WAL 模式：写入不阻塞 stats 等读取方
+- 批量写入：缓存若干行或超过刷新间隔后一次事务写入，进程退出时自动刷新
+- 列迁移：新增字段时自动 ALTER TABLE，旧数据库无需手动升级
+- 保留期：超过 retention_days 的记录在打开数据库时删除，stats --compact 时回收空间
+"""
+import atexit
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .logger import logger
+
+DEFAULT_HISTORY_SETTINGS = {
+    "enabled": True,
+    "batch_size": 10,
+    "flush_interval": 60,
+    "retention_days": 90,
+}
+
+# 列定义（按顺序追加，已有数据库会自动补齐缺失的列）
+COLUMNS = [
+    ("started_at", "REAL NOT NULL"),
+    ("run_id", "TEXT"),
+    ("tick_id", "TEXT"),
+    ("account", "TEXT"),
+    ("outcome", "TEXT"),
+    ("failure_class", "TEXT"),
+    ("login_needed", "INTEGER"),
+    ("duration_ms", "REAL"),
+    ("launch_ms", "REAL"),
+    ("navigate_ms", "REAL"),
+    ("login_ms", "REAL"),
+    ("click_ms", "REAL"),
+    ("browser_rss", "INTEGER"),
+    ("cache_hit_ratio", "REAL"),
+    ("transfer_bytes", "INTEGER"),
+    ("preflight_ms", "REAL"),
+    ("actions", "TEXT"),
+]
+
+PHASE_COLUMNS = ["preflight_ms", "launch_ms", "navigate_ms", "login_ms", "click_ms"]
+
+INDEXES = {
+    "idx_runs_started_at": "runs (started_at, duration_ms)",
+    "idx_runs_outcome": "runs (outcome, started_at)",
+    "idx_runs_account": "runs (account, started_at)",
+}
+
+
+def nearest_rank(count: int, q: float) -> int:
+    """最近秩法分位数在升序排列中的下标（0 起）"""
+    # 先舍去浮点误差（如 0.07 * 100 = 7.000000000000001）
+    return min(count - 1, max(0, math.ceil(round(q * count, 9)) - 1))
+
+
+class RunHistory:
+    """运行历史存储"""
+
+    def __init__(self, db_path: Path = None, settings: dict = None):
+        self.db_path = Path(db_path) if db_path else Path(__file__).parent.parent.parent / "data" / "run_history.db"
+        self.settings = dict(DEFAULT_HISTORY_SETTINGS)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self.configure(settings or {})
+        atexit.register(self.close)
+
+    def configure(self, settings: dict):
+        """应用配置（load_config 时调用）"""
+        self.settings.update({k: v for k, v in (settings or {}).items() if k in DEFAULT_HISTORY_SETTINGS})
+
+    # ---- 连接与迁移 ----
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate(conn)
+            self._conn = conn
+            self._apply_retention()
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """建表并补齐缺失的列与索引"""
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            for name, decl in COLUMNS:
+                if name not in existing:
+                    # SQLite 不允许给已有表追加 NOT NULL 且无默认值的列
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {decl.replace(' NOT NULL', '')}")
+            for index, target in INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {target}")
+
+    def _apply_retention(self) -> int:
+        """删除超过保留期的记录，返回删除行数"""
+        days = float(self.settings.get("retention_days") or 0)
+        if days <= 0:
+            return 0
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM runs WHERE started_at < ?",
+                                        (time.time() - days * 86400,))
+        return cursor.rowcount
+
+    # ---- 写入 ----
+
+    def record(self, row: Dict):
+        """缓存一行运行记录，达到批量大小或刷新间隔时写入"""
+        if not self.settings.get("enabled", True):
+            return
+        with self._lock:
+            self._buffer.append(row)
+            if (len(self._buffer) >= int(self.settings["batch_size"])
+                    or time.monotonic() - self._last_flush >= float(self.settings["flush_interval"])):
+                self.flush()
+
+    def flush(self):
+        """把缓存的记录在一个事务中写入"""
+        with self._lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            names = [name for name, _ in COLUMNS]
+            sql = f"INSERT INTO runs ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(sql, [tuple(row.get(name) for name in names) for row in rows])
+            except sqlite3.Error as e:
+                logger.warning("写入运行历史失败: %s", e)
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- 查询 ----
+
+    @staticmethod
+    def _percentiles(values: List[float], quantiles=(0.5, 0.95, 0.99)) -> Dict[float, Optional[float]]:
+        """分位数（最近秩法）"""
+        ordered = sorted(values)
+        return {q: ordered[nearest_rank(len(ordered), q)] if ordered else None for q in quantiles}
+
+    def window_stats(self, seconds: float, account: str = None) -> Dict:
+        """统计最近 seconds 秒内的运行情况"""
+        self.flush()
+        since = time.time() - seconds
+        conn = self._connect()
+        where, params = "started_at >= ?", [since]
+        if account:
+            where += " AND account = ?"
+            params.append(account)
+        summary = conn.execute(
+            f"SELECT COUNT(*) AS runs, SUM(outcome = 'ok') AS ok, SUM(login_needed) AS logins, "
+            f"AVG(browser_rss) AS rss, AVG(cache_hit_ratio) AS cache_hit_ratio, "
+            f"AVG(transfer_bytes) AS transfer_bytes FROM runs WHERE {where}", params).fetchone()
+        stats = {
+            "runs": summary["runs"],
+            "success_rate": (summary["ok"] or 0) / summary["runs"] if summary["runs"] else None,
+            "login_rate": (summary["logins"] or 0) / summary["runs"] if summary["runs"] else None,
+            "avg_rss": summary["rss"],
+            "cache_hit_ratio": summary["cache_hit_ratio"],
+            "avg_transfer_bytes": summary["transfer_bytes"],
+            "percentiles": {},
+            "failures": [],
+        }
+        # 各耗时列没有可用于排序的索引：按时间（账户）索引取回窗口内的行一次，在内存中排序
+        columns = ["duration_ms"] + PHASE_COLUMNS
+        rows = conn.execute(f"SELECT {', '.join(columns)} FROM runs WHERE {where}", params).fetchall()
+        for column in columns:
+            stats["percentiles"][column] = self._percentiles(
+                [row[column] for row in rows if row[column] is not None])
+        stats["failures"] = [
+            (row["failure_class"], row["n"]) for row in conn.execute(
+                f"SELECT failure_class, COUNT(*) AS n FROM runs WHERE {where} AND outcome != 'ok' "
+                f"GROUP BY failure_class ORDER BY n DESC LIMIT 5", params)]
+        return stats
+
+    def compact(self) -> int:
+        """应用保留期并回收数据库空间，返回删除行数"""
+        self.flush()
+        self._connect()
+        removed = self._apply_retention()
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._conn.execute("VACUUM")
+        return removed
+
+
+# 全局运行历史实例
+run_history = RunHistory()
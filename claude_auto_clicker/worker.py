@@ -0,0 +1,301 @@
+"""
+隔离的后台点击进程
+
+包装器不在自身进程内运行点击线程，而是启动一个受监管的子进程：
+
+    python -m claude_auto_clicker.worker --claude-pid <pid> [--tty <claude 所在终端>]
+
+- 子进程在独立的会话（进程组）中运行：selenium 卡死或内存暴涨不会波及持有 claude 的包装器，
+  终端上的 Ctrl+C 也不会误杀它
+- 启动时降低 CPU（nice）与磁盘 I/O（ionice）优先级，可选设置 RLIMIT_AS，随后启动的浏览器进程树都会继承
+- 监管方定期检查整个进程树的常驻内存，超过 max_rss_mb 或崩溃时终止整个进程组并延迟重启
+- 停止时只通知点击进程本身，由它收尾本轮点击并关闭浏览器，超时后再结束整个进程组
+- 点击进程写独立的日志文件 data/logs/claude_auto_clicker-worker.log，不与包装器轮转同一个文件
+"""
+import os
+import platform
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import click
+
+from .utils import procfs
+from .utils.activity import controlling_tty
+from .utils.logger import LOG_FILE_ENV, logger
+
+# 点击进程的日志文件名
+WORKER_LOG_NAME = "claude_auto_clicker-worker"
+
+DEFAULT_WORKER_SETTINGS = {
+    "isolate": True,
+    "nice": 10,
+    "ionice": "idle",
+    "rlimit_as_mb": 0,
+    "max_rss_mb": 1536,
+    "restart_delay": 5,
+    "max_restarts": 5,
+}
+
+# ioprio_set 系统调用号（按 CPU 架构）
+_IOPRIO_SET_SYSCALL = {"x86_64": 251, "amd64": 251, "i386": 289, "i686": 289,
+                       "aarch64": 30, "arm64": 30, "armv7l": 314}
+_IOPRIO_CLASSES = {"best-effort": 2, "idle": 3}
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+
+# 稳定运行超过该时长后重置连续重启计数
+_STABLE_SECONDS = 600
+# 收到停止信号后等待本轮点击收尾的时长，超时强制结束整个进程组
+_STOP_GRACE_SECONDS = 30
+
+
+def _set_ionice(io_class: str) -> bool:
+    """设置当前进程的 I/O 调度类别（仅 Linux）"""
+    number = _IOPRIO_SET_SYSCALL.get(platform.machine().lower())
+    if io_class not in _IOPRIO_CLASSES or number is None or not sys.platform.startswith("linux"):
+        return False
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    # best-effort 使用最低的级别 7；idle 类别没有级别
+    level = 7 if io_class == "best-effort" else 0
+    value = (_IOPRIO_CLASSES[io_class] << _IOPRIO_CLASS_SHIFT) | level
+    return libc.syscall(number, _IOPRIO_WHO_PROCESS, 0, value) == 0
+
+
+def apply_limits(settings: dict):
+    """降低当前进程的优先级并设置地址空间上限（之后启动的浏览器进程树会继承）"""
+    applied = []
+    nice = int(settings.get("nice") or 0)
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+            applied.append(f"nice +{nice}")
+        except OSError as e:
+            logger.warning("设置 nice 失败: %s", e)
+
+    io_class = settings.get("ionice") or "none"
+    if io_class != "none":
+        if _set_ionice(io_class):
+            applied.append(f"ionice {io_class}")
+        else:
+            logger.debug("当前系统不支持 ionice %s，跳过", io_class)
+
+    limit_mb = float(settings.get("rlimit_as_mb") or 0)
+    if limit_mb > 0:
+        try:
+            import resource
+            soft = int(limit_mb * 1048576)
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+            applied.append(f"RLIMIT_AS {soft / 1048576:.0f} MB")
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning("设置 RLIMIT_AS 失败: %s", e)
+
+    if applied:
+        logger.info("🔧 点击进程资源限制: %s", "，".join(applied))
+
+
+def click_loop(claude_pid: int, stop_event: threading.Event, tty: str = None):
+    """
+    按间隔执行点击，跟随 claude 会话的活动暂停/恢复，直到 stop_event 置位
+    :param tty: claude 所在的终端（没有 /proc 时用于活动检测），默认取当前进程的终端
+    """
+    from .config import config_manager
+    from .core.auto_clicker import auto_clicker
+    from .utils.activity import ActivityMonitor
+
+    interval = config_manager.get_config_value('click.click_interval', 300)
+    idle_timeout = config_manager.get_config_value('wrapper.idle_timeout', 900)
+    poll = config_manager.get_config_value('wrapper.activity_poll', 5)
+    monitor = ActivityMonitor(claude_pid, idle_timeout, tty)
+
+    # 等待一段时间让 claude code 启动
+    if monitor.wait(10, stop_event, poll):
+        return
+
+    logger.info("开始后台自动点击，间隔 %s 秒（活动检测: %s，空闲 %s 秒后暂停）",
+                interval, monitor.source, idle_timeout)
+
+    try:
+        while not stop_event.is_set():
+            # 会话空闲时暂停点击并释放浏览器，检测到活动后恢复
+            if monitor.is_idle():
+                logger.info("💤 claude 会话已空闲 %.0f 秒，暂停自动点击", monitor.idle_seconds())
+                auto_clicker.close()
+                if not monitor.wait_for_activity(stop_event, poll):
+                    break
+                logger.info("▶️  检测到 claude 会话活动，恢复自动点击")
+
+            try:
+                success = auto_clicker.perform_single_click()
+                wait_seconds = auto_clicker.scheduler.next_interval(interval)
+                if success:
+                    logger.info("后台点击成功，等待 %.0f 秒", wait_seconds)
+                else:
+                    logger.warning("后台点击失败，等待 %.0f 秒后重试", wait_seconds)
+            except Exception as e:
+                logger.error("自动点击过程中出错: %s", e)
+                wait_seconds = 30  # 出错后等待30秒
+
+            if monitor.wait(wait_seconds, stop_event, poll):
+                break
+    finally:
+        auto_clicker.close()
+
+
+class WorkerSupervisor:
+    """在包装器中启动并监管点击进程：崩溃或内存超限时重启"""
+
+    def __init__(self, claude_pid: int, settings: dict, stop_event: threading.Event, poll: float = 5):
+        self.claude_pid = claude_pid
+        self.settings = dict(DEFAULT_WORKER_SETTINGS, **(settings or {}))
+        self.stop_event = stop_event
+        self.poll = poll
+        self.process = None
+
+    def _spawn(self) -> subprocess.Popen:
+        project_root = Path(__file__).parent.parent
+        if os.name == "nt":
+            kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            kwargs = {"start_new_session": True}
+        # 日志写入独立的日志文件，不输出到 claude 所在的终端
+        env = dict(os.environ, **{LOG_FILE_ENV: WORKER_LOG_NAME})
+        command = [sys.executable, "-m", "claude_auto_clicker.worker", "--claude-pid", str(self.claude_pid)]
+        # 子进程在新会话中且标准输入输出为 DEVNULL，自己找不到终端；
+        # 没有 /proc 时（如 macOS）活动检测依赖 claude 所在终端的访问时间，由包装器传入
+        tty = controlling_tty()
+        if tty:
+            command += ["--tty", tty]
+        return subprocess.Popen(
+            command, cwd=str(project_root), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, env=env, **kwargs)
+
+    @staticmethod
+    def _signal_group(process: subprocess.Popen, sig) -> None:
+        try:
+            if os.name == "nt":
+                process.kill()
+            else:
+                os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+
+    @staticmethod
+    def _signal_worker(process: subprocess.Popen, sig) -> None:
+        """只通知点击进程本身（浏览器由它自己关闭）"""
+        try:
+            process.send_signal(sig)
+        except (ProcessLookupError, OSError):
+            pass
+
+    def _terminate(self, process: subprocess.Popen, grace: float = 10):
+        """终止点击进程：先让它关闭浏览器，超时或退出后再结束整个进程组（清理残留的浏览器进程）"""
+        self._signal_worker(process, signal.SIGTERM)
+        try:
+            process.wait(grace)
+        except subprocess.TimeoutExpired:
+            pass
+        self._signal_group(process, signal.SIGKILL if os.name != "nt" else signal.SIGTERM)
+        process.wait()
+
+    def _watch(self, process: subprocess.Popen):
+        """等待点击进程退出；进程树内存超限时终止它并返回原因"""
+        max_rss = float(self.settings.get("max_rss_mb") or 0) * 1048576
+        while process.poll() is None:
+            if self.stop_event.wait(self.poll):
+                return None
+            rss = procfs.tree_rss(process.pid) if max_rss else None
+            if rss and rss > max_rss:
+                self._terminate(process)
+                return f"进程树内存 {rss / 1048576:.0f} MB 超过上限 {max_rss / 1048576:.0f} MB"
+        return f"退出码 {process.returncode}" if process.returncode else None
+
+    def run(self):
+        """阻塞运行，直到 stop_event 置位、点击进程正常退出或连续重启次数用尽"""
+        restarts = 0
+        while not self.stop_event.is_set():
+            self.process = self._spawn()
+            started = time.monotonic()
+            logger.info("🧩 点击进程已启动 (PID %s)", self.process.pid)
+            reason = self._watch(self.process)
+            if self.stop_event.is_set():
+                break
+            if reason is None:
+                logger.info("点击进程已退出")
+                break
+
+            if time.monotonic() - started >= _STABLE_SECONDS:
+                restarts = 0
+            restarts += 1
+            if restarts > int(self.settings["max_restarts"]):
+                logger.error("❌ 点击进程连续异常 %s 次（%s），停止重启", restarts - 1, reason)
+                break
+            delay = float(self.settings["restart_delay"]) * 2 ** (restarts - 1)
+            logger.warning("⚠️  点击进程异常（%s），%.0f 秒后重启（第 %s 次）", reason, delay, restarts)
+            if self.stop_event.wait(delay):
+                break
+
+    def stop(self):
+        """通知点击进程收尾退出（不等待，超时后由点击进程自行结束整个进程组）"""
+        self.stop_event.set()
+        if self.process is not None and self.process.poll() is None:
+            self._signal_worker(self.process, signal.SIGTERM)
+
+
+def _arm_stop_timeout():
+    """收尾超时后强制结束整个进程组（含浏览器）"""
+    def kill_group():
+        # 只有自己是进程组组长（由监管方在独立会话中启动）时才结束整个组，
+        # 手动运行时与调用方同属一个进程组，只结束自身
+        if hasattr(os, "killpg") and os.getpgid(0) == os.getpid():
+            os.killpg(0, signal.SIGKILL)
+        os._exit(1)
+    timer = threading.Timer(_STOP_GRACE_SECONDS, kill_group)
+    timer.daemon = True
+    timer.start()
+
+
+@click.command()
+@click.option('--claude-pid', type=int, required=True, help='被包装的 claude 进程 PID')
+@click.option('--tty', default=None, help='claude 所在的终端设备（用于没有 /proc 时的活动检测）')
+def main(claude_pid, tty):
+    """后台点击进程入口（由包装器启动）"""
+    from .config import config_manager
+
+    stop_event = threading.Event()
+
+    def handle_stop(signum, frame):
+        if not stop_event.is_set():
+            stop_event.set()
+            _arm_stop_timeout()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+
+    # 包装器意外退出时（父进程变化）同样停止
+    parent = os.getppid()
+
+    def watch_parent():
+        while not stop_event.wait(5):
+            if os.getppid() != parent:
+                logger.info("包装器进程已退出，停止点击进程")
+                handle_stop(None, None)
+
+    threading.Thread(target=watch_parent, daemon=True).start()
+
+    apply_limits(dict(DEFAULT_WORKER_SETTINGS, **(config_manager.get_config_value('worker') or {})))
+    try:
+        click_loop(claude_pid, stop_event, tty)
+    except Exception as e:
+        logger.error("点击进程异常退出: %s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测量 claude 包装器的启动开销（time-to-claude）
+
+在临时目录中放一个假的 claude（启动时记录时间戳后立即退出），分别直接启动和经包装器启动，
+统计从创建进程到真正的 claude 开始运行的耗时，差值即包装器带来的额外开销。
+
+用法：
+    python3 scripts/bench_time_to_claude.py [-n 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+WRAPPER = PROJECT_ROOT / "scripts" / "claude_wrapper.py"
+PATH_CACHE = PROJECT_ROOT / "data" / "claude_path.json"
+
+STUB = """#!{python} -S
+import os, sys, time
+stamp = os.environ.get("BENCH_STAMP")
+if stamp:
+    with open(stamp, "w") as f:
+        f.write(str(time.time_ns()))
+if "--version" in sys.argv:
+    print("0.0.0 (Claude Code)")
+"""
+
+SCENARIOS = [
+    ("--version", ["--version"]),
+    ("-p 提示词", ["-p", "hello"]),
+    ("mcp list", ["mcp", "list"]),
+    ("交互式（无参数）", []),
+]
+
+
+def _measure(command: list, env: dict, stamp: Path) -> float:
+    """启动命令，返回从创建进程到假 claude 开始运行的毫秒数"""
+    stamp.unlink(missing_ok=True)
+    start = time.time_ns()
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   stdin=subprocess.DEVNULL, timeout=60)
+    return (int(stamp.read_text()) - start) / 1e6
+
+
+def _summary(samples: list) -> str:
+    # 与 stats / 负载测试使用同一个分位数算法（导入日志模块有副作用，用到时再导入）
+    from claude_auto_clicker.utils.run_history import nearest_rank
+
+    samples = sorted(samples)
+    p95 = samples[nearest_rank(len(samples), 0.95)]
+    return f"中位数 {statistics.median(samples):7.1f} ms   p95 {p95:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 claude 包装器的 time-to-claude")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="每个场景的测量次数")
+    args = parser.parse_args()
+
+    # 基准测试会改写 claude 路径缓存，结束后恢复
+    saved_cache = PATH_CACHE.read_bytes() if PATH_CACHE.exists() else None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            bin_dir = Path(tmp) / "bin"
+            bin_dir.mkdir()
+            stub = bin_dir / "claude"
+            stub.write_text(STUB.format(python=sys.executable), encoding="utf-8")
+            stub.chmod(0o755)
+            stamp = Path(tmp) / "stamp"
+            # 交互式场景不启动后台点击器，避免按用户的 data/config.json 真的去登录点击
+            env = dict(os.environ, PATH=f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                       BENCH_STAMP=str(stamp), CLAUDE_AUTO_CLICKER_DISABLE="1")
+
+            print(f"time-to-claude（{args.runs} 次，已预热路径缓存）")
+            print("=" * 60)
+            for label, claude_args in SCENARIOS:
+                wrapped = [sys.executable, str(WRAPPER)] + claude_args
+                direct = [str(stub)] + claude_args
+                _measure(wrapped, env, stamp)  # 预热：首次运行会探测并缓存 claude 路径
+                direct_ms = [_measure(direct, env, stamp) for _ in range(args.runs)]
+                wrapped_ms = [_measure(wrapped, env, stamp) for _ in range(args.runs)]
+                overhead = statistics.median(wrapped_ms) - statistics.median(direct_ms)
+                print(f"{label}")
+                print(f"  直接启动   {_summary(direct_ms)}")
+                print(f"  经包装器   {_summary(wrapped_ms)}   额外开销 {overhead:+.1f} ms")
+    finally:
+        if saved_cache is not None:
+            PATH_CACHE.write_bytes(saved_cache)
+        else:
+            PATH_CACHE.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,41 @@
 """
 Claude 命令包装器
 用于拦截 claude 命令并在启动 claude code 时同时启动自动点击功能
+
+启动路径尽量轻：先启动真正的 claude，再在后台线程中导入 selenium、加载配置；
+--version、-p、mcp 等短命令不需要点击器，直接 exec 原始命令，不留包装器进程。
 """
 import sys
 import os
+import json
 import subprocess
 import threading
-import time
 import signal
 from pathlib import Path
 
 # 添加自动点击工具到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from claude_auto_clicker.core.auto_clicker import auto_clicker
-from claude_auto_clicker.config import config_manager
-from claude_auto_clicker.utils.logger import logger
+
+class _LazyLogger:
+    """首次使用时才导入日志模块（导入时会创建日志文件与后台线程，不应拖慢 claude 启动）"""
+    
+    def __getattr__(self, name):
+        from claude_auto_clicker.utils.logger import logger as real_logger
+        return getattr(real_logger, name)
+
+
+logger = _LazyLogger()
+
+# 原始 claude 路径缓存（连同 PATH 与文件 inode/mtime，启动时只需一次 stat 校验）
+CLAUDE_PATH_CACHE = Path(__file__).parent.parent / "data" / "claude_path.json"
+
+# 不需要点击器的短命令：子命令与参数
+SHORT_LIVED_SUBCOMMANDS = {'config', 'mcp', 'update', 'doctor', 'install', 'setup-token', 'migrate-installer'}
+SHORT_LIVED_FLAGS = {'--version', '-v', '--help', '-h', '-p', '--print'}
+
+# 设置该环境变量时不启动后台点击器（基准测试等场景）
+NO_CLICKER_ENV = "CLAUDE_AUTO_CLICKER_DISABLE"
 
 
 class ClaudeWrapper:
@@ -25,33 +45,72 @@ class ClaudeWrapper:
     def __init__(self):
         self.auto_click_thread = None
         self.claude_process = None
-        self.should_stop = False
-        
-        # 注册信号处理器
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        self.supervisor = None
+        # 停止信号：工作线程的所有等待都在该事件上进行，置位后立即返回
+        self.stop_event = threading.Event()
     
     def _signal_handler(self, signum, frame):
         """信号处理器"""
-        logger.info(f"接收到信号 {signum}，正在清理...")
-        self.should_stop = True
+        logger.info("接收到信号 %s，正在清理...", signum)
+        self.stop_event.set()
         if self.claude_process:
             self.claude_process.terminate()
         sys.exit(0)
     
+    @staticmethod
+    def _fingerprint(path: str) -> dict:
+        """可执行文件的身份信息（跟随符号链接，claude 升级后会变化）"""
+        st = os.stat(path)
+        return {"dev": st.st_dev, "ino": st.st_ino, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    
+    def _load_cached_claude(self) -> str:
+        """读取缓存的 claude 路径；PATH 或文件发生变化时返回 None"""
+        try:
+            cached = json.loads(CLAUDE_PATH_CACHE.read_text(encoding="utf-8"))
+            if cached.get("PATH") != os.environ.get('PATH', ''):
+                return None
+            if cached.get("file") != self._fingerprint(cached["path"]):
+                return None
+            return cached["path"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _save_cached_claude(self, claude_path: str):
+        """原子写入路径缓存"""
+        try:
+            CLAUDE_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = CLAUDE_PATH_CACHE.with_name(f"{CLAUDE_PATH_CACHE.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({
+                "path": claude_path,
+                "PATH": os.environ.get('PATH', ''),
+                "file": self._fingerprint(claude_path),
+            }, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, CLAUDE_PATH_CACHE)
+        except OSError as e:
+            logger.debug("保存 claude 路径缓存失败: %s", e)
+    
     def _find_original_claude(self) -> str:
-        """查找原始的 claude 命令"""
-        # 获取当前脚本路径
-        current_script = os.path.abspath(__file__)
+        """查找原始的 claude 命令（优先使用缓存，只有 PATH 或文件变化时才重新探测）"""
+        cached = self._load_cached_claude()
+        if cached:
+            return cached
+        claude_path = self._probe_original_claude()
+        self._save_cached_claude(claude_path)
+        return claude_path
+    
+    def _probe_original_claude(self) -> str:
+        """扫描 PATH 并运行 --version 确认真正的 claude 命令"""
+        # 当前包装器（源文件与安装到 PATH 中的副本）
+        wrapper_paths = {os.path.realpath(__file__), os.path.realpath(sys.argv[0])}
         
-        # 在 PATH 中查找 claude 命令，排除当前包装器
+        # 在 PATH 中查找 claude 命令，排除当前包装器；安装脚本会把原始命令备份为 claude.original
         path_dirs = os.environ.get('PATH', '').split(os.pathsep)
+        candidates = [os.path.join(d, name) for d in path_dirs for name in ('claude.original', 'claude')]
         
-        for path_dir in path_dirs:
-            claude_path = os.path.join(path_dir, 'claude')
+        for claude_path in candidates:
             if (os.path.exists(claude_path) and 
                 os.access(claude_path, os.X_OK) and 
-                os.path.abspath(claude_path) != current_script):
+                os.path.realpath(claude_path) not in wrapper_paths):
                 
                 # 检查是否是真正的 claude 命令（而不是我们的包装器）
                 try:
@@ -70,95 +129,103 @@ class ClaudeWrapper:
         ]
         
         for path in default_paths:
-            if os.path.exists(path) and os.access(path, os.X_OK):
+            if (os.path.exists(path) and os.access(path, os.X_OK) and
+                    os.path.realpath(path) not in wrapper_paths):
                 return path
         
         raise FileNotFoundError("无法找到原始的 claude 命令")
     
     def _should_start_auto_click(self, args: list) -> bool:
-        """判断是否应该启动自动点击功能"""
-        # 检查是否启动 claude code
+        """判断是否应该启动自动点击功能（只有交互式会话需要）"""
+        # 不带参数直接运行 claude 即进入交互式会话
         if not args:
-            return False
-            
-        # 检查命令参数
+            return True
+        
+        # 查看版本、帮助、非交互输出（-p/--print）很快就会退出
         for arg in args:
-            if arg.lower() in ['code', '--code', 'code-editor']:
-                return True
+            if arg in SHORT_LIVED_FLAGS or arg.startswith('--print='):
+                return False
         
-        # 如果没有参数或参数是帮助相关，可能是启动 code
-        if len(args) == 0 or args[0] in ['--help', '-h']:
+        # 管理类子命令（第一个非选项参数）
+        positional = next((arg for arg in args if not arg.startswith('-')), None)
+        if positional in SHORT_LIVED_SUBCOMMANDS:
             return False
-            
-        return True  # 默认认为是启动 code
+        
+        return True  # 其余（含带提示词启动、--continue 等）视为交互式会话
+    
+    def _exec_claude(self, original_claude: str, args: list):
+        """用原始 claude 替换当前进程（不返回）；Windows 上退回为子进程"""
+        if os.name == 'nt':
+            sys.exit(subprocess.call([original_claude] + args))
+        os.execv(original_claude, [original_claude] + args)
     
-    def _auto_click_worker(self):
-        """自动点击工作线程"""
+    def _background_clicker(self):
+        """后台点击（在 claude 启动后才导入 selenium 与配置）"""
+        from claude_auto_clicker.config import config_manager
+        from claude_auto_clicker.worker import DEFAULT_WORKER_SETTINGS, WorkerSupervisor, click_loop
+        
         if not config_manager.is_configured():
             logger.warning("未配置登录凭据，跳过自动点击功能")
             return
         
-        # 等待一段时间让 claude code 启动
-        time.sleep(10)
-        
-        interval = config_manager.get_config_value('click.click_interval', 300)
-        logger.info(f"开始后台自动点击，间隔 {interval} 秒")
-        
-        while not self.should_stop:
-            try:
-                success = auto_clicker.perform_single_click()
-                if success:
-                    logger.info(f"后台点击成功，等待 {interval} 秒")
-                else:
-                    logger.warning(f"后台点击失败，等待 {interval} 秒后重试")
-                
-                # 分段睡眠，便于响应停止信号
-                for _ in range(interval):
-                    if self.should_stop:
-                        break
-                    time.sleep(1)
-                    
-            except Exception as e:
-                logger.error(f"自动点击过程中出错: {e}")
-                time.sleep(30)  # 出错后等待30秒
+        settings = dict(DEFAULT_WORKER_SETTINGS, **(config_manager.get_config_value('worker') or {}))
+        if settings['isolate']:
+            # 在受监管的独立进程中点击，与包装器及 claude 隔离
+            self.supervisor = WorkerSupervisor(self.claude_process.pid, settings, self.stop_event,
+                                               config_manager.get_config_value('wrapper.activity_poll', 5))
+            self.supervisor.run()
+        else:
+            click_loop(self.claude_process.pid, self.stop_event)
     
     def run(self, args: list):
         """运行 claude 命令"""
         try:
             # 查找原始 claude 命令
             original_claude = self._find_original_claude()
+        except FileNotFoundError:
+            print("❌ 无法找到原始的 claude 命令")
+            print("请确保已正确安装 Claude Code")
+            sys.exit(1)
+        
+        # 短命令直接交给原始 claude，不加载点击器
+        if not self._should_start_auto_click(args):
+            self._exec_claude(original_claude, args)
+        
+        # 注册信号处理器
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+        
+        returncode = 1
+        try:
+            # 先启动原始 claude 命令，点击器在其运行期间于后台初始化
+            self.claude_process = subprocess.Popen([original_claude] + args)
+            logger.info("启动原始 claude 命令: %s %s", original_claude, ' '.join(args))
             
-            # 判断是否需要启动自动点击
-            should_auto_click = self._should_start_auto_click(args)
-            
-            if should_auto_click:
+            if os.environ.get(NO_CLICKER_ENV):
+                logger.info("已设置 %s，不启动后台自动点击", NO_CLICKER_ENV)
+            else:
                 logger.info("检测到 claude code 启动，准备启动后台自动点击")
-                
-                # 启动自动点击线程
                 self.auto_click_thread = threading.Thread(
-                    target=self._auto_click_worker, 
+                    target=self._background_clicker, 
                     daemon=True
                 )
                 self.auto_click_thread.start()
             
-            # 启动原始 claude 命令
-            logger.info(f"启动原始 claude 命令: {original_claude} {' '.join(args)}")
-            self.claude_process = subprocess.Popen([original_claude] + args)
-            
-            # 等待 claude 命令完成
-            self.claude_process.wait()
+            # 等待 claude 命令完成；被信号终止时按 shell 惯例返回 128 + 信号编号
+            returncode = self.claude_process.wait()
+            if returncode < 0:
+                returncode = 128 - returncode
             
-        except FileNotFoundError:
-            print("❌ 无法找到原始的 claude 命令")
-            print("请确保已正确安装 Claude Code")
-            sys.exit(1)
         except KeyboardInterrupt:
             logger.info("接收到中断信号")
+            returncode = 130
         except Exception as e:
-            logger.error(f"运行 claude 命令时出错: {e}")
-            sys.exit(1)
+            logger.error("运行 claude 命令时出错: %s", e)
         finally:
-            self.should_stop = True
+            self.stop_event.set()
+            if self.supervisor:
+                self.supervisor.stop()
+        sys.exit(returncode)
 
 
 def main():
@@ -0,0 +1,106 @@
+"""
+下载引擎测试：在本地启动支持 Range 的 HTTP 服务器，验证分段下载、续传与完整性校验
+"""
+import hashlib
+import http.server
+import os
+import re
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from claude_auto_clicker.utils.download_engine import DownloadEngine, DownloadError
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 12345)
+
+
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    """按 Range 返回 PAYLOAD 的片段；server.truncate 为剩余需要截短的分段响应次数"""
+
+    def do_GET(self):
+        server = self.server
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(PAYLOAD) - 1
+            with server.lock:
+                server.ranges.append((start, end))
+                truncate = end > start and server.truncate > 0
+                if truncate:
+                    server.truncate -= 1
+            if truncate:
+                # 正常结束但只返回一半内容，模拟代理或服务器提前截断
+                end = start + (end - start) // 2
+            body = PAYLOAD[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Type", "application/octet-stream")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DownloadEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.server.lock = threading.Lock()
+        self.server.ranges = []
+        self.server.truncate = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/chromium.zip"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = Path(self.tmp.name) / "chromium.zip"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _engine(self, **kwargs):
+        return DownloadEngine(segments=4, min_segment_size=512 * 1024, **kwargs)
+
+    def test_segmented_download(self):
+        """文件足够大时拆分为多个区间并行下载，内容与哈希一致"""
+        digest = self._engine().download(self.url, self.dest)
+        self.assertEqual(self.dest.read_bytes(), PAYLOAD)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+        # 第一个请求是 bytes=0-0 探测，其余为 4 个分段
+        self.assertEqual(len(self.server.ranges), 5)
+        self.assertFalse(list(Path(self.tmp.name).glob("*.part*")))
+
+    def test_short_segment_is_resumed(self):
+        """分段响应提前结束时不能把预分配的零字节计入结果，而是续传该区间"""
+        self.server.truncate = 1
+        digest = self._engine().download(self.url, self.dest)
+        self.assertEqual(self.dest.read_bytes(), PAYLOAD)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+
+    def test_short_segment_without_retries_fails(self):
+        """重试耗尽时报告失败并保留 .part 供下次续传"""
+        self.server.truncate = 100
+        with self.assertRaises(DownloadError):
+            self._engine(retries=0).download(self.url, self.dest)
+        self.assertFalse(self.dest.exists())
+        self.assertTrue(self.dest.with_name(self.dest.name + ".part").exists())
+
+        self.server.truncate = 0
+        digest = self._engine().download(self.url, self.dest)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+
+    def test_expected_sha256_mismatch(self):
+        """内容与期望的 SHA-256 不符时不写入目标文件"""
+        with self.assertRaises(DownloadError):
+            self._engine(retries=0).download(self.url, self.dest, expected_sha256="0" * 64)
+        self.assertFalse(self.dest.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+tar.gz 制品边下载边解压测试：解压配置（variant）在流式路径上同样生效，结果可被后续安装复用
+"""
+import hashlib
+import http.server
+import io
+import json
+import tarfile
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from claude_auto_clicker.utils.browser_downloader import BrowserDownloader, _fetch_streaming
+from claude_auto_clicker.utils.extractor import MANIFEST_NAME
+
+
+def _build_archive() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in [("chrome-linux/chrome", b"#!/bin/sh\n"),
+                           ("chrome-linux/locales/en-US.pak", b"en"),
+                           ("chrome-linux/locales/de.pak", b"de"),
+                           ("chrome-linux/chrome_crashpad_handler", b"crashpad")]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+ARCHIVE = _build_archive()
+
+
+class _ArchiveHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(ARCHIVE)))
+        self.send_header("Content-Type", "application/gzip")
+        self.end_headers()
+        self.wfile.write(ARCHIVE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamingExtractTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ArchiveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/chrome-linux.tar.gz"
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / "project").mkdir()
+        self.downloader = BrowserDownloader(root / "project", {
+            "cache_dir": str(root / "cache"),
+            "extract_profile": "headless-minimal",
+        })
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_profile_applied_and_tree_reused(self):
+        downloader = self.downloader
+        variant = "headless-minimal-en-US"
+        sha256 = _fetch_streaming(downloader.cache, downloader.session, downloader.progress, self.url,
+                                  "chromium", "chromium:test", None,
+                                  downloader._extract_chromium_stream, variant)
+        self.assertEqual(sha256, hashlib.sha256(ARCHIVE).hexdigest())
+        self.assertTrue(downloader.cache.has_blob(sha256))
+
+        tree = downloader.cache.trees_dir / f"{sha256}-{variant}"
+        self.assertTrue((tree / "chrome-linux" / "chrome").exists())
+        self.assertTrue((tree / "chrome-linux" / "locales" / "en-US.pak").exists())
+        self.assertFalse((tree / "chrome-linux" / "locales" / "de.pak").exists())
+        self.assertFalse((tree / "chrome-linux" / "chrome_crashpad_handler").exists())
+        manifest = json.loads((tree / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(manifest["profile"], "headless-minimal")
+
+        # 安装时直接复用流式解压得到的目录树，不再解压
+        dest = Path(self.tmp.name) / "installed"
+        extracted = []
+        self.assertTrue(downloader.cache.materialize(
+            sha256, dest, lambda archive, target: extracted.append(target) or False, variant=variant))
+        self.assertEqual(extracted, [])
+        self.assertFalse((dest / "chrome-linux" / "locales" / "de.pak").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()